@@ -0,0 +1,77 @@
+"""
+Benchmark: extracción secuencial vs. concurrente (pool de hilos con límites por host)
+vs. pipeline descarga/parseo (hilos + pool de procesos) contra un servidor HTTP local
+con latencia artificial.
+
+Verifica que los diccionarios de resultados y el HTML son idénticos en todos los modos.
+
+Uso:
+    python benchmarks/bench_concurrent_fetch.py --urls 100 --hosts 4 --delay 0.1 --workers 16 --parse-workers 4
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import seo_auditor  # noqa: E402
+from stub_server import start_stub_server  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--urls', type=int, default=100)
+    parser.add_argument('--hosts', type=int, default=4, help="Servidores locales distintos (hosts).")
+    parser.add_argument('--delay', type=float, default=0.1, help="Latencia artificial por petición (s).")
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--max-per-host', type=int, default=4)
+    parser.add_argument('--parse-workers', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('--parser', choices=sorted(seo_auditor.PARSER_BACKENDS), default='bs4',
+                        help="Backend de los modos concurrente y pipeline (el secuencial usa siempre bs4).")
+    args = parser.parse_args()
+
+    servers = [start_stub_server() for _ in range(args.hosts)]
+    urls = []
+    for i in range(args.urls):
+        base_url = servers[i % args.hosts][1]
+        # Una de cada 10 URLs devuelve un error para comparar también los diccionarios de error
+        status = '&status=500' if i % 10 == 9 else ''
+        urls.append(f"{base_url}/pagina/{i}?delay={args.delay}{status}")
+
+    start = time.perf_counter()
+    serial = {seo['url_analizada']: (seo, html) for seo, html in (seo_auditor.extract_seo_data(u) for u in urls)}
+    serial_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    concurrent = {seo['url_analizada']: (seo, html) for seo, html in
+                  seo_auditor.extract_seo_data_concurrently(urls, args.workers, args.max_per_host,
+                                                                            args.parser)}
+    concurrent_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pipeline = {seo['url_analizada']: (seo, html) for seo, html in
+                seo_auditor.run_seo_pipeline(urls, args.workers, args.parse_workers, args.max_per_host,
+                                                             parser_backend=args.parser)}
+    pipeline_time = time.perf_counter() - start
+
+    for server, _ in servers:
+        server.shutdown()
+
+    if serial != concurrent:
+        sys.exit("❌ ERROR: Los resultados concurrentes difieren de los secuenciales.")
+    if serial != pipeline:
+        sys.exit("❌ ERROR: Los resultados del pipeline difieren de los secuenciales.")
+
+    print(f"URLs: {args.urls} | Hosts: {args.hosts} | Latencia: {args.delay}s")
+    print(f"  Secuencial   : {serial_time:7.2f} s")
+    print(f"  Concurrente  : {concurrent_time:7.2f} s ({args.workers} hilos, {args.max_per_host} por host)")
+    print(f"  Pipeline     : {pipeline_time:7.2f} s (+{args.parse_workers} procesos de parseo)")
+    print(f"  Aceleración  : {serial_time / concurrent_time:7.1f}x concurrente | "
+          f"{serial_time / pipeline_time:.1f}x pipeline")
+    print("✅ Resultados idénticos en todos los modos.")
+
+
+if __name__ == "__main__":
+    main()
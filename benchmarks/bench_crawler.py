@@ -0,0 +1,142 @@
+"""
+Benchmark: rastreo recursivo (crawler.crawl_site) de un sitio sintético servido en local.
+
+1. Rastrea un árbol de `--pages` páginas y comprueba que se visitan todas exactamente
+   una vez, que nunca se visitan URLs prohibidas por robots.txt ni externas, y que los
+   enlaces duplicados (fragmentos, rutas relativas) se deduplican. Mide páginas/s y el
+   pico de memoria (tracemalloc) consumiendo cada página sin conservar su HTML.
+2. Compara la memoria del conjunto de URLs vistas (set) con el filtro de Bloom para
+   `--dedup-urls` URLs y mide la tasa real de falsos positivos.
+3. robots.txt problemáticos: uno que tarda más que el tiempo de espera del planificador
+   (debe abandonarse a ese tiempo, no a los 15 s fijos, y permitir todo) y otro con
+   `--robots-pad-mb` MB de relleno (solo deben leerse MAX_ROBOTS_TXT_BYTES, sin que
+   crezca la memoria, y sus reglas iniciales deben seguir aplicándose).
+
+Uso:
+    python benchmarks/bench_crawler.py --pages 2000 --fanout 8 --dedup-urls 100000
+"""
+import argparse
+import math
+import os
+import sys
+import time
+import tracemalloc
+from functools import partial
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import seo_auditor  # noqa: E402
+from crawler import BloomFilter, RobotsPolicy, crawl_site, MAX_ROBOTS_TXT_BYTES  # noqa: E402
+from fetch_scheduler import FetchScheduler  # noqa: E402
+from stub_server import start_stub_server  # noqa: E402
+
+
+def run_crawl(base_url: str, pages: int, fanout: int, parser_backend: str):
+    """Rastrea el sitio sintético y verifica las URLs visitadas."""
+    session = seo_auditor.get_thread_session()
+    robots = RobotsPolicy(seo_auditor.REQUEST_HEADERS['User-Agent'], session)
+    extract = partial(seo_auditor.extract_seo_data, session=session, parser_backend=parser_backend)
+    max_depth = math.ceil(math.log(max(2, pages), max(2, fanout))) + 1
+
+    visited = []
+    tracemalloc.start()
+    start = time.perf_counter()
+    for results, html_content in crawl_site([base_url + '/sitio/0'], extract, robots,
+                                            max_depth=max_depth, max_pages=pages * 2):
+        visited.append(results['url_analizada'])
+        assert not results['error'], results['error']
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    expected = {f"{base_url}/sitio/{i}" for i in range(pages)}
+    assert len(visited) == len(set(visited)), "Se visitó alguna URL más de una vez"
+    assert set(visited) == expected, f"URLs inesperadas: {sorted(set(visited) ^ expected)[:5]}"
+    print(f"Rastreo ({parser_backend}): {len(visited)} páginas en {elapsed:.2f} s "
+          f"({len(visited) / elapsed:.0f} páginas/s) | pico tracemalloc {peak / (1024 * 1024):.1f} MB")
+    print("  OK: todas las páginas una sola vez, sin /privado/ (robots.txt), externos ni imágenes.")
+
+
+def compare_dedup(n_urls: int):
+    """Memoria de set vs. filtro de Bloom para n_urls URLs y falsos positivos medidos."""
+    urls = [f"https://www.ejemplo.com/categoria/{i % 997}/producto-{i}?pagina={i % 13}" for i in range(n_urls)]
+
+    tracemalloc.start()
+    seen_set = set()
+    for url in urls:
+        seen_set.add(url)
+    set_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del seen_set
+
+    # La clave en el set no incluye la propia cadena (ya existe en `urls`), se mide solo la estructura
+    bloom = BloomFilter(capacity=n_urls)
+    start = time.perf_counter()
+    for url in urls:
+        bloom.add(url)
+    add_time = time.perf_counter() - start
+    assert all(url in bloom for url in urls), "El filtro de Bloom no debe tener falsos negativos"
+
+    probes = [f"https://www.ejemplo.com/otra/{i}" for i in range(n_urls)]
+    false_positives = sum(1 for url in probes if url in bloom)
+    print(f"Deduplicación de {n_urls} URLs: set {set_bytes / (1024 * 1024):.1f} MB (sin contar las cadenas) | "
+          f"Bloom {len(bloom.bits) / (1024 * 1024):.2f} MB, {bloom.hash_count} hashes, "
+          f"{n_urls / add_time:.0f} inserciones/s | falsos positivos {100.0 * false_positives / n_urls:.3f}%")
+
+
+def check_robots_limits(pad_mb: float) -> bool:
+    """robots.txt lento (tiempo de espera del planificador) y enorme (tamaño limitado)."""
+    timeout = 0.5
+    scheduler = FetchScheduler(max_retries=0, default_timeout=timeout, adaptive_timeouts=False)
+    server, base_url = start_stub_server(robots_delay=4 * timeout)
+    try:
+        robots = RobotsPolicy(seo_auditor.REQUEST_HEADERS['User-Agent'], scheduler=scheduler)
+        start = time.perf_counter()
+        allowed = robots.can_fetch(base_url + '/privado/1')
+        slow_time = time.perf_counter() - start
+    finally:
+        server.shutdown()
+    print(f"robots.txt lento ({4 * timeout:.1f} s, tiempo de espera {timeout:.1f} s): abandonado en "
+          f"{slow_time:.2f} s | {'todo permitido' if allowed else 'reglas aplicadas'}")
+    ok = allowed and slow_time < 2 * timeout
+
+    server, base_url = start_stub_server(robots_pad_mb=pad_mb)
+    try:
+        robots = RobotsPolicy(seo_auditor.REQUEST_HEADERS['User-Agent'])
+        tracemalloc.start()
+        start = time.perf_counter()
+        blocked = not robots.can_fetch(base_url + '/privado/1')
+        huge_time = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        server.shutdown()
+    print(f"robots.txt de {pad_mb:.0f} MB: leído en {huge_time:.2f} s | pico tracemalloc "
+          f"{peak / (1024 * 1024):.1f} MB (límite {MAX_ROBOTS_TXT_BYTES // 1024} KB) | "
+          f"/privado/ {'prohibido' if blocked else 'permitido'}")
+    # Las ~50.000 líneas de comentario de los 500 KB leídos ocupan varias veces su tamaño como str
+    return ok and blocked and peak < 16 * MAX_ROBOTS_TXT_BYTES
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=2000)
+    parser.add_argument('--fanout', type=int, default=8)
+    parser.add_argument('--dedup-urls', type=int, default=100000)
+    parser.add_argument('--parser', choices=sorted(seo_auditor.PARSER_BACKENDS), default='stream')
+    parser.add_argument('--robots-pad-mb', type=float, default=50)
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(site_pages=args.pages, site_fanout=args.fanout)
+    try:
+        run_crawl(base_url, args.pages, args.fanout, args.parser)
+    finally:
+        server.shutdown()
+    compare_dedup(args.dedup_urls)
+    if not check_robots_limits(args.robots_pad_mb):
+        sys.exit("❌ ERROR: El robots.txt lento o enorme no se limitó.")
+
+
+if __name__ == '__main__':
+    main()
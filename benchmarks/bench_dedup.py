@@ -0,0 +1,347 @@
+"""
+Comprobación y benchmark de la deduplicación (page_fingerprints, `--dedup`).
+
+1. Calidad: corpus de `--groups` textos base, cada uno con `--variants` variantes que
+   cambian entre el 1 % y el 30 % de sus palabras. Los grupos de MinHash + LSH se comparan
+   con la similitud de Jaccard exacta de todos los pares (fuerza bruta, O(n²)). En la
+   mitad de las páginas falta </head>, así que el cuerpo empieza en <body> o en <p>.
+   MinHash solo estima la similitud (desviación ~0,035 con 128 permutaciones), así que se
+   mide con un margen de ±0,05 alrededor del umbral: exhaustividad = pares con Jaccard ≥
+   umbral + 0,05 que quedan en el mismo grupo; precisión = páginas agrupadas que tienen
+   en su grupo alguna otra con Jaccard ≥ umbral - 0,05 (los grupos son transitivos, dos
+   páginas de un grupo pueden parecerse menos entre sí). Ambas tasas se miden sobre una
+   muestra, así que solo fallan si el mínimo (`--min-recall`, `--min-precision`) queda
+   por encima del límite superior de su intervalo de Wilson al 95 %: con pocos grupos la
+   tolerancia es mayor, con muchos se acerca al mínimo.
+2. Escalado: find_near_duplicates sobre 2k-16k firmas frente a comparar todas las firmas
+   entre sí (solo hasta 4k: el coste es cuadrático).
+3. Páginas sin cambios: seo_auditor.py --dedup audita páginas de un servidor local (con
+   copias exactas y páginas casi idénticas) y se repite con --workers y con
+   --parse-workers. En las repeticiones no debe parsearse ninguna página ni reescribirse
+   ningún informe, los resultados deben ser idénticos y el informe de duplicados debe
+   encontrar las copias y las casi duplicadas. Las huellas de la primera auditoría deben
+   calcularse en los hilos de descarga o en los procesos de parseo, no en el principal.
+
+Uso:
+    python benchmarks/bench_dedup.py --groups 150 --variants 3 --scale 2000,4000,8000,16000 --urls 60
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from itertools import combinations
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from page_fingerprints import (FingerprintStore, extract_words, find_near_duplicates, minhash_signature,  # noqa: E402
+                               DEFAULT_NEAR_DUP_THRESHOLD, FINGERPRINTS_DB_FILE, SHINGLE_WORDS)
+from results_store import RESULTS_DB_FILE  # noqa: E402
+from stub_server import start_stub_server  # noqa: E402
+from synthetic_data import get_vocabulary, synthetic_url  # noqa: E402
+
+MUTATION_RATES = (0.01, 0.02, 0.03, 0.05, 0.1, 0.3)
+WORDS_PER_TEXT = 400
+ESTIMATE_MARGIN = 0.05
+WILSON_Z = 1.96   # Intervalo de confianza del 95 % para las tasas medidas sobre la muestra
+
+
+def random_text(rng: random.Random, vocabulary: List[str]) -> List[str]:
+    return ' '.join(rng.choices(vocabulary, k=WORDS_PER_TEXT)).split()
+
+
+def mutate(words: List[str], rate: float, rng: random.Random, vocabulary: List[str]) -> List[str]:
+    """Copia de `words` con una fracción `rate` de palabras sustituidas."""
+    mutated = list(words)
+    for position in rng.sample(range(len(words)), max(1, int(len(words) * rate))):
+        mutated[position] = rng.choice(vocabulary).split()[0]
+    return mutated
+
+
+def shingle_set(words: List[str]) -> Set[Tuple[str, ...]]:
+    return {tuple(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def wilson_upper(successes: int, total: int) -> float:
+    """Límite superior del intervalo de Wilson de una proporción (1.0 sin muestra)."""
+    if not total:
+        return 1.0
+    p = successes / total
+    z2 = WILSON_Z * WILSON_Z
+    center = p + z2 / (2 * total)
+    spread = WILSON_Z * math.sqrt(p * (1 - p) / total + z2 / (4 * total * total))
+    return min(1.0, (center + spread) / (1 + z2 / total))
+
+
+def check_quality(args: argparse.Namespace) -> List[str]:
+    rng = random.Random(7)
+    vocabulary = get_vocabulary()
+    texts: List[List[str]] = []
+    for _ in range(args.groups):
+        base = random_text(rng, vocabulary)
+        texts.append(base)
+        texts.extend(mutate(base, rng.choice(MUTATION_RATES), rng, vocabulary) for _ in range(args.variants))
+    # Las páginas pasan por el extractor de texto visible, como en seo_auditor; en la
+    # mitad falta </head> (y en una de cada cuatro también <body>): el texto debe contar igual
+    heads = ["<head><title>t</title></head><body>", "<head><title>t</title><body>",
+             "<head><title>t</title></head><body>", "<head><title>t</title><meta name=x>"]
+    pages = [f"<html>{heads[i % 4]}<p>{' '.join(words)}</p>"
+             f"<script>var x = {i};</script></body></html>" for i, words in enumerate(texts)]
+    start = time.perf_counter()
+    signatures = [minhash_signature(extract_words(page)) for page in pages]
+    signature_time = time.perf_counter() - start
+    start = time.perf_counter()
+    clusters = find_near_duplicates(signatures, args.threshold)
+    lsh_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    shingles = [shingle_set(words) for words in texts]
+    jaccard: Dict[Tuple[int, int], float] = {}
+    for first, second in combinations(range(len(texts)), 2):
+        intersection = len(shingles[first] & shingles[second])
+        if intersection:
+            jaccard[(first, second)] = intersection / len(shingles[first] | shingles[second])
+    brute_time = time.perf_counter() - start
+
+    cluster_of = {member: number for number, (members, _) in enumerate(clusters) for member in members}
+
+    def same_cluster(pair: Tuple[int, int]) -> bool:
+        return pair[0] in cluster_of and cluster_of[pair[0]] == cluster_of.get(pair[1])
+
+    at_threshold = [pair for pair, value in jaccard.items() if value >= args.threshold]
+    clear_pairs = [pair for pair, value in jaccard.items() if value >= args.threshold + ESTIMATE_MARGIN]
+    found = [pair for pair in clear_pairs if same_cluster(pair)]
+    clustered = [member for members, _ in clusters for member in members]
+    supported = {member for pair, value in jaccard.items() if value >= args.threshold - ESTIMATE_MARGIN
+                 and same_cluster(pair) for member in pair}
+    recall = len(found) / len(clear_pairs) if clear_pairs else 1.0
+    precision = len(supported) / len(clustered) if clustered else 1.0
+
+    print(f"1. Calidad ({len(texts)} textos, umbral {args.threshold}):")
+    print(f"   firmas {signature_time:.2f} s | MinHash + LSH {lsh_time * 1000:.1f} ms | "
+          f"Jaccard exacta de todos los pares {brute_time:.2f} s")
+    print(f"   pares con Jaccard ≥ {args.threshold}: {len(at_threshold)} | en el mismo grupo "
+          f"{sum(map(same_cluster, at_threshold))} (sin margen)")
+    print(f"   pares con Jaccard ≥ {args.threshold + ESTIMATE_MARGIN:.2f}: {len(clear_pairs)} | en el mismo grupo "
+          f"{len(found)} (exhaustividad {recall:.3f}, hasta {wilson_upper(len(found), len(clear_pairs)):.3f} al 95 %)")
+    print(f"   páginas agrupadas: {len(clustered)} en {len(clusters)} grupos | con alguna del grupo con Jaccard ≥ "
+          f"{args.threshold - ESTIMATE_MARGIN:.2f}: {len(supported)} (precisión {precision:.3f}, "
+          f"hasta {wilson_upper(len(supported), len(clustered)):.3f} al 95 %)")
+    failures = []
+    # Solo es un fallo si ni el límite superior del intervalo alcanza el mínimo
+    if wilson_upper(len(found), len(clear_pairs)) < args.min_recall:
+        failures.append(f"exhaustividad {recall:.3f} (muestra de {len(clear_pairs)} pares) < {args.min_recall}")
+    if wilson_upper(len(supported), len(clustered)) < args.min_precision:
+        failures.append(f"precisión {precision:.3f} (muestra de {len(clustered)} páginas) < {args.min_precision}")
+    return failures
+
+
+def check_scaling(args: argparse.Namespace) -> List[str]:
+    rng = random.Random(11)
+    vocabulary = get_vocabulary()
+    sizes = [int(size) for size in args.scale.split(',')]
+    signatures = []
+    while len(signatures) < max(sizes):
+        base = random_text(rng, vocabulary)
+        signatures.append(minhash_signature(base))
+        # Una de cada diez páginas tiene una variante casi idéntica
+        if len(signatures) % 10 == 0:
+            signatures.append(minhash_signature(mutate(base, 0.01, rng, vocabulary)))
+
+    print("2. Escalado (firmas ya calculadas):")
+    timings = {}
+    for size in sizes:
+        start = time.perf_counter()
+        clusters = find_near_duplicates(signatures[:size], args.threshold)
+        timings[size] = time.perf_counter() - start
+        line = f"   {size:6} firmas: LSH {timings[size] * 1000:8.1f} ms ({len(clusters)} grupos)"
+        if size <= 4000:
+            matrix = np.vstack(signatures[:size])
+            start = time.perf_counter()
+            brute_pairs = sum(int(((matrix[i + 1:] == matrix[i]).mean(axis=1) >= args.threshold).sum())
+                              for i in range(size - 1))
+            line += f" | todos los pares {(time.perf_counter() - start) * 1000:8.1f} ms ({brute_pairs} pares)"
+        print(line)
+    smallest, largest = sizes[0], sizes[-1]
+    growth = timings[largest] / timings[smallest]
+    print(f"   x{largest // smallest} firmas -> x{growth:.1f} tiempo (cuadrático: x{(largest // smallest) ** 2})")
+    if growth > (largest / smallest) * 2.5:
+        return [f"find_near_duplicates no escala de forma casi lineal (x{growth:.1f})"]
+    return []
+
+
+def check_store_api(workdir: str) -> List[str]:
+    """
+    Una página modificada no se reutiliza; una eliminada por error tampoco. La marca de
+    was_reused es de cada descarga (en --serve una URL puede pedirse varias veces).
+    """
+    store = FingerprintStore(os.path.join(workdir, 'api.sqlite'))
+    results = {'url_analizada': 'https://a/', 'title': 'T', 'meta_description': 'D', 'h1': ['H'], 'error': None}
+    store.add(results, '<p>uno</p>')
+    failures = []
+    if store.reuse_results('https://a/', '<p>uno</p>') != results:
+        failures.append("reuse_results no devuelve los resultados de una página sin cambios")
+    if not store.was_reused('https://a/') or store.was_reused('https://a/'):
+        failures.append("was_reused no marca una sola vez la descarga que reutilizó resultados")
+    store.reuse_results('https://a/', '<p>uno</p>')
+    if store.reuse_results('https://a/', '<p>dos</p>') is not None:
+        failures.append("reuse_results reutiliza una página modificada")
+    if store.was_reused('https://a/'):
+        failures.append("una descarga con el HTML cambiado sigue marcada como reutilizada")
+    store.remove('https://a/')
+    if store.reuse_results('https://a/', '<p>uno</p>') is not None:
+        failures.append("reuse_results reutiliza una página eliminada")
+    store.close()
+    return failures
+
+
+def run_cli(workdir: str, extra: List[str], trace: str) -> float:
+    command = [sys.executable, os.path.join(ROOT, 'seo_auditor.py'), '--dedup', '--trace', trace] + extra
+    start = time.perf_counter()
+    subprocess.run(command, cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+
+def count_parses(trace: str) -> int:
+    with open(trace, encoding='utf-8') as f:
+        return sum(json.loads(line)['stage'].startswith('parse.') for line in f)
+
+
+def fingerprint_threads(trace: str) -> Counter:
+    """Hilos en los que se calcularon las huellas (etapa dedup.fingerprint)."""
+    with open(trace, encoding='utf-8') as f:
+        return Counter(event['thread'] for event in map(json.loads, f) if event['stage'] == 'dedup.fingerprint')
+
+
+def stored_fingerprints(db_path: str) -> List[Tuple]:
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT url, html_hash, text_hash, title_hash, meta_description_hash, h1_hash, minhash "
+                        "FROM fingerprints ORDER BY url").fetchall()
+    conn.close()
+    return rows
+
+
+def saved_files(workdir: str) -> Dict[str, float]:
+    """Modificación de cada informe TXT y HTML guardado."""
+    files = {}
+    for folder in ('reports', 'index'):
+        for directory, _, names in os.walk(os.path.join(workdir, folder)):
+            for name in names:
+                files[os.path.join(directory, name)] = os.path.getmtime(os.path.join(directory, name))
+    return files
+
+
+def run_results(workdir: str) -> Dict[int, List[Tuple]]:
+    conn = sqlite3.connect(os.path.join(workdir, RESULTS_DB_FILE))
+    rows = conn.execute("SELECT run_id, url, title, meta_description, h1, h2, h3, otras_meta, error FROM results "
+                        "ORDER BY run_id, url").fetchall()
+    conn.close()
+    runs: Dict[int, List[Tuple]] = {}
+    for row in rows:
+        runs.setdefault(row[0], []).append(row[1:])
+    return runs
+
+
+def check_unchanged_pages(workdir: str, args: argparse.Namespace) -> List[str]:
+    server, base_url = start_stub_server()
+    unique = [synthetic_url(base_url, i, args.page_kb) for i in range(args.urls)]
+    copies = [url + '&copia=1' for url in unique[:5]]             # Contenido idéntico en otra URL
+    similar = [f"{base_url}/pagina/{name}" for name in range(8)]  # Misma plantilla, distinto H1 y title
+    urls = unique + copies + similar
+    run_dir = os.path.join(workdir, 'cli')
+    os.makedirs(run_dir)
+    with open(os.path.join(run_dir, 'urls.txt'), 'w', encoding='utf-8') as f:
+        f.write("\n".join(urls))
+
+    first_time = run_cli(run_dir, ['--workers', '4'], os.path.join(workdir, 'primera.jsonl'))
+    first_parses = count_parses(os.path.join(workdir, 'primera.jsonl'))
+    first_threads = fingerprint_threads(os.path.join(workdir, 'primera.jsonl'))
+    # La misma primera auditoría con el pool de procesos: las huellas llegan de los hijos
+    pool_dir = os.path.join(workdir, 'cli_procesos')
+    os.makedirs(pool_dir)
+    with open(os.path.join(pool_dir, 'urls.txt'), 'w', encoding='utf-8') as f:
+        f.write("\n".join(urls))
+    run_cli(pool_dir, ['--parse-workers', '2'], os.path.join(workdir, 'primera_procesos.jsonl'))
+    pool_fingerprints = sum(fingerprint_threads(os.path.join(workdir, 'primera_procesos.jsonl')).values())
+    files = saved_files(run_dir)
+    repeats = {}
+    for name, extra in (('--workers 4', ['--workers', '4']), ('--parse-workers 2', ['--parse-workers', '2']),
+                        ('secuencial', [])):
+        trace = os.path.join(workdir, f'repeticion_{len(repeats)}.jsonl')
+        repeats[name] = (run_cli(run_dir, extra, trace), count_parses(trace))
+    server.shutdown()
+
+    print(f"3. Páginas sin cambios ({len(urls)} URLs de {args.page_kb} KB):")
+    print(f"   primera auditoría : {first_time:6.2f} s | {first_parses} parseos | huellas: "
+          f"{sum(first_threads.values())} en los hilos de descarga, {first_threads['MainThread']} en el principal; "
+          f"{pool_fingerprints} en los procesos de --parse-workers 2")
+    for name, (elapsed, parses) in repeats.items():
+        print(f"   repetición {name:18}: {elapsed:6.2f} s | {parses} parseos")
+
+    failures = []
+    if first_parses != len(urls):
+        failures.append(f"la primera auditoría parseó {first_parses} páginas de {len(urls)}")
+    if sum(first_threads.values()) != len(urls) or first_threads['MainThread'] or pool_fingerprints != len(urls):
+        failures.append("las huellas no se calcularon una vez por página en los hilos o procesos de parseo")
+    if stored_fingerprints(os.path.join(pool_dir, FINGERPRINTS_DB_FILE)) != \
+            stored_fingerprints(os.path.join(run_dir, FINGERPRINTS_DB_FILE)):
+        failures.append("las huellas calculadas en el pool de procesos difieren de las de los hilos")
+    if any(parses for _, parses in repeats.values()):
+        failures.append("se volvieron a parsear páginas sin cambios")
+    if saved_files(run_dir) != files:
+        failures.append("se reescribieron informes de páginas sin cambios")
+    runs = list(run_results(run_dir).values())
+    if len(runs) != 1 + len(repeats) or any(rows != runs[0] for rows in runs[1:]):
+        failures.append("los resultados reutilizados difieren de los de la primera auditoría")
+
+    store = FingerprintStore(os.path.join(run_dir, FINGERPRINTS_DB_FILE))
+    report = store.find_duplicates(args.threshold)
+    store.close()
+    copy_groups = sorted(sorted(cluster['urls']) for cluster in report['contenido'])
+    near_groups = [sorted(cluster['urls']) for cluster in report['casi_duplicados']]
+    print(f"   duplicados: {len(copy_groups)} grupos de contenido idéntico, {len(report['title'])} de title, "
+          f"{len(near_groups)} de contenido casi idéntico ({len(near_groups[0]) if near_groups else 0} páginas)")
+    if copy_groups != sorted(sorted([url, url + '&copia=1']) for url in unique[:5]):
+        failures.append("no se encontraron exactamente las copias de contenido idéntico")
+    if near_groups != [sorted(similar)]:
+        failures.append("no se agruparon las páginas casi idénticas")
+    if not os.path.exists(os.path.join(run_dir, 'seo_duplicados.txt')):
+        failures.append("no se guardó el informe de duplicados")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--groups', type=int, default=150)
+    parser.add_argument('--variants', type=int, default=3)
+    parser.add_argument('--threshold', type=float, default=DEFAULT_NEAR_DUP_THRESHOLD)
+    parser.add_argument('--min-recall', type=float, default=0.95)
+    parser.add_argument('--min-precision', type=float, default=0.95)
+    parser.add_argument('--scale', default='2000,4000,8000,16000')
+    parser.add_argument('--urls', type=int, default=60)
+    parser.add_argument('--page-kb', type=int, default=40)
+    args = parser.parse_args()
+
+    failures = check_quality(args)
+    failures += check_scaling(args)
+    with tempfile.TemporaryDirectory(prefix='bench_dedup_') as workdir:
+        failures += check_store_api(workdir)
+        failures += check_unchanged_pages(workdir, args)
+    if failures:
+        sys.exit("❌ ERROR: " + "; ".join(failures))
+    print("✅ Huellas, grupos de duplicados y reutilización de páginas sin cambios correctos.")
+
+
+if __name__ == "__main__":
+    main()
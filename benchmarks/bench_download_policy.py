@@ -0,0 +1,138 @@
+"""
+Comprobación y benchmark de los límites de descarga (download_policy.DownloadPolicy)
+contra el servidor local (stub_server.py).
+
+1. Paridad: con los límites activos (sin head-only) los resultados y el HTML son
+   idénticos a la descarga original con response.text, con ambos parsers.
+2. Respuestas problemáticas: una imagen de varios MB, una página con decenas de MB de
+   relleno y un cuerpo interminable. Con los límites se descartan o se interrumpen sin
+   que crezca la memoria (pico de tracemalloc); sin ellos se descarga todo (el cuerpo
+   interminable no se prueba sin límites: no terminaría nunca).
+3. Head-only: páginas grandes auditadas solo hasta </head> y el primer </h1>. Se
+   comprueba que title, metas, canonical y H1 coinciden con la auditoría completa y se
+   muestran los bytes evitados. Las páginas sin H1 (de 1 MB, sin encabezados) deben
+   cortarse tras el presupuesto de bytes posterior al head, no descargarse enteras,
+   también si omiten </head> y <body> (`?nohead=1` del servidor local).
+
+Uso:
+    python benchmarks/bench_download_policy.py --pages 50 --page-kb 200 --pad-mb 15
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import seo_auditor  # noqa: E402
+from download_policy import DownloadPolicy, DOWNLOAD_CHUNK_SIZE, HEAD_ONLY_BODY_BUDGET  # noqa: E402
+from stub_server import start_stub_server  # noqa: E402
+from synthetic_data import synthetic_url  # noqa: E402
+
+HEAD_FIELDS = ('title', 'meta_description', 'meta_keywords', 'canonical', 'h1', 'otras_meta', 'error')
+NO_H1_PAGE_KB = 1024
+
+
+def audit(urls: List[str], args: argparse.Namespace, parser_backend: str,
+          policy: Optional[DownloadPolicy]) -> Tuple[Dict[str, Tuple[dict, str]], float, float]:
+    """(resultados por URL, segundos, pico de memoria en MB)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    results = {seo['url_analizada']: (seo, html) for seo, html in
+               seo_auditor.extract_seo_data_concurrently(urls, args.workers, args.workers, parser_backend,
+                                                         download_policy=policy)}
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    tracemalloc.stop()
+    return results, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=50)
+    parser.add_argument('--page-kb', type=int, default=200)
+    parser.add_argument('--pad-mb', type=float, default=15.0, help="Relleno de la página enorme.")
+    parser.add_argument('--max-body-mb', type=float, default=10.0)
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+    failures: List[str] = []
+    max_bytes = int(args.max_body_mb * 1024 * 1024)
+
+    server, base_url = start_stub_server()
+    pages = [synthetic_url(base_url, i, args.page_kb) for i in range(args.pages)]
+
+    # --- 1. Paridad ----------------------------------------------------------
+    for backend in sorted(seo_auditor.PARSER_BACKENDS):
+        original = audit(pages, args, backend, None)[0]
+        limited = audit(pages, args, backend, DownloadPolicy(max_bytes))[0]
+        if original != limited:
+            failures.append(f"con límites los resultados de '{backend}' difieren de la descarga original")
+    print(f"1. Paridad con la descarga original (bs4 y stream, {args.pages} páginas): "
+          f"{'OK' if not failures else 'DIFERENCIAS'}")
+
+    # --- 2. Respuestas problemáticas ----------------------------------------
+    bad = {
+        'imagen': f"{base_url}/pagina/imagen?ctype=image/png&pad_mb=2",
+        'enorme': f"{base_url}/pagina/enorme?pad_mb={args.pad_mb}",
+    }
+    policy = DownloadPolicy(max_bytes)
+    unbounded, unbounded_time, unbounded_peak = audit(list(bad.values()), args, 'bs4', None)
+    bounded, bounded_time, bounded_peak = audit(list(bad.values()) + [f"{base_url}/pagina/infinita?endless=1"],
+                                                args, 'bs4', policy)
+    print("2. Respuestas problemáticas:")
+    print(f"   sin límites : {unbounded_time:6.2f} s | pico de memoria {unbounded_peak:7.1f} MB | "
+          f"errores {sum(1 for seo, _ in unbounded.values() if seo['error'])} (la respuesta interminable no terminaría)")
+    print(f"   con límites : {bounded_time:6.2f} s | pico de memoria {bounded_peak:7.1f} MB | "
+          f"errores {sum(1 for seo, _ in bounded.values() if seo['error'])}")
+    for url, (seo, _) in bounded.items():
+        print(f"     - {url.rsplit('/', 1)[-1]}: {seo['error']}")
+    print(f"   {policy.summary()}")
+    if not all(seo['error'] for seo, _ in bounded.values()):
+        failures.append("alguna respuesta problemática no se descartó")
+    if bounded_peak > 4 * args.max_body_mb:
+        failures.append("la memoria con límites no quedó acotada")
+
+    # --- 3. Head-only --------------------------------------------------------
+    full_policy = DownloadPolicy(max_bytes)
+    full, full_time, _ = audit(pages, args, 'stream', full_policy)
+    head_policy = DownloadPolicy(max_bytes, head_only=True)
+    head, head_time, _ = audit(pages, args, 'stream', head_policy)
+    mismatches = [url for url in pages
+                  if any(full[url][0][field] != head[url][0][field] for field in HEAD_FIELDS)]
+    print(f"3. Head-only ({args.pages} páginas de {args.page_kb} KB):")
+    print(f"   completo  : {full_time:6.2f} s | {full_policy.stats['bytes_downloaded'] / (1024 * 1024):7.2f} MB descargados")
+    print(f"   head-only : {head_time:6.2f} s | {head_policy.stats['bytes_downloaded'] / (1024 * 1024):7.2f} MB descargados")
+    print(f"   {head_policy.summary()}")
+    if mismatches:
+        failures.append(f"head-only cambió title/metas/canonical/H1 en {len(mismatches)} páginas")
+    if head_policy.stats['bytes_downloaded'] >= full_policy.stats['bytes_downloaded']:
+        failures.append("head-only no redujo los bytes descargados")
+
+    # Páginas sin H1, con </head> y sin </head> ni <body> (el head termina en la primera
+    # etiqueta de cuerpo): ambas deben cortarse tras el presupuesto, no descargarse enteras
+    for label, suffix in (('sin H1', ''), ('sin </head>', '&nohead=1')):
+        no_h1_pages = [synthetic_url(base_url, i, NO_H1_PAGE_KB, headings=0) + suffix
+                       for i in range(min(args.pages, 10))]
+        full_no_h1 = audit(no_h1_pages, args, 'stream', DownloadPolicy(max_bytes))[0]
+        no_h1_policy = DownloadPolicy(max_bytes, head_only=True)
+        head_no_h1 = audit(no_h1_pages, args, 'stream', no_h1_policy)[0]
+        per_page = no_h1_policy.stats['bytes_downloaded'] / len(no_h1_pages)
+        print(f"   {label:11}: {len(no_h1_pages)} páginas de {NO_H1_PAGE_KB} KB sin H1 | {per_page / 1024:.0f} KB "
+              f"descargados por página | {no_h1_policy.stats['head_only_fallback_stops']} cortadas sin </h1>")
+        if any(full_no_h1[url][0][field] != head_no_h1[url][0][field] for url in no_h1_pages for field in HEAD_FIELDS):
+            failures.append(f"head-only cambió title/metas/canonical en páginas {label}")
+        if no_h1_policy.stats['head_only_fallback_stops'] != len(no_h1_pages) \
+                or per_page > HEAD_ONLY_BODY_BUDGET + 2 * DOWNLOAD_CHUNK_SIZE:
+            failures.append(f"head-only descargó las páginas {label} más allá del presupuesto tras el head")
+
+    server.shutdown()
+    if failures:
+        sys.exit("❌ ERROR: " + "; ".join(failures))
+    print("✅ Límites de descarga y modo head-only correctos.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Comprobación y benchmark del planificador de peticiones (fetch_scheduler.FetchScheduler)
+contra un servidor local con fallos inyectados (stub_server.py, `?fail=N&fault=...`).
+
+Escenarios (cada uno con un servidor nuevo, porque los fallos dependen del número de
+peticiones recibidas por URL):
+  1. Fallos transitorios: 503/502 repetidos, conexiones cerradas sin respuesta y 429 con
+     Retry-After. Sin planificador se convierten en errores; con él deben recuperarse
+     todos y dar los mismos resultados que un servidor sin fallos.
+  2. Host rápido que se cuelga de vez en cuando: con el tiempo de espera fijo cada página
+     colgada bloquea un hilo `--hang` segundos; con tiempos adaptativos se corta antes
+     (la espera de lectura no baja de 7,5 s) y se reintenta. Antes de medir, ambas
+     ejecuciones descargan unas páginas de calentamiento del mismo host para que el
+     planificador tenga ya sus muestras de latencia (con menos de ADAPTIVE_MIN_SAMPLES
+     usa la espera fija de 15 s); la adaptativa debe tardar menos de 3/4 de la fija.
+  3. Host caído (siempre 503): sin cortacircuitos cada URL agota sus reintentos; con él,
+     tras unos pocos fallos el resto se rechaza al instante.
+
+Uso:
+    python benchmarks/bench_fetch_scheduler.py --urls 60 --workers 8 --hang 14
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import seo_auditor  # noqa: E402
+from fetch_scheduler import FetchScheduler, ADAPTIVE_MIN_SAMPLES, DEFAULT_TIMEOUT  # noqa: E402
+from stub_server import start_stub_server  # noqa: E402
+
+
+ADAPTIVE_SPEEDUP = 0.75   # La ejecución adaptativa debe tardar menos que esta fracción de la fija
+
+
+def run(urls_for: Callable[[str], List[str]], args: argparse.Namespace, scheduler: Optional[FetchScheduler],
+        latency: float = 0.0, warmup: int = 0) -> Tuple[Dict[str, dict], float, int, str]:
+    """
+    Audita las URLs contra un servidor nuevo:
+    (resultados por página, segundos, peticiones recibidas, URL base).
+    Antes de medir se descargan `warmup` páginas sin fallos del mismo host.
+    """
+    server, base_url = start_stub_server(latency=latency)
+    urls = urls_for(base_url)
+    for _ in seo_auditor.extract_seo_data_concurrently([f"{base_url}/calentamiento/{i}" for i in range(warmup)],
+                                                       args.workers, args.workers, 'bs4', None, scheduler):
+        pass
+    start = time.perf_counter()
+    results = {seo['url_analizada'].split('?')[0].rsplit('/', 1)[-1]: seo for seo, _ in
+               seo_auditor.extract_seo_data_concurrently(urls, args.workers, args.workers, 'bs4', None, scheduler)}
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+    return results, elapsed, sum(server.requests_seen.values()), base_url
+
+
+def comparable(results: Dict[str, dict]) -> Dict[str, tuple]:
+    """Campos SEO sin la URL (que incluye los parámetros de fallo)."""
+    return {page: (seo['title'], seo['meta_description'], seo['h1'], seo['h2'], seo['error'])
+            for page, seo in results.items()}
+
+
+def count_errors(results: Dict[str, dict]) -> int:
+    return sum(1 for seo in results.values() if seo['error'])
+
+
+def new_scheduler(args: argparse.Namespace, **kwargs) -> FetchScheduler:
+    return FetchScheduler(args.retries, backoff_base=args.backoff_base, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--urls', type=int, default=60)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--retries', type=int, default=3)
+    parser.add_argument('--backoff-base', type=float, default=0.1,
+                        help="Base de la espera exponencial (menor que la del CLI para acortar el benchmark).")
+    parser.add_argument('--hang', type=float, default=14.0, help="Segundos que tarda una página colgada.")
+    args = parser.parse_args()
+    if args.hang >= DEFAULT_TIMEOUT:
+        parser.error(f"--hang debe ser menor que la espera fija ({DEFAULT_TIMEOUT:.0f} s) para comparar ambas.")
+    failures: List[str] = []
+
+    # --- 1. Fallos transitorios ---------------------------------------------
+    faults = ['fail=2&fault=503', 'fail=1&fault=reset', 'fail=1&fault=429&retry_after=1', 'fail=1&fault=502']
+
+    def transient_urls(base_url: str) -> List[str]:
+        return [f"{base_url}/pagina/{i}" + (f"?{faults[i % 10]}" if i % 10 < len(faults) else "")
+                for i in range(args.urls)]
+
+    clean = run(lambda base_url: [f"{base_url}/pagina/{i}" for i in range(args.urls)], args, None)[0]
+    single, single_time, _, _ = run(transient_urls, args, None)
+    scheduler = new_scheduler(args)
+    retried, retried_time, seen, _ = run(transient_urls, args, scheduler)
+    print(f"1. Fallos transitorios ({sum(1 for i in range(args.urls) if i % 10 < len(faults))} de {args.urls} URLs):")
+    print(f"   un intento     : {count_errors(single):3} errores | {single_time:6.2f} s")
+    print(f"   planificador   : {count_errors(retried):3} errores | {retried_time:6.2f} s | {seen} peticiones")
+    print(f"   {scheduler.summary()}")
+    if comparable(retried) != comparable(clean):
+        failures.append("los resultados con reintentos difieren de los del servidor sin fallos")
+    if scheduler.stats['retry_after'] == 0:
+        failures.append("no se respetó ningún Retry-After")
+
+    # --- 2. Host que se cuelga ----------------------------------------------
+    def hanging_urls(base_url: str) -> List[str]:
+        return [f"{base_url}/pagina/{i}" + (f"?fail=1&fault=hang&hang={args.hang}" if i % 10 == 9 else "")
+                for i in range(args.urls)]
+
+    warmup = 2 * ADAPTIVE_MIN_SAMPLES
+    fixed, fixed_time, _, _ = run(hanging_urls, args, new_scheduler(args, adaptive_timeouts=False), latency=0.02,
+                                  warmup=warmup)
+    scheduler = new_scheduler(args)
+    adaptive, adaptive_time, _, base_url = run(hanging_urls, args, scheduler, latency=0.02, warmup=warmup)
+    print(f"2. Host que se cuelga {args.hang:.0f} s en {args.urls // 10} de {args.urls} URLs:")
+    print(f"   tiempo fijo    : {count_errors(fixed):3} errores | {fixed_time:6.2f} s")
+    print(f"   adaptativo     : {count_errors(adaptive):3} errores | {adaptive_time:6.2f} s | "
+          f"{scheduler.stats['timeouts']} timeouts | espera de lectura aprendida "
+          f"{scheduler.get_timeouts(base_url)[1]:.1f} s")
+    if count_errors(adaptive) or comparable(adaptive) != comparable(fixed):
+        failures.append("los tiempos de espera adaptativos cambiaron los resultados")
+    if adaptive_time >= ADAPTIVE_SPEEDUP * fixed_time:
+        failures.append(f"los tiempos de espera adaptativos no acortaron la ejecución por debajo de "
+                        f"{ADAPTIVE_SPEEDUP:.2f} x la fija ({adaptive_time:.2f} s frente a {fixed_time:.2f} s)")
+    if scheduler.stats['timeouts'] != args.urls // 10:
+        failures.append(f"se esperaban {args.urls // 10} timeouts adaptativos, hubo {scheduler.stats['timeouts']}")
+
+    # --- 3. Host caído ------------------------------------------------------
+    def dead_urls(base_url: str) -> List[str]:
+        return [f"{base_url}/pagina/{i}?fail=1000&fault=503" for i in range(args.urls)]
+
+    no_circuit, no_circuit_time, no_circuit_seen, _ = run(dead_urls, args, new_scheduler(args, circuit_threshold=0))
+    scheduler = new_scheduler(args)
+    circuit, circuit_time, circuit_seen, _ = run(dead_urls, args, scheduler)
+    print(f"3. Host caído ({args.urls} URLs, siempre 503):")
+    print(f"   sin circuito   : {no_circuit_seen:4} peticiones | {no_circuit_time:6.2f} s")
+    print(f"   cortacircuitos : {circuit_seen:4} peticiones | {circuit_time:6.2f} s | "
+          f"{scheduler.stats['circuit_rejected']} rechazadas sin conectar")
+    if count_errors(circuit) != args.urls or count_errors(no_circuit) != args.urls:
+        failures.append("el host caído debería dar error en todas las URLs")
+    if circuit_seen >= no_circuit_seen:
+        failures.append("el cortacircuitos no redujo las peticiones al host caído")
+
+    if failures:
+        sys.exit("❌ ERROR: " + "; ".join(failures))
+    print("✅ Reintentos, tiempos adaptativos y cortacircuitos se comportan como se espera.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Comprobación de que la caché HTTP (http_cache.HTTPCache) conserva el cuerpo exacto.
+
+1. Ida y vuelta: store() + read_body() con cuerpos con saltos de línea LF, CRLF, CR,
+   mezclados y texto Unicode; el cuerpo leído debe ser idéntico al guardado.
+2. De extremo a extremo: seo_auditor.py --cache audita dos veces `--urls` páginas de un
+   servidor local servidas con saltos CRLF y CR (`?newline=`). En la segunda ejecución
+   todas deben ser aciertos 304 y el HTML guardado en index/ debe ser byte a byte el
+   que envió el servidor (si no, cambia su hash y se invalidan el manifiesto incremental
+   y la reutilización de --dedup).
+
+Uso:
+    python benchmarks/bench_http_cache.py --urls 40
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import urllib.request
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from http_cache import HTTPCache  # noqa: E402
+from report_storage import STORAGE_MANIFEST_FILE, open_stored_file  # noqa: E402
+from stub_server import start_stub_server  # noqa: E402
+
+BODIES = {
+    'LF': "<html>\n<body>\n<h1>Título</h1>\n</body>\n</html>\n",
+    'CRLF': "<html>\r\n<body>\r\n<h1>Título</h1>\r\n</body>\r\n</html>\r\n",
+    'CR': "<html>\r<body>\r<h1>Título</h1>\r</body>\r</html>\r",
+    'mezclados': "<html>\r\n<body>\n<p>a\rb</p>\r\n\r</body></html>",
+    'Unicode': "<p>información señal\u0085€</p>\r\n",
+}
+
+
+def check_round_trip(workdir: str) -> List[str]:
+    failures = []
+    cache = HTTPCache(os.path.join(workdir, 'cache_ida_vuelta'))
+    print("1. Ida y vuelta store() + read_body():")
+    for name, body in BODIES.items():
+        url = f"http://ejemplo.test/{name}"
+        cache.store(url, '"x"', None, body, {'url_analizada': url})
+        read = cache.read_body(url)
+        mark = '✅' if read == body else '❌'
+        print(f"   {mark} {name:10} {len(body)} caracteres")
+        if read != body:
+            failures.append(f"el cuerpo {name} vuelve distinto de la caché")
+    return failures
+
+
+def stored_html(workdir: str) -> Dict[str, bytes]:
+    """HTML guardado en index/ por URL, según el manifiesto de almacenamiento."""
+    files = {}
+    with open(os.path.join(workdir, STORAGE_MANIFEST_FILE), 'r', encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            if record['extension'] == '.html':
+                files[record['url']] = record['path']
+    contents = {}
+    for url, path in files.items():
+        with open_stored_file(os.path.join(workdir, path)) as f:
+            contents[url] = f.read()
+    return contents
+
+
+def run_cli(workdir: str) -> str:
+    command = [sys.executable, os.path.join(ROOT, 'seo_auditor.py'), '--cache', '--no-results-db', '--no-journal']
+    process = subprocess.run(command, cwd=workdir, capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(f"seo_auditor.py terminó con código {process.returncode}: {process.stderr[-300:]}")
+    return process.stdout
+
+
+def check_end_to_end(workdir: str, args: argparse.Namespace) -> List[str]:
+    failures = []
+    server, base_url = start_stub_server()
+    urls = [f"{base_url}/pagina/{i}?newline={('crlf', 'cr')[i % 2]}" for i in range(args.urls)]
+    sent = {}
+    for url in urls:
+        with urllib.request.urlopen(url) as response:
+            sent[url] = response.read()
+
+    run_dir = os.path.join(workdir, 'auditoria')
+    os.makedirs(run_dir)
+    with open(os.path.join(run_dir, 'urls.txt'), 'w', encoding='utf-8') as f:
+        f.write("\n".join(urls))
+    run_cli(run_dir)
+    first = stored_html(run_dir)
+    output = run_cli(run_dir)
+    second = stored_html(run_dir)
+    server.shutdown()
+
+    match = re.search(r"(\d+) aciertos \(304\)", output)
+    hits = int(match.group(1)) if match else 0
+    changed = sum(second.get(url) != body for url, body in sent.items())
+    print(f"2. De extremo a extremo ({args.urls} URLs con saltos CRLF y CR, dos ejecuciones con --cache):")
+    print(f"   aciertos 304 en la segunda: {hits}/{args.urls} | HTML distinto del enviado: "
+          f"{sum(first.get(url) != body for url, body in sent.items())} en la primera, {changed} en la segunda")
+    if hits != args.urls:
+        failures.append(f"la segunda ejecución tuvo {hits} aciertos 304 en lugar de {args.urls}")
+    if changed or first != second:
+        failures.append(f"el HTML guardado tras un 304 difiere del enviado por el servidor en {changed} URLs")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--urls', type=int, default=40)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='bench_cache_') as workdir:
+        failures = check_round_trip(workdir)
+        failures += check_end_to_end(workdir, args)
+
+    if failures:
+        sys.exit("❌ ERROR: " + "; ".join(failures))
+    print("✅ La caché HTTP devuelve los cuerpos byte a byte, con cualquier salto de línea.")
+
+
+if __name__ == "__main__":
+    main()
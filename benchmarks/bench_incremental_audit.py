@@ -0,0 +1,83 @@
+"""
+Comprobación y benchmark del análisis incremental con manifiesto.
+
+Simula varias ejecuciones sobre un corpus sintético: archivos modificados, añadidos,
+eliminados, tocados sin cambios (solo mtime), keywords nuevas y keywords retiradas.
+En CADA ronda exige que los totales del modo incremental sean idénticos a los de un
+análisis completo, y muestra los tiempos de ambos.
+
+Uso:
+    python benchmarks/bench_incremental_audit.py --keywords 500 --files 200 --file-kb 50
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import keyword_auditor  # noqa: E402
+from bench_keyword_index import timed  # noqa: E402
+from bench_keyword_matching import generate_corpus, generate_keywords  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--keywords', type=int, default=500)
+    parser.add_argument('--files', type=int, default=200)
+    parser.add_argument('--file-kb', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    all_keywords = generate_keywords(args.keywords + args.keywords // 10, rng)
+    keywords = sorted(all_keywords[:args.keywords])
+
+    with tempfile.TemporaryDirectory() as folder:
+        files = generate_corpus(folder, all_keywords, args.files, args.file_kb, rng)
+        manifest_path = os.path.join(folder, 'manifiesto.json')
+
+        def modify(count):
+            for path in rng.sample(files, min(count, len(files))):
+                with open(path, 'a', encoding='utf-8') as f:
+                    f.write(' ' + ' '.join(rng.choice(all_keywords) for _ in range(30)))
+
+        def touch(count):
+            for path in rng.sample(files, min(count, len(files))):
+                os.utime(path, (time.time() + 5, time.time() + 5))
+
+        def add_and_remove():
+            files.remove(rng.choice(files))
+            extra_folder = tempfile.mkdtemp(dir=folder)
+            files.extend(generate_corpus(extra_folder, all_keywords, 3, args.file_kb, rng))
+
+        def change_keywords():
+            keywords[:] = sorted(set(keywords[5:]) | set(all_keywords[args.keywords:]))
+
+        rounds = [
+            ("Primera ejecución (manifiesto vacío)", lambda: None),
+            ("Sin cambios", lambda: None),
+            ("5 archivos modificados", lambda: modify(5)),
+            ("5 archivos tocados (solo mtime)", lambda: touch(5)),
+            ("Archivos añadidos y eliminados", add_and_remove),
+            ("Keywords nuevas y retiradas", change_keywords),
+        ]
+
+        print(f"Keywords: {args.keywords} | Archivos: {args.files} x ~{args.file_kb} KB")
+        for name, change in rounds:
+            change()
+            (full, _), full_time = timed(keyword_auditor.analyze_keywords_in_reports, keywords, files)
+            (incremental, _), incremental_time = timed(keyword_auditor.analyze_keywords_incrementally,
+                                                  keywords, files, manifest_path)
+            if full != incremental:
+                sys.exit(f"❌ ERROR en la ronda '{name}': el modo incremental difiere del análisis completo.")
+            print(f"  {name:38}: completo {full_time:7.2f} s | incremental {incremental_time:7.2f} s")
+
+    print("✅ Totales idénticos al análisis completo en todas las rondas.")
+
+
+if __name__ == "__main__":
+    main()
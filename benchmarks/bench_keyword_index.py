@@ -0,0 +1,106 @@
+"""
+Benchmark: análisis directo (lectura de todos los archivos) vs. índice persistente
+(SQLite FTS5 con trigramas) en frío, en caliente y tras modificar unos pocos archivos.
+
+Verifica que los resultados son idénticos en todos los casos y que, al alternar dos
+listas de keywords con la memoria de keywords limitada a una lista, el índice olvida las
+de la consulta anterior (sus filas de conteo no se acumulan) sin cambiar los resultados.
+
+Uso:
+    python benchmarks/bench_keyword_index.py --keywords 500 --files 200 --file-kb 50
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import keyword_auditor  # noqa: E402
+from keyword_index import KeywordIndex  # noqa: E402
+from bench_keyword_matching import generate_corpus, generate_keywords  # noqa: E402
+
+
+def timed(func, *args):
+    """Ejecuta func en silencio y devuelve (resultado, segundos)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = func(*args)
+        return result, time.perf_counter() - start
+
+
+def check_eviction(keywords, files, index_path) -> bool:
+    """Alterna dos mitades de la lista con max_cached_keywords = una mitad."""
+    halves = (keywords[:len(keywords) // 2], keywords[len(keywords) // 2:])
+    limit = max(len(dict.fromkeys(half)) for half in halves)
+    ok = True
+    for round_number, half in enumerate(halves * 2):
+        index = KeywordIndex(index_path, max_cached_keywords=limit)
+        try:
+            index.sync(files, keyword_auditor.read_file_content_robustly)
+            counts = index.count_keywords(half)
+            cached = {row[0] for row in index.conn.execute("SELECT keyword FROM cached_keywords")}
+            counted = {row[0] for row in index.conn.execute("SELECT DISTINCT keyword FROM keyword_counts")}
+            evicted = index.evicted_keywords
+        finally:
+            index.close()
+        (direct, _), _ = timed(keyword_auditor.analyze_keywords_in_reports, half, files)
+        expected = {row['keyword']: row['coincidencias'] for row in direct}
+        totals = {keyword: sum(by_file.values()) for keyword, by_file in counts.items()}
+        ok &= cached == set(half) and counted <= set(half) and totals == expected
+        print(f"  Ronda {round_number + 1} ({len(half)} keywords, límite {limit}): {evicted} olvidadas | "
+              f"{len(cached)} memorizadas")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--keywords', type=int, default=500)
+    parser.add_argument('--files', type=int, default=200)
+    parser.add_argument('--file-kb', type=int, default=50)
+    parser.add_argument('--changed', type=int, default=5, help="Archivos modificados antes de la última ronda.")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    keywords = generate_keywords(args.keywords, rng)
+
+    with tempfile.TemporaryDirectory() as folder:
+        files = generate_corpus(folder, keywords, args.files, args.file_kb, rng)
+        index_path = os.path.join(folder, 'indice.sqlite')
+
+        (direct, _), direct_time = timed(keyword_auditor.analyze_keywords_in_reports, keywords, files)
+        (cold, _), cold_time = timed(keyword_auditor.analyze_keywords_with_index, keywords, files, index_path)
+        (warm, _), warm_time = timed(keyword_auditor.analyze_keywords_with_index, keywords, files, index_path)
+
+        # Simular el crecimiento del corpus: se añade texto a unos pocos archivos
+        for path in rng.sample(files, min(args.changed, len(files))):
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(' ' + ' '.join(rng.choice(keywords) for _ in range(50)))
+        (direct_after, _), _ = timed(keyword_auditor.analyze_keywords_in_reports, keywords, files)
+        (incremental, _), incremental_time = timed(keyword_auditor.analyze_keywords_with_index, keywords, files, index_path)
+
+        print("Memoria de keywords limitada (LRU):")
+        eviction_ok = check_eviction(keywords, files, os.path.join(folder, 'indice_lru.sqlite'))
+
+    if not (direct == cold == warm) or direct_after != incremental:
+        sys.exit("❌ ERROR: Los resultados del índice difieren del análisis directo.")
+    if not eviction_ok:
+        sys.exit("❌ ERROR: El índice no olvidó las keywords antiguas o sus resultados difieren del análisis directo.")
+
+    print(f"Keywords: {args.keywords} | Archivos: {args.files} x ~{args.file_kb} KB")
+    print(f"  Análisis directo                 : {direct_time:8.2f} s")
+    print(f"  Índice en frío (construcción)    : {cold_time:8.2f} s")
+    print(f"  Índice en caliente               : {warm_time:8.2f} s "
+          f"({warm_time / args.keywords * 1000:.2f} ms por keyword)")
+    print(f"  Índice tras modificar archivos   : {incremental_time:8.2f} s ({args.changed} archivos)")
+    print("✅ Resultados idénticos en todos los casos.")
+
+
+if __name__ == "__main__":
+    main()
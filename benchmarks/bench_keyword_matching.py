@@ -0,0 +1,154 @@
+"""
+Benchmark: motor Aho-Corasick de una sola pasada vs. bucle anidado original
+(keyword x archivo, releyendo cada archivo por cada keyword).
+
+Genera un corpus sintético en un directorio temporal, verifica que ambos métodos
+devuelven exactamente los mismos conteos y muestra los tiempos.
+
+Después busca el punto de corte con el contenido ya en memoria: para cada número de
+keywords de `--crossover-sizes` compara un `str.count` por keyword con el autómata en
+Python puro, comprueba que los conteos coinciden y lo compara con AUTOMATON_MIN_KEYWORDS
+(por debajo, count_keywords_in_content usa `str.count`).
+
+Uso:
+    python benchmarks/bench_keyword_matching.py --keywords 500 --files 50 --file-kb 200
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import keyword_auditor  # noqa: E402
+from keyword_matching import AUTOMATON_MIN_KEYWORDS, build_keyword_automaton, count_keywords_in_content  # noqa: E402
+
+
+def generate_keywords(n: int, rng: random.Random) -> List[str]:
+    """Genera n palabras clave únicas (algunas de varias palabras)."""
+    alphabet = 'abcdefghijklmnopqrstuvwxyzñáéíóú'
+    keywords = set()
+    while len(keywords) < n:
+        words = [''.join(rng.choice(alphabet) for _ in range(rng.randint(3, 9)))
+                 for _ in range(rng.randint(1, 3))]
+        keywords.add(' '.join(words))
+    return sorted(keywords)
+
+
+def generate_corpus(folder: str, keywords: List[str], n_files: int, file_kb: int, rng: random.Random) -> List[str]:
+    """Escribe n_files archivos HTML de ~file_kb KB mezclando keywords y relleno."""
+    paths = []
+    filler = ['<div class="x">', '</div>', 'lorem', 'ipsum', 'dolor', '<p>', '</p>', 'sit', 'amet']
+    for i in range(n_files):
+        chunks: List[str] = []
+        size = 0
+        while size < file_kb * 1024:
+            token = rng.choice(keywords) if rng.random() < 0.2 else rng.choice(filler)
+            token = token.upper() if rng.random() < 0.1 else token
+            chunks.append(token)
+            size += len(token) + 1
+        path = os.path.join(folder, f"pagina_{i}.html")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(' '.join(chunks))
+        paths.append(path)
+    return paths
+
+
+def legacy_analyze(keywords: List[str], all_files: List[str]) -> List[Dict[str, Any]]:
+    """Reproducción del algoritmo original: relee y recuenta cada archivo por keyword."""
+    results = []
+    for keyword in keywords:
+        match_count = 0
+        found_in_files = []
+        for file_path in all_files:
+            content = keyword_auditor.read_file_content_robustly(file_path)
+            if content:
+                count = content.count(keyword)
+                if count > 0:
+                    match_count += count
+                    found_in_files.append(os.path.join(os.path.basename(os.path.dirname(file_path)),
+                                                       os.path.basename(file_path)))
+        results.append({
+            'keyword': keyword,
+            'coincidencias': match_count,
+            'archivos_encontrados': ' | '.join(found_in_files) if found_in_files else 'No encontrada'
+        })
+    return results
+
+
+def find_crossover(contents: List[str], all_keywords: List[str], sizes: List[int]) -> bool:
+    """Tiempos de str.count frente al autómata por número de keywords; False si los conteos difieren."""
+    print(f"Punto de corte ({len(contents)} archivos en memoria):")
+    print(f"  {'keywords':>8} | {'str.count':>9} | {'autómata':>9}")
+    crossover = None
+    for size in sizes:
+        keywords = all_keywords[:size]
+        timings, counts = {}, {}
+        for name, min_keywords in (('str.count', float('inf')), ('autómata', 0)):
+            automaton = build_keyword_automaton(keywords, min_automaton_keywords=min_keywords)
+            start = time.perf_counter()
+            counts[name] = [count_keywords_in_content(automaton, content) for content in contents]
+            timings[name] = time.perf_counter() - start
+        if counts['str.count'] != counts['autómata']:
+            return False
+        if crossover is None and timings['autómata'] < timings['str.count']:
+            crossover = size
+        print(f"  {size:>8} | {timings['str.count']:>7.2f} s | {timings['autómata']:>7.2f} s")
+    print(f"  El autómata compensa desde {crossover if crossover else f'más de {sizes[-1]}'} keywords "
+          f"(AUTOMATON_MIN_KEYWORDS = {AUTOMATON_MIN_KEYWORDS}).")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--keywords', type=int, default=500)
+    parser.add_argument('--files', type=int, default=50)
+    parser.add_argument('--file-kb', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--crossover-sizes', default='25,50,100,200,400,800',
+                        help="Números de keywords para buscar el punto de corte (vacío = no medir).")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    keywords = generate_keywords(args.keywords, rng)
+
+    with tempfile.TemporaryDirectory() as folder:
+        files = generate_corpus(folder, keywords, args.files, args.file_kb, rng)
+
+        start = time.perf_counter()
+        legacy = legacy_analyze(keywords, files)
+        legacy_time = time.perf_counter() - start
+
+        # Silenciamos la salida por keyword del analizador para no distorsionar la medición
+        stdout = sys.stdout
+        sys.stdout = open(os.devnull, 'w')
+        try:
+            start = time.perf_counter()
+            single_pass, _ = keyword_auditor.analyze_keywords_in_reports(keywords, files)
+            single_pass_time = time.perf_counter() - start
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+
+        sizes = [int(value) for value in args.crossover_sizes.split(',') if value]
+        if sizes:
+            contents = [keyword_auditor.read_file_content_robustly(path) for path in files[:10]]
+            crossover_ok = find_crossover(contents, generate_keywords(max(sizes), rng), sizes)
+
+    if legacy != single_pass:
+        sys.exit("❌ ERROR: Los conteos del motor Aho-Corasick difieren del bucle original.")
+    if sizes and not crossover_ok:
+        sys.exit("❌ ERROR: Los conteos con str.count y con el autómata difieren.")
+
+    print(f"Keywords: {args.keywords} | Archivos: {args.files} x ~{args.file_kb} KB")
+    print(f"  Bucle anidado original : {legacy_time:8.2f} s")
+    print(f"  Aho-Corasick 1 pasada  : {single_pass_time:8.2f} s")
+    print(f"  Aceleración            : {legacy_time / single_pass_time:8.1f}x")
+    print("✅ Conteos idénticos en ambos métodos.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Benchmark: agregación de conteos con la matriz dispersa keyword x documento
+(keyword_matrix.KeywordDocumentMatrix) frente a los bucles de Python anteriores.
+
+Para cada tamaño N genera N keywords y N documentos con conteos sintéticos
+(`--density` = fracción de keywords presentes en cada documento) y mide:
+  - construcción: bucle por keyword y documento (lista de archivos por keyword)
+    vs. alta de cada documento en la matriz;
+  - agregaciones: totales y archivos por keyword, totales por documento y por dominio.
+Comprueba que ambos métodos dan exactamente los mismos resultados.
+
+Después mide la escritura del reporte (keyword_auditor.save_results_to_xlsx) para
+`--write-size` keywords x documentos con cada destino del desglose largo (`--breakdown`):
+hoja del XLSX, CSV junto al XLSX o ninguno, y comprueba que el CSV tiene todas las filas.
+
+Uso:
+    python benchmarks/bench_keyword_matrix.py --sizes 1000,5000,10000 --density 0.01 --write-size 2000
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import keyword_auditor  # noqa: E402
+from keyword_matrix import KeywordDocumentMatrix, get_document_domain  # noqa: E402
+
+
+def document_counts(rng: np.random.Generator, n_keywords: int, density: float) -> List[int]:
+    """Conteos de un documento como los devuelve count_keywords_in_file (lista de enteros)."""
+    counts = np.zeros(n_keywords, dtype=np.int64)
+    present = rng.choice(n_keywords, size=max(1, int(n_keywords * density)), replace=False)
+    counts[present] = rng.integers(1, 20, size=present.size)
+    return counts.tolist()
+
+
+def legacy_aggregate(keywords: List[str], names: List[str], all_counts):
+    """Bucles de Python: lo que hacía analyze_keywords_in_reports, más totales por documento/dominio."""
+    match_counts = [0] * len(keywords)
+    found_in_files: List[List[str]] = [[] for _ in keywords]
+    document_totals = [0] * len(names)
+    domain_totals: Dict[str, int] = {}
+    domain_keywords: Dict[str, set] = {}
+    for doc_index, file_counts in enumerate(all_counts):
+        domain = get_document_domain(names[doc_index])
+        for idx, count in enumerate(file_counts):
+            if count > 0:
+                match_counts[idx] += count
+                found_in_files[idx].append(names[doc_index])
+                document_totals[doc_index] += count
+                domain_totals[domain] = domain_totals.get(domain, 0) + count
+                domain_keywords.setdefault(domain, set()).add(idx)
+    return match_counts, found_in_files, document_totals, domain_totals, \
+        {domain: len(kws) for domain, kws in domain_keywords.items()}
+
+
+def matrix_aggregate(keywords: List[str], names: List[str], all_counts):
+    """Matriz dispersa + operaciones vectorizadas."""
+    matrix = KeywordDocumentMatrix(keywords, names)
+    for doc_index, file_counts in enumerate(all_counts):
+        matrix.add_document_counts(doc_index, file_counts)
+    build_done = time.perf_counter()
+    domains = matrix.domain_summary()
+    return (matrix.keyword_totals().tolist(), matrix.found_in_files(), matrix.document_totals().tolist(),
+            dict(zip(domains['Dominio'], domains['Coincidencias Totales'].tolist())),
+            dict(zip(domains['Dominio'], domains['Keywords Distintas'].tolist()))), build_done
+
+
+def check_report_writing(size: int, args: argparse.Namespace) -> bool:
+    """Segundos de save_results_to_xlsx con cada destino del desglose; False si el CSV pierde filas."""
+    rng = np.random.default_rng(args.seed)
+    keywords = [f"keyword {i}" for i in range(size)]
+    names = [f"index/dominio{i % args.domains}_com_{i:016x}.html" for i in range(size)]
+    matrix = KeywordDocumentMatrix(keywords, names)
+    for doc_index in range(size):
+        matrix.add_document_counts(doc_index, document_counts(rng, size, args.density))
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = keyword_auditor.build_keyword_results(matrix)
+    rows = len(matrix.to_long_dataframe())
+
+    print(f"Escritura del reporte ({size} x {size}, {rows} filas de desglose):")
+    ok = True
+    with tempfile.TemporaryDirectory(prefix='bench_matrix_') as folder:
+        for breakdown in keyword_auditor.BREAKDOWN_FORMATS:
+            output_file = f"reporte_{breakdown}.xlsx"
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                keyword_auditor.save_results_to_xlsx(results, output_file, folder, matrix, breakdown)
+                seconds = time.perf_counter() - start
+            csv_path = os.path.join(folder, f"reporte_{breakdown}{keyword_auditor.BREAKDOWN_CSV_SUFFIX}")
+            if breakdown == 'csv':
+                with open(csv_path, 'r', encoding='utf-8-sig') as f:
+                    csv_rows = sum(1 for _ in f) - 1
+                ok &= csv_rows == rows
+            print(f"  --breakdown {breakdown:<4}: {seconds:6.2f} s")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1000,5000,10000', help="Tamaños N (N keywords x N documentos).")
+    parser.add_argument('--density', type=float, default=0.01)
+    parser.add_argument('--domains', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--write-size', type=int, default=2000,
+                        help="N para medir la escritura del reporte con cada --breakdown (0 = no medir).")
+    args = parser.parse_args()
+
+    print(f"{'N keywords x N documentos':>26} | {'celdas != 0':>11} | {'bucles Python':>13} | "
+          f"{'matriz (alta + agreg.)':>24} | aceleración")
+    for size in (int(value) for value in args.sizes.split(',')):
+        rng = np.random.default_rng(args.seed)
+        keywords = [f"keyword {i}" for i in range(size)]
+        names = [f"index/dominio{i % args.domains}_com_{i:016x}.html" for i in range(size)]
+        # Los conteos se generan una vez y se reutilizan en ambos métodos
+        all_counts = [document_counts(rng, size, args.density) for _ in range(size)]
+
+        start = time.perf_counter()
+        legacy = legacy_aggregate(keywords, names, all_counts)
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        vectorized, build_done = matrix_aggregate(keywords, names, all_counts)
+        matrix_time = time.perf_counter() - start
+        build_time = build_done - start
+
+        if legacy != vectorized:
+            sys.exit(f"❌ ERROR: Los resultados difieren para N={size}.")
+
+        nnz = sum(len(files) for files in legacy[1])
+        print(f"{size:>12} x {size:<11} | {nnz:>11} | {legacy_time:>11.2f} s | "
+              f"{matrix_time:>6.2f} s ({build_time:.2f} + {matrix_time - build_time:.2f}) | {legacy_time / matrix_time:8.1f}x")
+        del all_counts
+
+    print("✅ Resultados idénticos con ambos métodos en todos los tamaños.")
+
+    if args.write_size and not check_report_writing(args.write_size, args):
+        sys.exit("❌ ERROR: El CSV del desglose no tiene todas las filas.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+"""
+Benchmark y comprobación de los dos modos de búsqueda de keyword_auditor.py (`--match`):
+
+- raw: subcadenas del contenido en minúsculas, marcado incluido (modo original).
+- words: palabras o frases completas del texto visible, sin distinguir acentos; el
+  marcado se quita una vez por documento y todas las keywords comparten un autómata.
+
+1. Casos: 'seo' no cuenta en 'seoul' ni en atributos (tampoco si el valor entre
+   comillas contiene '>', con el documento cortado en cualquier punto), scripts o comentarios;
+   'información' cuenta en 'informacion', 'INFORMACIÓN' e 'informaci&oacute;n'; las
+   frases cuentan aunque crucen etiquetas.
+2. Paridad: el modo words da los mismos conteos que una implementación de referencia
+   independiente (html.parser + una expresión regular por keyword), con el lector
+   robusto, con --mmap y con el documento cortado en fragmentos de cualquier tamaño.
+3. Tiempos sobre un corpus HTML sintético: raw, words, words + mmap y la referencia
+   (una pasada de regex por keyword).
+
+Uso:
+    python benchmarks/bench_keyword_words.py --keywords 500 --files 50 --file-kb 200
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import unicodedata
+from html.parser import HTMLParser
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import keyword_auditor  # noqa: E402
+from keyword_matching import build_keyword_automaton, count_keywords_in_chunks, count_keywords_in_content  # noqa: E402
+
+HIDDEN_TAGS = {'script', 'style', 'noscript', 'template'}
+ACCENTS = str.maketrans('áéíóúñ', 'aeioun')
+CASES = [
+    # (documento, keyword, coincidencias esperadas en el modo words)
+    ('<p>Auditoría SEO en Seoul</p>', 'seo', 1),
+    ('<a href="/seo" title="seo">enlace</a><script>var seo = 1;</script><!-- seo -->', 'seo', 0),
+    ('<p>informacion, INFORMACIÓN e informaci&oacute;n</p>', 'información', 3),
+    ('<h1>Guía <b>SEO</b></h1><p>on-page</p>', 'guía seo on page', 1),
+    ('<p>posicionamientoweb</p>', 'posicionamiento', 0),
+    ('<style>.compañia { color: red }</style><p>Compañía</p>', 'compañía', 1),
+    ('<p>precio &lt; 10 €</p>', 'precio', 1),
+    ("<a title='>seo'>seo</a>", 'seo', 1),
+    ('<img alt="a > seo" src=x>seo <a href=a\'seo>enlace</a>', 'seo', 1),
+]
+# Documentos con un '>' dentro de un valor entre comillas, cortados en todas las posiciones
+SPLIT_CASES = [
+    ("<p>uno</p><a title='>seo > seo' href=\"/x>seo\">seo</a><p>dos seo</p>", 'seo', 2),
+]
+
+
+class ReferenceText(HTMLParser):
+    """Texto visible con html.parser (implementación de referencia, independiente)."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self.hidden = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in HIDDEN_TAGS:
+            self.hidden += 1
+
+    def handle_endtag(self, tag):
+        if tag in HIDDEN_TAGS and self.hidden:
+            self.hidden -= 1
+
+    def handle_data(self, data):
+        if not self.hidden:
+            self.parts.append(data)
+
+
+def reference_normalize(text: str) -> str:
+    return ''.join(ch for ch in unicodedata.normalize('NFKD', text.casefold()) if not unicodedata.combining(ch))
+
+
+def reference_counts(keywords: List[str], content: str) -> List[int]:
+    """Una expresión regular por keyword sobre el texto visible normalizado."""
+    parser = ReferenceText()
+    parser.feed(content)
+    parser.close()
+    text = ' '.join(re.findall(r'\w+', reference_normalize(' '.join(parser.parts))))
+    counts = []
+    for keyword in keywords:
+        words = re.findall(r'\w+', reference_normalize(keyword))
+        if not words:
+            counts.append(0)
+            continue
+        pattern = r'(?<!\w)' + r'\s'.join(map(re.escape, words)) + r'(?!\w)'
+        counts.append(len(re.findall(pattern, text)))
+    return counts
+
+
+def generate_keywords(n: int, rng: random.Random) -> List[str]:
+    """Keywords de una a tres palabras, con acentos y algunas palabras muy cortas."""
+    alphabet = 'abcdefghijklmnopqrstuvwxyzñáéíóú'
+    keywords = set()
+    while len(keywords) < n:
+        keywords.add(' '.join(''.join(rng.choice(alphabet) for _ in range(rng.randint(2, 9)))
+                              for _ in range(rng.randint(1, 3))))
+    return sorted(keywords)
+
+
+def generate_corpus(folder: str, keywords: List[str], n_files: int, file_kb: int, rng: random.Random) -> List[str]:
+    """
+    Páginas HTML de ~file_kb KB: keywords en el texto (a veces sin acentos, en
+    mayúsculas, partidas por etiquetas o con entidades), dentro de atributos, scripts y
+    comentarios, y pegadas a otras palabras (no deben contar en el modo words).
+    """
+    paths = []
+    filler = ['lorem', 'ipsum', 'dolor', 'sit', 'amet', 'consectetur']
+    for i in range(n_files):
+        parts: List[str] = ['<!DOCTYPE html><html><head><title>Página</title>'
+                            '<style>.texto { color: #333 }</style></head><body>']
+        size = 0
+        while size < file_kb * 1024:
+            keyword = rng.choice(keywords)
+            roll = rng.random()
+            if roll < 0.3:
+                text = keyword
+            elif roll < 0.4:
+                text = keyword.translate(ACCENTS)
+            elif roll < 0.5:
+                text = keyword.upper()
+            elif roll < 0.55:
+                text = keyword.replace(' ', ' <b>', 1) + '</b>' if ' ' in keyword else f'<i>{keyword}</i>'
+            elif roll < 0.6:
+                text = keyword.replace('ó', '&oacute;').replace('á', '&aacute;')
+            elif roll < 0.65:
+                text = f'<a href="/{keyword}" title="{keyword}">{rng.choice(filler)}</a>'
+            elif roll < 0.7:
+                text = f'<script>var k = "{keyword}"; if (a < b) {{}}</script>'
+            elif roll < 0.72:
+                text = f'<!-- {keyword} -->'
+            elif roll < 0.8:
+                text = keyword + rng.choice(filler)
+            else:
+                text = rng.choice(filler)
+            parts.append(f'<p class="texto">{text}</p>' if rng.random() < 0.1 else text)
+            size += len(parts[-1]) + 1
+        parts.append('</body></html>')
+        path = os.path.join(folder, f"pagina_{i}.html")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(' '.join(parts))
+        paths.append(path)
+    return paths
+
+
+def check_cases() -> List[str]:
+    failures = []
+    print("1. Casos:")
+    for document, keyword, expected in CASES:
+        words = count_keywords_in_content(build_keyword_automaton([keyword], 'words'), document.lower())[0]
+        raw = count_keywords_in_content(build_keyword_automaton([keyword]), document.lower())[0]
+        mark = '✅' if words == expected else '❌'
+        print(f"   {mark} {keyword!r:22} raw {raw} | words {words} (esperado {expected}) en {document!r}")
+        if words != expected:
+            failures.append(f"'{keyword}' en {document!r}: {words} en lugar de {expected}")
+    for document, keyword, expected in SPLIT_CASES:
+        automaton = build_keyword_automaton([keyword], 'words')
+        data = document.encode('utf-8')
+        wrong = [size for size in range(1, len(data) + 1) if count_keywords_in_chunks(
+            automaton, keyword_auditor.iter_lowercase_chunks(keyword_auditor.iter_byte_blocks(data, size), 'utf-8')
+        )[0] != [expected]]
+        mark = '✅' if not wrong else '❌'
+        print(f"   {mark} {keyword!r:22} words {expected} con el documento cortado en bloques de 1 a {len(data)} bytes "
+              f"en {document!r}")
+        if wrong:
+            failures.append(f"'{keyword}' en {document!r} cambia al cortar en bloques de {wrong} bytes")
+    return failures
+
+
+def analyze(keywords: List[str], files: List[str], use_mmap: bool, match_mode: str):
+    # Silenciamos la salida por keyword del analizador para no distorsionar la medición
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        start = time.perf_counter()
+        results, _ = keyword_auditor.analyze_keywords_in_reports(keywords, files, use_mmap, match_mode)
+        return results, time.perf_counter() - start
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--keywords', type=int, default=500)
+    parser.add_argument('--files', type=int, default=50)
+    parser.add_argument('--file-kb', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    failures = check_cases()
+    rng = random.Random(args.seed)
+    keywords = generate_keywords(args.keywords, rng)
+
+    with tempfile.TemporaryDirectory() as folder:
+        files = generate_corpus(folder, keywords, args.files, args.file_kb, rng)
+
+        timings: Dict[str, float] = {}
+        raw, timings['raw'] = analyze(keywords, files, False, 'raw')
+        words, timings['words'] = analyze(keywords, files, False, 'words')
+        words_mmap, timings['words + mmap'] = analyze(keywords, files, True, 'words')
+
+        start = time.perf_counter()
+        reference_totals = [0] * len(keywords)
+        for path in files:
+            for idx, count in enumerate(reference_counts(keywords, keyword_auditor.read_file_content_robustly(path))):
+                reference_totals[idx] += count
+        timings['referencia (regex por keyword)'] = time.perf_counter() - start
+
+        # Documento cortado en bloques de cualquier tamaño (cortes en etiquetas, scripts y entidades)
+        automaton = build_keyword_automaton(keywords, 'words')
+        with open(files[0], 'rb') as f:
+            data = f.read()
+        full_counts = count_keywords_in_content(automaton, data.decode('utf-8').lower())
+        block_failures = [size for size in (7, 61, 509, 4096) if count_keywords_in_chunks(
+            automaton, keyword_auditor.iter_lowercase_chunks(keyword_auditor.iter_byte_blocks(data, size), 'utf-8')
+        )[0] != full_counts]
+
+    word_totals = [row['coincidencias'] for row in words]
+    raw_total, words_total = sum(row['coincidencias'] for row in raw), sum(word_totals)
+    print(f"2. Paridad ({args.keywords} keywords, {args.files} archivos x ~{args.file_kb} KB):")
+    print(f"   coincidencias raw {raw_total} | words {words_total} | referencia {sum(reference_totals)}")
+    if word_totals != reference_totals:
+        differing = sum(a != b for a, b in zip(word_totals, reference_totals))
+        failures.append(f"el modo words difiere de la referencia en {differing} keywords")
+    if words != words_mmap:
+        failures.append("el modo words da resultados distintos con --mmap")
+    if block_failures:
+        failures.append(f"el modo words cambia al cortar el documento en bloques de {block_failures} bytes")
+
+    print("3. Tiempos:")
+    for name, seconds in timings.items():
+        print(f"   {name:31}: {seconds:7.2f} s ({seconds / timings['raw']:.2f}x raw)")
+
+    if failures:
+        sys.exit("❌ ERROR: " + "; ".join(failures))
+    print("✅ Modo words correcto: mismos conteos que la referencia con ambos lectores y cualquier corte.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark: almacenamiento de informes y HTML por URL (report_storage.ReportStorage).
+
+Guarda `--pages` páginas repartidas en `--hosts` hosts (varias páginas por host, el
+caso que antes se sobrescribía) con cada compresión disponible y comprueba que:
+  - cada URL tiene sus propios archivos (ninguna página pisa a otra);
+  - el manifiesto devuelve el contenido original de cada URL;
+  - keyword_auditor encuentra los archivos y da los mismos conteos con y sin
+    compresión (lector normal y lector por fragmentos).
+Muestra el tamaño en disco y el tiempo de escritura y de análisis de cada variante.
+
+Uso:
+    python benchmarks/bench_report_storage.py --pages 2000 --hosts 5 --page-kb 60
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import keyword_auditor  # noqa: E402
+import report_storage  # noqa: E402
+from bench_keyword_matching import generate_keywords  # noqa: E402
+from keyword_matching import build_keyword_automaton  # noqa: E402
+
+
+def generate_page(index: int, keywords, page_kb: int, rng: random.Random) -> str:
+    """HTML sintético con keywords, mayúsculas y acentos."""
+    filler = ['<div class="x">', '</div>', 'Información', 'SEÑAL', 'lorem', '<p>', '</p>']
+    tokens = [f'<html><head><title>Página {index}</title></head><body>']
+    size = 0
+    while size < page_kb * 1024:
+        token = rng.choice(keywords) if rng.random() < 0.2 else rng.choice(filler)
+        tokens.append(token.upper() if rng.random() < 0.1 else token)
+        size += len(tokens[-1]) + 1
+    return ' '.join(tokens)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=2000)
+    parser.add_argument('--hosts', type=int, default=5)
+    parser.add_argument('--page-kb', type=int, default=60)
+    parser.add_argument('--keywords', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    keywords = generate_keywords(args.keywords, rng)
+    automaton = build_keyword_automaton(keywords)
+    pages = {f"https://www.host{i % args.hosts}.com/seccion/{i}?p={i % 7}": generate_page(i, keywords, args.page_kb, rng)
+             for i in range(args.pages)}
+
+    compressions = ['none', 'gzip'] + (['zstd'] if report_storage.zstandard is not None else [])
+    reference = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for compression in compressions:
+            folder = os.path.join(tmp, compression, 'index')
+            storage = report_storage.ReportStorage(os.path.join(tmp, compression, 'manifest.jsonl'), compression)
+
+            start = time.perf_counter()
+            for url, html in pages.items():
+                storage.save(folder, url, '.html', html)
+            write_time = time.perf_counter() - start
+
+            # Ninguna página se pisa y el manifiesto recupera cada una
+            reloaded = report_storage.ReportStorage(storage.manifest_path, compression)
+            assert reloaded.stats()['files'] == len(pages)
+            assert all(reloaded.read(url, '.html') == html for url, html in pages.items())
+
+            files = keyword_auditor.find_report_files([folder])
+            assert len(files) == len(pages), f"{len(files)} archivos para {len(pages)} URLs"
+
+            timings = []
+            for use_mmap in (False, True):
+                start = time.perf_counter()
+                counts = sorted(keyword_auditor.count_keywords_in_file(automaton, path, use_mmap) for path in files)
+                timings.append(time.perf_counter() - start)
+                if reference is None:
+                    reference = counts
+                assert counts == reference, f"Conteos distintos con compresión '{compression}' (mmap={use_mmap})"
+
+            disk_mb = reloaded.stats()['disk_bytes'] / (1024 * 1024)
+            print(f"{compression:>5}: {disk_mb:8.1f} MB en disco | escritura {write_time:6.2f} s "
+                  f"({len(pages) / write_time:6.0f} páginas/s) | análisis {timings[0]:6.2f} s (normal), "
+                  f"{timings[1]:6.2f} s (por fragmentos)")
+
+    print(f"OK: {len(pages)} URLs de {args.hosts} hosts con archivos propios y conteos idénticos en todas las variantes.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark: almacén estructurado de resultados (results_store.ResultsStore) frente a
+los informes TXT por URL.
+
+1. Escribe `--urls` diccionarios de resultados sintéticos con distintos tamaños de
+   bloque (1 = una transacción por URL) y como informes TXT (format_seo_report).
+2. Los vuelve a cargar: desde SQLite con una sola lectura a pandas, y desde los TXT
+   leyendo y parseando cada archivo (lo que hoy haría cualquier análisis posterior).
+3. Comprueba que el DataFrame reconstruye exactamente los diccionarios originales.
+
+Uso:
+    python benchmarks/bench_results_store.py --urls 10000
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import seo_auditor  # noqa: E402
+from results_store import ResultsStore, load_results_dataframe  # noqa: E402
+
+TITLE_RE = re.compile(r'^Title:\s+(.*?)\s+\(Longitud', re.MULTILINE)
+
+
+def generate_results(n: int, rng: random.Random) -> List[Dict[str, Any]]:
+    """Diccionarios con el esquema de new_seo_results (algunos con error)."""
+    all_results = []
+    for i in range(n):
+        results = seo_auditor.new_seo_results(f"https://www.sitio{i % 20}.com/pagina/{i}")
+        if i % 25 == 24:
+            results['error'] = "Error HTTP: 503 Server Error"
+        else:
+            results['title'] = f"Página {i} – Auditoría"
+            results['meta_description'] = f"Descripción de la página {i} con acentos: información."
+            results['meta_keywords'] = "seo, auditoría"
+            results['canonical'] = f"/pagina/{i}"
+            results['h1'] = [f"Encabezado {i}"]
+            results['h2'] = [f"Sección {j}" for j in range(rng.randint(0, 8))]
+            results['h3'] = [f"Detalle {j}" for j in range(rng.randint(0, 4))]
+            results['otras_meta'] = {'robots': 'index, follow', 'og:title': f"OG {i}"}
+        all_results.append(results)
+    return all_results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--urls', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    all_results = generate_results(args.urls, random.Random(args.seed))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for batch_size in (1, 500):
+            db_path = os.path.join(tmp, f"resultados_{batch_size}.sqlite")
+            start = time.perf_counter()
+            with ResultsStore(db_path, batch_size) as store:
+                for results in all_results:
+                    store.add(results)
+            print(f"SQLite (bloque de {batch_size:>3}): escritura {time.perf_counter() - start:6.2f} s")
+
+        load_results_dataframe(db_path, decode_json=False)   # Importa pandas fuera de las mediciones
+        start = time.perf_counter()
+        load_results_dataframe(db_path, decode_json=False)
+        raw_load_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        df = load_results_dataframe(db_path)
+        load_time = time.perf_counter() - start
+
+        # Ida y vuelta exacta
+        restored = df.rename(columns={'url': 'url_analizada'})[list(all_results[0])].to_dict('records')
+        for original, row in zip(sorted(all_results, key=lambda r: r['url_analizada']), restored):
+            row = {key: (None if value != value else value) for key, value in row.items()}  # NaN -> None
+            assert row == original, (row, original)
+
+        txt_folder = os.path.join(tmp, 'reports')
+        os.makedirs(txt_folder)
+        start = time.perf_counter()
+        for i, results in enumerate(all_results):
+            with open(os.path.join(txt_folder, f"{i}.txt"), 'w', encoding='utf-8') as f:
+                f.write(seo_auditor.format_seo_report(results))
+        txt_write = time.perf_counter() - start
+
+        start = time.perf_counter()
+        titles = []
+        for filename in os.listdir(txt_folder):
+            with open(os.path.join(txt_folder, filename), 'r', encoding='utf-8') as f:
+                match = TITLE_RE.search(f.read())
+            titles.append(match.group(1) if match else None)
+        txt_load = time.perf_counter() - start
+
+    print(f"TXT por URL        : escritura {txt_write:6.2f} s | lectura y parseo (solo el title) {txt_load:6.2f} s")
+    print(f"SQLite -> pandas   : {len(df)} filas y {len(df.columns)} columnas en {raw_load_time:6.2f} s "
+          f"({load_time:6.2f} s decodificando los encabezados y otras_meta de JSON)")
+    print("✅ El DataFrame reconstruye exactamente los diccionarios de resultados.")
+
+
+if __name__ == '__main__':
+    main()
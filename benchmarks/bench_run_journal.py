@@ -0,0 +1,209 @@
+"""
+Comprobación del diario de ejecución (run_journal.RunJournal) y de `--resume`.
+
+1. Escrituras concurrentes: varios hilos y varios procesos registran URLs a la vez en
+   el mismo diario; al final deben estar todas, con su estado y sus intentos.
+2. Ejecución interrumpida: seo_auditor.py (subproceso, modo concurrente) audita
+   `--urls` páginas de un servidor local, algunas con un fallo 503 en la primera
+   petición. Se mata con SIGKILL a mitad de camino y se reanuda con --resume hasta
+   completar. Se comprueba que cada reanudación solo pide las URLs pendientes, que las
+   que fallaron se reintentan y que los resultados finales coinciden con una
+   ejecución completa sin interrupciones.
+
+Uso:
+    python benchmarks/bench_run_journal.py --urls 400 --workers 8 --checkpoint-every 20
+"""
+import argparse
+import multiprocessing
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from run_journal import RunJournal, RUN_JOURNAL_FILE, STATUS_OK  # noqa: E402
+from results_store import RESULTS_DB_FILE  # noqa: E402
+from stub_server import start_stub_server  # noqa: E402
+from synthetic_data import synthetic_url  # noqa: E402
+
+MAX_RESUMES = 3
+
+
+def record_urls(db_path: str, prefix: str, count: int, checkpoint_every: int):
+    """Registra `count` URLs (una de cada 5 con error) desde un proceso o hilo."""
+    with RunJournal(db_path, checkpoint_every) as journal:
+        for i in range(count):
+            journal.record(f"{prefix}/{i}", "fallo" if i % 5 == 0 else None)
+
+
+def check_concurrent_writes(workdir: str, args: argparse.Namespace) -> List[str]:
+    db_path = os.path.join(workdir, 'concurrente.sqlite')
+    RunJournal(db_path).close()
+    per_writer = 500
+    start = time.perf_counter()
+    # Hilos que comparten un mismo diario...
+    shared = RunJournal(db_path, checkpoint_every=7)
+    threads = [threading.Thread(target=lambda t=t: [shared.record(f"hilo/{t}/{i}", "fallo" if i % 5 == 0 else None)
+                                                     for i in range(per_writer)])
+               for t in range(args.threads)]
+    # ...y procesos con su propia conexión al mismo archivo (spawn: una conexión SQLite no
+    # debe heredarse con fork)
+    spawn = multiprocessing.get_context('spawn')
+    processes = [spawn.Process(target=record_urls, args=(db_path, f"proceso/{p}", per_writer, 11))
+                 for p in range(args.processes)]
+    for worker in threads + processes:
+        worker.start()
+    for worker in threads + processes:
+        worker.join()
+    shared.close()
+    elapsed = time.perf_counter() - start
+
+    conn = sqlite3.connect(db_path)
+    rows, ok = conn.execute("SELECT COUNT(*), SUM(status = ?) FROM journal", (STATUS_OK,)).fetchone()
+    conn.close()
+    expected = (args.threads + args.processes) * per_writer
+    print(f"1. Escrituras concurrentes ({args.threads} hilos + {args.processes} procesos, {per_writer} URLs cada uno): "
+          f"{rows}/{expected} filas, {ok} completadas | {elapsed:.2f} s")
+    if rows != expected or ok != expected * 4 // 5:
+        return ["faltan filas o estados en el diario tras las escrituras concurrentes"]
+    return []
+
+
+def run_cli(workdir: str, args: argparse.Namespace, extra: List[str]) -> subprocess.Popen:
+    command = [sys.executable, os.path.join(ROOT, 'seo_auditor.py'), '--workers', str(args.workers),
+               '--max-per-host', str(args.workers), '--retries', '0',
+               '--checkpoint-every', str(args.checkpoint_every)] + extra
+    return subprocess.Popen(command, cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+
+
+def journal_rows(workdir: str) -> Dict[str, str]:
+    path = os.path.join(workdir, RUN_JOURNAL_FILE)
+    if not os.path.exists(path):
+        return {}
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        return dict(conn.execute("SELECT url, status FROM journal"))
+    except sqlite3.OperationalError:
+        return {}
+    finally:
+        conn.close()
+
+
+def final_results(workdir: str) -> Dict[str, Tuple]:
+    """Último resultado de cada URL entre todas las ejecuciones (sin el parámetro de fallo)."""
+    conn = sqlite3.connect(os.path.join(workdir, RESULTS_DB_FILE))
+    rows = conn.execute("SELECT url, title, meta_description, h1, h2, h3, otras_meta, error FROM results "
+                        "ORDER BY run_id").fetchall()
+    conn.close()
+    return {row[0].split('?')[0]: row[1:] for row in rows}
+
+
+def fetched_urls(server, before: Dict[str, int]) -> Dict[str, int]:
+    """Peticiones recibidas por ruta desde la instantánea `before`."""
+    with server.lock:
+        return {path: count - before.get(path, 0) for path, count in server.requests_seen.items()
+                if count > before.get(path, 0)}
+
+
+def check_resume(workdir: str, args: argparse.Namespace) -> List[str]:
+    failures: List[str] = []
+    server, base_url = start_stub_server(latency=args.latency)
+    urls = [synthetic_url(base_url, i, args.page_kb) + ('&fail=1&fault=503' if i % 10 == 3 else '')
+            for i in range(args.urls)]
+
+    # Ejecución de referencia, sin interrupciones ni fallos
+    reference_dir = os.path.join(workdir, 'referencia')
+    os.makedirs(reference_dir)
+    with open(os.path.join(reference_dir, 'urls.txt'), 'w', encoding='utf-8') as f:
+        f.write("\n".join(url.split('&fail=')[0] for url in urls))
+    start = time.perf_counter()
+    reference = run_cli(reference_dir, args, [])
+    reference.wait()
+    full_time = time.perf_counter() - start
+    reference_results = final_results(reference_dir)
+
+    # Ejecución interrumpida con SIGKILL
+    run_dir = os.path.join(workdir, 'interrumpida')
+    os.makedirs(run_dir)
+    with open(os.path.join(run_dir, 'urls.txt'), 'w', encoding='utf-8') as f:
+        f.write("\n".join(urls))
+    snapshot = dict(server.requests_seen)
+    start = time.perf_counter()
+    process = run_cli(run_dir, args, [])
+    while process.poll() is None and len(journal_rows(run_dir)) < args.urls * args.kill_at:
+        time.sleep(0.02)
+    process.send_signal(signal.SIGKILL)
+    process.wait()
+    total_time = time.perf_counter() - start
+    fetched_before_kill = set(fetched_urls(server, snapshot))
+    journal = journal_rows(run_dir)
+    print(f"2. Ejecución interrumpida ({args.urls} URLs, {args.urls // 10} con un fallo 503 la primera vez):")
+    print(f"   SIGKILL tras {total_time:.2f} s | pedidas {len(fetched_before_kill)} | en el diario "
+          f"{sum(status == STATUS_OK for status in journal.values())} completadas y "
+          f"{sum(status != STATUS_OK for status in journal.values())} con error")
+
+    redone = 0
+    for round_number in range(1, MAX_RESUMES + 1):
+        pending = [url for url in urls if journal.get(url) != STATUS_OK]
+        if not pending:
+            break
+        snapshot = dict(server.requests_seen)
+        start = time.perf_counter()
+        process = run_cli(run_dir, args, ['--resume'])
+        _, stderr = process.communicate()
+        elapsed = time.perf_counter() - start
+        total_time += elapsed
+        requested = fetched_urls(server, snapshot)
+        expected = {url[len(base_url):] for url in pending}
+        if round_number == 1:
+            redone = len(expected & fetched_before_kill) - sum(status != STATUS_OK for status in journal.values())
+        journal = journal_rows(run_dir)
+        print(f"   --resume #{round_number}: {len(pending)} pendientes | {sum(requested.values())} peticiones | "
+              f"{elapsed:.2f} s | quedan {sum(status != STATUS_OK for status in journal.values())} con error")
+        if process.returncode != 0:
+            failures.append(f"la reanudación #{round_number} terminó con código {process.returncode}: {stderr[-300:]}")
+        if set(requested) != expected:
+            failures.append(f"la reanudación #{round_number} no pidió exactamente las URLs pendientes")
+    server.shutdown()
+
+    print(f"   URLs repetidas por morir entre puntos de control: {redone} (máximo {args.checkpoint_every + args.workers})")
+    print(f"   tiempo total con interrupción: {total_time:.2f} s | ejecución completa sin interrupción: {full_time:.2f} s")
+    if len(journal) != args.urls or any(status != STATUS_OK for status in journal.values()):
+        failures.append("el diario no terminó con todas las URLs completadas")
+    if final_results(run_dir) != reference_results:
+        failures.append("los resultados finales difieren de la ejecución sin interrupciones")
+    if redone > args.checkpoint_every + args.workers:
+        failures.append("se repitieron más URLs de las que caben entre dos puntos de control")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--urls', type=int, default=400)
+    parser.add_argument('--page-kb', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--checkpoint-every', type=int, default=20)
+    parser.add_argument('--kill-at', type=float, default=0.4, help="Fracción de URLs en el diario antes del SIGKILL.")
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--processes', type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='bench_journal_') as workdir:
+        failures = check_concurrent_writes(workdir, args)
+        failures += check_resume(workdir, args)
+    if failures:
+        sys.exit("❌ ERROR: " + "; ".join(failures))
+    print("✅ Diario de ejecución y --resume correctos.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Benchmark del arranque de los CLI: importaciones medidas con `python -X importtime`,
+modo --serve frente a un proceso por URL y lector ligero de la hoja de keywords.
+
+1. Importaciones: cada escenario se ejecuta en un proceso nuevo con -X importtime; se
+   muestra el tiempo total de importación, los módulos de primer nivel más costosos y
+   si se cargaron pandas/NumPy/openpyxl/bs4. El tiempo de reloj es la mediana de
+   `--repeat` ejecuciones. Con `--baseline REV` se repite todo sobre otra revisión del
+   repositorio (extraída con git archive) para comparar.
+2. --serve: `--jobs` URLs auditadas lanzando un proceso por URL (como desde cron)
+   frente a un único proceso `--serve` que las recibe por la entrada estándar. Los
+   resultados deben coincidir.
+3. Hoja de keywords: xlsx_reader.read_first_column frente a pandas.read_excel (mismo
+   resultado que get_keywords_from_excel), con y sin el coste de importación.
+
+Uso:
+    python benchmarks/bench_startup.py --repeat 5 --jobs 30 --keywords 20000 --baseline HEAD~1
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_server import start_stub_server  # noqa: E402
+from synthetic_data import synthetic_url, write_keyword_workbook  # noqa: E402
+
+HEAVY_MODULES = ('pandas', 'numpy', 'openpyxl', 'bs4', 'requests')
+TOP_MODULES = 5
+
+
+def parse_importtime(stderr: str) -> Tuple[float, Dict[str, float]]:
+    """(ms totales de importación, ms acumulados por módulo de primer nivel) de -X importtime."""
+    top_level: Dict[str, float] = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not name.startswith('  '):   # Los módulos anidados llevan sangría adicional
+            top_level[name.strip()] = int(cumulative) / 1000
+    return sum(top_level.values()), top_level
+
+
+def measure_startup(root: str, script: str, arguments: List[str], workdir: str, repeat: int,
+                    stdin: Optional[str] = None) -> Dict[str, object]:
+    command = [sys.executable, os.path.join(root, script)] + arguments
+    completed = subprocess.run([sys.executable, '-X', 'importtime'] + command[1:], cwd=workdir, input=stdin,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    import_ms, top_level = parse_importtime(completed.stderr)
+    wall = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=workdir, input=stdin, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                       text=True)
+        wall.append(time.perf_counter() - start)
+    return {'import_ms': import_ms, 'wall_ms': statistics.median(wall) * 1000,
+            'heavy': [module for module in HEAVY_MODULES if module in top_level],
+            'top': sorted(top_level.items(), key=lambda item: -item[1])[:TOP_MODULES]}
+
+
+def startup_scenarios(base_url: str, workdir: str) -> Dict[str, Tuple[str, List[str], str]]:
+    """Escenarios: (script, argumentos, directorio de trabajo)."""
+    keyword_dir = os.path.join(workdir, 'keywords_sin_reportes')
+    os.makedirs(keyword_dir, exist_ok=True)
+    write_keyword_workbook(os.path.join(keyword_dir, 'keywords.xlsx'), 200)
+    run_dir = os.path.join(workdir, 'una_url')
+    os.makedirs(run_dir, exist_ok=True)
+    url = synthetic_url(base_url, 1)
+    return {
+        'seo_auditor --help': ('seo_auditor.py', ['--help'], run_dir),
+        'seo_auditor URL (bs4)': ('seo_auditor.py', [url], run_dir),
+        'seo_auditor URL (stream)': ('seo_auditor.py', [url, '--parser', 'stream'], run_dir),
+        'keyword_auditor --help': ('keyword_auditor.py', ['--help'], run_dir),
+        'keyword_auditor sin reportes': ('keyword_auditor.py', [], keyword_dir),
+    }
+
+
+def export_revision(revision: str, workdir: str) -> str:
+    """Extrae `revision` del repositorio en un directorio temporal (git archive)."""
+    target = os.path.join(workdir, 'baseline')
+    os.makedirs(target)
+    archive = subprocess.run(['git', 'archive', revision], cwd=ROOT, capture_output=True, check=True)
+    subprocess.run(['tar', '-x', '-C', target], input=archive.stdout, check=True)
+    return target
+
+
+def print_startup(results: Dict[str, Dict[str, object]], baseline: Optional[Dict[str, Dict[str, object]]]):
+    print("1. Arranque (importaciones con -X importtime, reloj = mediana):")
+    for name, result in results.items():
+        line = f"   {name:30} importación {result['import_ms']:7.1f} ms | reloj {result['wall_ms']:7.1f} ms"
+        if baseline is not None:
+            before = baseline[name]
+            line += (f" | antes {before['import_ms']:7.1f} / {before['wall_ms']:7.1f} ms "
+                     f"({before['wall_ms'] / result['wall_ms']:.2f}x)")
+        print(line)
+        print(f"   {'':30} pesados: {', '.join(result['heavy']) or 'ninguno'} | más costosos: "
+              + ", ".join(f"{module} {ms:.0f} ms" for module, ms in result['top']))
+
+
+def check_serve(base_url: str, workdir: str, args: argparse.Namespace) -> List[str]:
+    urls = [synthetic_url(base_url, 1000 + i) for i in range(args.jobs)]
+    common = ['--no-results-db', '--no-journal']
+
+    per_process_dir = os.path.join(workdir, 'un_proceso_por_url')
+    os.makedirs(per_process_dir)
+    start = time.perf_counter()
+    for url in urls:
+        subprocess.run([sys.executable, os.path.join(ROOT, 'seo_auditor.py'), url] + common, cwd=per_process_dir,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    per_process_time = time.perf_counter() - start
+
+    serve_dir = os.path.join(workdir, 'serve')
+    os.makedirs(serve_dir)
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, os.path.join(ROOT, 'seo_auditor.py'), '--serve'] + common,
+                               cwd=serve_dir, input="\n".join(urls) + "\n", stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL, text=True, check=True)
+    serve_time = time.perf_counter() - start
+    responses = [json.loads(line) for line in completed.stdout.splitlines()]
+
+    print(f"2. {args.jobs} URLs de una en una:")
+    print(f"   un proceso por URL : {per_process_time:6.2f} s ({per_process_time / args.jobs * 1000:6.1f} ms/URL)")
+    print(f"   un proceso --serve : {serve_time:6.2f} s ({serve_time / args.jobs * 1000:6.1f} ms/URL) | "
+          f"{per_process_time / serve_time:.1f}x")
+
+    failures = []
+    if [response['url_analizada'] for response in responses] != urls or any(r['error'] for r in responses):
+        failures.append("--serve no respondió una línea JSON correcta por URL")
+    for folder in ('reports',):
+        if sorted(os.listdir(os.path.join(per_process_dir, folder))) != sorted(os.listdir(os.path.join(serve_dir, folder))):
+            failures.append("--serve no guardó los mismos informes que un proceso por URL")
+    return failures
+
+
+def check_keyword_reader(workdir: str, args: argparse.Namespace) -> List[str]:
+    path = os.path.join(workdir, f'keywords_{args.keywords}.xlsx')
+    write_keyword_workbook(path, args.keywords, duplicates=args.keywords // 20)
+
+    code = {
+        'pandas': ("import pandas as pd\n"
+                   "keywords = pd.read_excel(PATH, header=None).iloc[1:, 0].dropna().astype(str).str.strip().tolist()"),
+        'ligero': ("from xlsx_reader import read_first_column\n"
+                   "keywords = [cell.strip() for cell in read_first_column(PATH)[1:] if cell is not None]"),
+    }
+    timings: Dict[str, float] = {}
+    outputs: Dict[str, List[str]] = {}
+    for name, snippet in code.items():
+        # En un proceso nuevo (con la importación) y, ya importado, solo la lectura
+        script = (f"import sys, time, json\nsys.path.insert(0, {ROOT!r})\nPATH = {path!r}\nstart = time.perf_counter()\n"
+                  f"{snippet}\ncold = time.perf_counter() - start\n"
+                  f"start = time.perf_counter()\n{snippet}\nwarm = time.perf_counter() - start\n"
+                  f"print(json.dumps([cold, warm, keywords]))")
+        cold, warm, keywords = json.loads(subprocess.run([sys.executable, '-c', script], capture_output=True,
+                                                         text=True, check=True).stdout)
+        timings[name + '_cold'], timings[name + '_warm'] = cold, warm
+        outputs[name] = keywords
+
+    print(f"3. Hoja de keywords ({args.keywords} filas + {args.keywords // 20} duplicadas):")
+    for name in code:
+        print(f"   {name:7}: con importación {timings[name + '_cold'] * 1000:7.1f} ms | "
+              f"solo lectura {timings[name + '_warm'] * 1000:7.1f} ms")
+    if outputs['pandas'] != outputs['ligero']:
+        return ["el lector ligero no devuelve las mismas keywords que pandas"]
+    return []
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--jobs', type=int, default=30)
+    parser.add_argument('--keywords', type=int, default=20000)
+    parser.add_argument('--baseline', default=None, metavar='REV',
+                        help="Revisión de git con la que comparar el arranque (p. ej. HEAD~1).")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server()
+    with tempfile.TemporaryDirectory(prefix='bench_startup_') as workdir:
+        scenarios = startup_scenarios(base_url, workdir)
+        results = {name: measure_startup(ROOT, script, arguments, cwd, args.repeat)
+                   for name, (script, arguments, cwd) in scenarios.items()}
+        baseline = None
+        if args.baseline:
+            baseline_root = export_revision(args.baseline, workdir)
+            baseline = {name: measure_startup(baseline_root, script, arguments, cwd, args.repeat)
+                        for name, (script, arguments, cwd) in scenarios.items()}
+        print_startup(results, baseline)
+        failures = check_serve(base_url, workdir, args)
+        failures += check_keyword_reader(workdir, args)
+    server.shutdown()
+
+    if 'pandas' in results['keyword_auditor sin reportes']['heavy']:
+        failures.append("keyword_auditor importa pandas sin necesitarlo")
+    if 'bs4' in results['seo_auditor URL (stream)']['heavy']:
+        failures.append("seo_auditor --parser stream importa bs4")
+    if failures:
+        sys.exit("❌ ERROR: " + "; ".join(failures))
+    print("✅ Arranque diferido, --serve y lector ligero de keywords correctos.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Paridad y benchmark de los backends de parseo: BeautifulSoup ('bs4') vs. parser por
+eventos sin DOM ('stream').
+
+1. Paridad: parsea cada página del corpus con ambos backends y exige que los
+   diccionarios de resultados sean idénticos.
+2. Benchmark: tiempo de parseo por página (mediana y p95) y pico de memoria
+   (tracemalloc) de cada backend.
+
+El corpus son los HTML guardados por seo_auditor.py en `index/`. Si la carpeta no
+existe o está vacía, se usan páginas sintéticas.
+
+Uso:
+    python benchmarks/bench_stream_parser.py --corpus index
+"""
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import seo_auditor  # noqa: E402
+from report_storage import open_stored_text  # noqa: E402
+
+# Casos límite que el backend por eventos debe resolver igual que BeautifulSoup
+EDGE_CASES = [
+    '<title>a<b>x</b></title><title>segundo</title>',
+    '<h1>a<h2>b</h1>c</h2>',
+    '<h1>a</h2>b</h1>',
+    '<h1>a<script>x</script>b<style>y</style><!--c-->d<![CDATA[zz]]></h1>',
+    '<h1>a<template><p>t</p></template>z<ruby>r<rt>x</rt></ruby></h1>',
+    '<h1> a &amp; b&nbsp;</h1><h2>&#65;&#x42;</h2>',
+    '<link rel="Canonical" href="/x"><link rel="alternate canonical" href="/y">',
+    '<link rel=canonical><link rel=canonical href=/z>',
+    '<meta name=description content><meta name=Keywords content=" k "><meta property=og:x content=1>'
+    '<meta name=robots><meta name=robots content=noindex>',
+    '<h1>x<p>y<h1>z</h1>w</h1><h3/>',
+]
+
+
+def synthetic_page(i: int) -> str:
+    """Página sintética grande (~200 KB) para cuando no hay corpus real."""
+    body = ''.join(
+        f'<div class="bloque"><h2>Sección {j}</h2><p>Texto de relleno {j} con <b>negritas</b>, '
+        f'<a href="/p/{j}">enlaces</a> y acentos: información, señal.</p>'
+        f'<script>var x{j} = "<h1>no cuenta</h1>";</script><h3>Sub {j}</h3></div>'
+        for j in range(800)
+    )
+    return (f'<!DOCTYPE html><html><head><title>Página {i}</title>'
+            f'<meta name="description" content="Descripción {i}"><link rel="canonical" href="/p/{i}">'
+            f'</head><body><h1>Principal {i}</h1>{body}</body></html>')
+
+
+def load_corpus(folder: str, limit: int) -> Dict[str, str]:
+    """Lee los HTML del corpus (o genera páginas sintéticas)."""
+    corpus: Dict[str, str] = {}
+    # Formato plano anterior (index/*.html) y formato por URL (index/<xx>/*.html[.gz|.zst])
+    paths = glob.glob(os.path.join(folder, '*.html')) + glob.glob(os.path.join(folder, '*', '*.html*'))
+    for path in sorted(paths)[:limit]:
+        with open_stored_text(path, 'utf-8', errors='replace') as f:
+            corpus[path] = f.read()
+    if not corpus:
+        print(f"⚠️ No se encontraron páginas en '{folder}'. Usando páginas sintéticas.")
+        corpus = {f"sintetica_{i}.html": synthetic_page(i) for i in range(min(limit, 20))}
+    return corpus
+
+
+def measure(backend: str, corpus: Dict[str, str]) -> Dict[str, float]:
+    """Tiempo por página (s) y pico de memoria (MB) de un backend."""
+    parse = seo_auditor.PARSER_BACKENDS[backend]
+    timings: List[float] = []
+    for name, html in corpus.items():
+        start = time.perf_counter()
+        parse(name, html)
+        timings.append(time.perf_counter() - start)
+
+    # La memoria se mide en una pasada aparte: tracemalloc distorsiona los tiempos
+    peak = 0
+    for name, html in corpus.items():
+        tracemalloc.start()
+        parse(name, html)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    timings.sort()
+    return {
+        'median': statistics.median(timings),
+        'p95': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        'peak_mb': peak / (1024 * 1024),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', default=seo_auditor.INDEX_FOLDER, help="Carpeta con los HTML guardados.")
+    parser.add_argument('--limit', type=int, default=500, help="Máximo de páginas a usar.")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus, args.limit)
+
+    # 1. Paridad
+    mismatches = 0
+    cases = dict(corpus)
+    cases.update({f"caso_limite_{i}": html for i, html in enumerate(EDGE_CASES)})
+    for name, html in cases.items():
+        expected = seo_auditor.parse_seo_html(name, html)
+        actual = seo_auditor.parse_seo_html_streaming(name, html)
+        if expected != actual:
+            mismatches += 1
+            print(f"❌ Diferencia en {name}:")
+            for key in expected:
+                if expected[key] != actual[key]:
+                    print(f"   {key}: bs4={expected[key]!r} | stream={actual[key]!r}")
+
+    if mismatches:
+        sys.exit(f"❌ ERROR: {mismatches} de {len(cases)} páginas difieren entre backends.")
+    print(f"✅ Paridad: {len(cases)} páginas con resultados idénticos en ambos backends.")
+
+    # 2. Benchmark
+    total_mb = sum(len(html.encode('utf-8')) for html in corpus.values()) / (1024 * 1024)
+    print(f"\nCorpus: {len(corpus)} páginas ({total_mb:.1f} MB)")
+    for backend in ('bs4', 'stream'):
+        stats = measure(backend, corpus)
+        print(f"  {backend:6}: mediana {stats['median'] * 1000:8.2f} ms/página | "
+              f"p95 {stats['p95'] * 1000:8.2f} ms | pico de memoria {stats['peak_mb']:7.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+"""
+Suite reproducible de benchmarks de extremo a extremo, sin red.
+
+1. Arranca `--hosts` servidores locales (stub_server.py) que sirven páginas sintéticas de
+   `--page-kb` KB con `--headings` encabezados y `--metas` metas, con latencia
+   (`--latency` + hasta `--jitter`) y una fracción `--error-rate` de respuestas 503.
+2. Genera en un directorio temporal `urls.txt` y `keywords.xlsx` (`--keywords`, ver
+   synthetic_data.py) y ejecuta los scripts reales como lo haría un usuario:
+     - seo_auditor.py en cada modo de `--seo-modes` (secuencial, concurrente, pipeline,
+       stream), midiendo páginas/s y los p50/p95 de descarga y parseo (traza de --trace);
+     - keyword_auditor.py en cada modo de `--keyword-modes` (robusto, mmap, index,
+       incremental; los dos últimos en frío y con el índice/manifiesto ya creado),
+       midiendo archivos/s y MB/s.
+3. Mide además, dentro del proceso, el rendimiento de parseo (bs4 y stream) y de conteo
+   de keywords sobre las mismas páginas, sin el ruido de la red ni del arranque.
+4. Comprueba que todos los modos dan los mismos resultados, añade una línea JSON a
+   `--results-file` y la compara con la última ejecución con la misma configuración:
+   las métricas que empeoran más de `--tolerance` se marcan como regresión
+   (`--fail-on-regression` devuelve código de salida 1).
+
+Uso:
+    python benchmarks/run_suite.py --pages 200 --keywords 1000 --latency 0.02 --error-rate 0.02
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd  # noqa: E402
+
+import seo_auditor  # noqa: E402
+from instrumentation import percentile  # noqa: E402
+from keyword_matching import build_keyword_automaton, count_keywords_in_content  # noqa: E402
+from stub_server import start_stub_server  # noqa: E402
+from synthetic_data import (render_synthetic_page, write_keyword_workbook, write_url_list,  # noqa: E402
+                            DEFAULT_PAGE_KB, DEFAULT_HEADINGS, DEFAULT_METAS, DEFAULT_SEED)
+
+# --- CONFIGURACIÓN DE LA SUITE ---
+DEFAULT_RESULTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resultados_suite.jsonl')
+DEFAULT_TOLERANCE = 0.20   # Empeoramiento relativo a partir del cual se marca una regresión
+SEO_MODES = {
+    'secuencial': ['--workers', '1', '--parse-workers', '0'],
+    'concurrente': ['--parse-workers', '0'],
+    'pipeline': [],
+    'stream': ['--parse-workers', '0', '--parser', 'stream'],
+}
+KEYWORD_MODES = {
+    'robusto': [],
+    'mmap': ['--mmap'],
+    'index': ['--index'],
+    'incremental': ['--incremental'],
+}
+# Modos con estado: se miden también en una segunda ejecución (índice/manifiesto ya creados)
+WARM_KEYWORD_MODES = ('index', 'incremental')
+# ---------------------------------
+
+
+def run_script(script: str, arguments: List[str], workdir: str) -> float:
+    """Ejecuta un script del proyecto en `workdir` y devuelve los segundos de reloj."""
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, os.path.join(ROOT, script)] + arguments, cwd=workdir,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - start
+    if completed.returncode != 0:
+        sys.exit(f"❌ ERROR: {script} {' '.join(arguments)} terminó con código {completed.returncode}:\n"
+                 f"{completed.stderr[-2000:]}")
+    return elapsed
+
+
+def trace_percentiles(trace_path: str, stages: Tuple[str, ...]) -> Dict[str, float]:
+    """p50/p95 (ms) de las etapas indicadas a partir de la traza JSONL de --trace."""
+    durations: Dict[str, List[float]] = {}
+    with open(trace_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            event = json.loads(line)
+            if event['stage'] in stages:
+                durations.setdefault(event['stage'], []).append(event['ms'])
+    metrics = {}
+    for stage, values in durations.items():
+        values.sort()
+        metrics[f"{stage}.p50_ms"] = round(percentile(values, 50), 3)
+        metrics[f"{stage}.p95_ms"] = round(percentile(values, 95), 3)
+    return metrics
+
+
+def load_seo_rows(db_path: str) -> List[tuple]:
+    """Resultados de la última ejecución de seo_auditor, sin las columnas de fecha/ejecución."""
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT url, title, meta_description, meta_keywords, canonical, h1, h2, h3, "
+                            "otras_meta, error FROM results WHERE run_id = (SELECT MAX(run_id) FROM runs) "
+                            "ORDER BY url").fetchall()
+    finally:
+        conn.close()
+
+
+def pop_keyword_report(workdir: str) -> Dict[str, int]:
+    """Lee y elimina el último XLSX generado: {keyword: coincidencias}."""
+    output_folder = os.path.join(workdir, 'outputs')
+    latest = max((os.path.join(output_folder, name) for name in os.listdir(output_folder)), key=os.path.getmtime)
+    df = pd.read_excel(latest, sheet_name='Reporte Coincidencias')
+    os.remove(latest)
+    return dict(zip(df['Keyword'].astype(str), df['Número de Coincidencias'].astype(int)))
+
+
+def folder_bytes(*folders: str) -> Tuple[int, int]:
+    """(archivos, bytes en disco) de los directorios indicados."""
+    n_files = total = 0
+    for folder in folders:
+        for dirpath, _, filenames in os.walk(folder):
+            for name in filenames:
+                n_files += 1
+                total += os.path.getsize(os.path.join(dirpath, name))
+    return n_files, total
+
+
+def run_seo_modes(args: argparse.Namespace, base_urls: List[str], workdir: str,
+                  metrics: Dict[str, Any]) -> str:
+    """Ejecuta seo_auditor.py en cada modo; devuelve el directorio del último (para keyword_auditor)."""
+    last_folder = ''
+    reference: Optional[List[tuple]] = None
+    for mode in args.seo_modes:
+        folder = os.path.join(workdir, f"seo_{mode}")
+        os.makedirs(folder)
+        write_url_list(os.path.join(folder, 'urls.txt'), base_urls, args.pages, args.page_kb, args.headings,
+                       args.metas)
+        arguments = ['--workers', str(args.workers), '--parse-workers', str(args.parse_workers),
+                     '--trace', 'traza.jsonl'] + SEO_MODES[mode]
+        seconds = run_script('seo_auditor.py', arguments, folder)
+
+        rows = load_seo_rows(os.path.join(folder, seo_auditor.RESULTS_DB_FILE))
+        if len(rows) != args.pages:
+            sys.exit(f"❌ ERROR: seo_auditor ({mode}) guardó {len(rows)} resultados de {args.pages} páginas.")
+        if reference is None:
+            reference = rows
+        elif rows != reference:
+            sys.exit(f"❌ ERROR: seo_auditor ({mode}) da resultados distintos a los de '{args.seo_modes[0]}'.")
+        errors = sum(1 for row in rows if row[-1] is not None)
+        metrics[f"seo.{mode}.s"] = round(seconds, 3)
+        metrics[f"seo.{mode}.paginas_s"] = round(args.pages / seconds, 2)
+        metrics.update({f"seo.{mode}.{name}": value for name, value in trace_percentiles(
+            os.path.join(folder, 'traza.jsonl'), ('http.get', 'parse.bs4', 'http.download+parse.stream')).items()})
+        print(f"  seo_auditor {mode:<12}: {seconds:7.2f} s | {args.pages / seconds:8.1f} páginas/s | "
+              f"{errors} errores inyectados")
+        last_folder = folder
+    return last_folder
+
+
+def run_keyword_modes(args: argparse.Namespace, corpus_folder: str, metrics: Dict[str, Any]):
+    """Ejecuta keyword_auditor.py en cada modo sobre el contenido descargado y compara los totales."""
+    write_keyword_workbook(os.path.join(corpus_folder, 'keywords.xlsx'), args.keywords, args.hit_ratio, args.seed)
+    n_files, n_bytes = folder_bytes(os.path.join(corpus_folder, 'reports'), os.path.join(corpus_folder, 'index'))
+    print(f"  Corpus: {n_files} archivos | {n_bytes / 1e6:.1f} MB en disco | {args.keywords} keywords")
+
+    reference: Optional[Dict[str, int]] = None
+    for mode in args.keyword_modes:
+        runs = [mode, f"{mode}.caliente"] if mode in WARM_KEYWORD_MODES else [mode]
+        for name in runs:
+            seconds = run_script('keyword_auditor.py', KEYWORD_MODES[mode], corpus_folder)
+            totals = pop_keyword_report(corpus_folder)
+            if reference is None:
+                reference = totals
+            elif totals != reference:
+                sys.exit(f"❌ ERROR: keyword_auditor ({name}) da totales distintos a los de "
+                         f"'{args.keyword_modes[0]}'.")
+            metrics[f"keywords.{name}.s"] = round(seconds, 3)
+            metrics[f"keywords.{name}.mb_s"] = round(n_bytes / 1e6 / seconds, 2)
+            print(f"  keyword_auditor {name:<20}: {seconds:7.2f} s | {n_files / seconds:8.1f} archivos/s | "
+                  f"{n_bytes / 1e6 / seconds:6.1f} MB/s")
+    metrics['keywords.coincidencias'] = sum(reference.values()) if reference else 0
+
+
+def run_components(args: argparse.Namespace, metrics: Dict[str, Any]):
+    """Parseo y conteo en el propio proceso (sin red ni arranque de Python)."""
+    pages = [render_synthetic_page(i, args.page_kb, args.headings, args.metas, args.seed)
+             for i in range(min(args.pages, args.component_pages))]
+    total_mb = sum(len(page.encode('utf-8')) for page in pages) / 1e6
+
+    for backend, parse in sorted(seo_auditor.PARSER_BACKENDS.items()):
+        start = time.perf_counter()
+        for i, page in enumerate(pages):
+            parse(f"http://sintetica/{i}", page)
+        seconds = time.perf_counter() - start
+        metrics[f"parse.{backend}.mb_s"] = round(total_mb / seconds, 2)
+        print(f"  parseo {backend:<8}: {len(pages) / seconds:8.1f} páginas/s | {total_mb / seconds:6.1f} MB/s")
+
+    keywords = pd.read_excel(os.path.join(args.corpus_folder, 'keywords.xlsx'))['Keywords'].astype(str).str.lower()
+    automaton = build_keyword_automaton(sorted(set(keywords)))
+    start = time.perf_counter()
+    for page in pages:
+        count_keywords_in_content(automaton, page.lower())
+    seconds = time.perf_counter() - start
+    metrics['match.mb_s'] = round(total_mb / seconds, 2)
+    print(f"  conteo de keywords: {total_mb / seconds:6.1f} MB/s ({len(keywords)} keywords)")
+
+
+def compare_with_previous(record: Dict[str, Any], results_file: str, tolerance: float) -> List[str]:
+    """Compara con la última ejecución de la misma configuración y devuelve las regresiones."""
+    previous = None
+    if os.path.exists(results_file):
+        with open(results_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                entry = json.loads(line)
+                if entry.get('config') == record['config']:
+                    previous = entry
+    if previous is None:
+        print("ℹ️ Sin ejecuciones anteriores con esta configuración: esta queda como referencia.")
+        return []
+
+    regressions = []
+    width = max(len(name) for name in record['metrics'])
+    print(f"\n📈 Comparación con la ejecución del {previous['timestamp']} (commit {previous.get('commit')}); "
+          f"cambio positivo = peor:")
+    for name, value in record['metrics'].items():
+        old = previous['metrics'].get(name)
+        if not old or not isinstance(value, (int, float)) or name == 'keywords.coincidencias':
+            continue
+        # Tiempos y percentiles: más es peor. Rendimientos (/s): menos es peor.
+        lower_is_better = name.endswith(('.s', '_ms'))
+        change = (value - old) / old if lower_is_better else (old - value) / old
+        # Los percentiles por etapa son orientativos: con pocas muestras el p95 es ruidoso
+        flag = "  ⚠️ REGRESIÓN" if change > tolerance and not name.endswith('_ms') else ""
+        if flag:
+            regressions.append(name)
+        print(f"  {name:<{width}} {old:>10} -> {value:>10} ({change * 100:+6.1f}%){flag}")
+    return regressions
+
+
+def get_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--page-kb', type=int, default=DEFAULT_PAGE_KB)
+    parser.add_argument('--headings', type=int, default=DEFAULT_HEADINGS)
+    parser.add_argument('--metas', type=int, default=DEFAULT_METAS)
+    parser.add_argument('--keywords', type=int, default=1000)
+    parser.add_argument('--hit-ratio', type=float, default=0.5, help="Fracción de keywords presentes en las páginas.")
+    parser.add_argument('--hosts', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--jitter', type=float, default=0.01)
+    parser.add_argument('--error-rate', type=float, default=0.02)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--parse-workers', type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument('--seo-modes', default=','.join(SEO_MODES), help="Modos de seo_auditor separados por comas.")
+    parser.add_argument('--keyword-modes', default=','.join(KEYWORD_MODES),
+                        help="Modos de keyword_auditor separados por comas.")
+    parser.add_argument('--component-pages', type=int, default=200, help="Páginas de las mediciones en proceso.")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--results-file', default=DEFAULT_RESULTS_FILE)
+    parser.add_argument('--no-save', action='store_true', help="No guarda esta ejecución en --results-file.")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--fail-on-regression', action='store_true')
+    parser.add_argument('--keep', action='store_true', help="Conserva el directorio de trabajo.")
+    args = parser.parse_args()
+    args.seo_modes = [mode for mode in args.seo_modes.split(',') if mode]
+    args.keyword_modes = [mode for mode in args.keyword_modes.split(',') if mode]
+    unknown = (set(args.seo_modes) - set(SEO_MODES)) | (set(args.keyword_modes) - set(KEYWORD_MODES))
+    if unknown or not args.seo_modes:
+        parser.error(f"Modos desconocidos o vacíos: {sorted(unknown)}")
+
+    config = {name: value for name, value in vars(args).items()
+              if name not in ('results_file', 'no_save', 'tolerance', 'fail_on_regression', 'keep')}
+    servers = [start_stub_server(latency=args.latency, latency_jitter=args.jitter, error_rate=args.error_rate,
+                                 seed=args.seed) for _ in range(args.hosts)]
+    workdir = tempfile.mkdtemp(prefix='suite_seo_')
+    metrics: Dict[str, Any] = {}
+    try:
+        print(f"🧪 Suite: {args.pages} páginas de {args.page_kb} KB | {args.hosts} hosts | latencia "
+              f"{args.latency}+{args.jitter} s | {args.error_rate:.0%} errores | directorio {workdir}")
+        args.corpus_folder = run_seo_modes(args, [base_url for _, base_url in servers], workdir, metrics)
+        run_keyword_modes(args, args.corpus_folder, metrics)
+        run_components(args, metrics)
+    finally:
+        for server, _ in servers:
+            server.shutdown()
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    record = {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': get_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'config': config,
+        'metrics': metrics,
+    }
+    regressions = compare_with_previous(record, args.results_file, args.tolerance)
+    if not args.no_save:
+        with open(args.results_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        print(f"💾 Resultados añadidos a {os.path.abspath(args.results_file)}")
+
+    if regressions:
+        print(f"⚠️ {len(regressions)} métricas empeoraron más de un {args.tolerance:.0%}.")
+        if args.fail_on_regression:
+            sys.exit(1)
+    print("✅ Suite completada: resultados idénticos en todos los modos.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,262 @@
+"""
+Servidor HTTP local (stub) para benchmarks y pruebas manuales sin red.
+
+Sirve páginas HTML sintéticas en `/pagina/<n>` y admite parámetros en la URL:
+    ?delay=0.2   -> espera 0.2 s antes de responder
+    ?status=503  -> responde con ese código de estado
+
+Las respuestas 200 incluyen ETag y Last-Modified, y una petición con If-None-Match
+igual al ETag recibe 304 Not Modified (para probar la caché HTTP).
+
+Para el modo de rastreo sirve además un sitio sintético enlazado en `/sitio/<n>`
+(árbol de `site_pages` páginas, cada una enlaza a sus `site_fanout` hijas, a su padre,
+a variantes con fragmento, a un sitio externo y a `/privado/<n>`) y un `/robots.txt`
+que prohíbe `/privado/`; `robots_delay` lo retrasa y `robots_pad_mb` le añade ese
+relleno de comentarios (robots.txt lento o enorme).
+
+Para la suite de benchmarks (run_suite.py) sirve páginas sintéticas de tamaño y densidad
+configurables en `/sintetica/<n>?kb=40&headings=30&metas=15` (ver synthetic_data.py), y
+permite inyectar a nivel de servidor una latencia base con variación aleatoria y una
+fracción de respuestas con error (deterministas por ruta, reproducibles entre ejecuciones).
+
+Fallos transitorios para probar los reintentos (fetch_scheduler.py): con `?fail=N` las
+N primeras peticiones a esa URL fallan según `fault`: un código de estado (`503`, `429`...,
+opcionalmente con `&retry_after=S`), `reset` (cierra la conexión sin responder) o `hang`
+(responde tras `&hang=S` segundos). `server.requests_seen` cuenta las peticiones por ruta.
+
+Con `?newline=crlf` (o `cr`, `lf`) la página lleva un salto de línea de ese tipo entre
+cada par de etiquetas, para comprobar que la caché HTTP conserva el cuerpo exacto.
+Con `?nohead=1` se omiten `</head>` y `<body>` (opcionales en HTML), como hacen algunas
+páginas minimizadas.
+
+Respuestas problemáticas para los límites de descarga: `?ctype=image/png` cambia el
+Content-Type, `?pad_mb=50` añade 50 MB de relleno tras la página y `?endless=1` envía un
+cuerpo sin Content-Length que no termina nunca.
+
+También se puede arrancar de forma independiente para pruebas manuales:
+    python benchmarks/stub_server.py --port 8000 --latency 0.05 --jitter 0.02 --error-rate 0.05
+"""
+import argparse
+import hashlib
+import random
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+from urllib.parse import parse_qs, urlparse
+
+from synthetic_data import render_synthetic_page, DEFAULT_PAGE_KB, DEFAULT_HEADINGS, DEFAULT_METAS, DEFAULT_SEED
+
+
+def render_page(name: str) -> str:
+    """Página HTML determinista con title, metas, canonical y encabezados."""
+    return (
+        "<!DOCTYPE html><html><head>"
+        f"<title>Página {name} – Auditoría</title>"
+        f'<meta name="description" content="Descripción de la página {name}">'
+        '<meta name="keywords" content="seo, auditoría, información">'
+        '<meta name="robots" content="index, follow">'
+        f'<meta property="og:title" content="OG {name}">'
+        f'<link rel="canonical" href="/pagina/{name}">'
+        "</head><body>"
+        f"<h1>Encabezado principal {name}</h1>"
+        + "".join(f"<h2>Sección {i}</h2><p>Texto de ejemplo con acentos: información, señal.</p>" for i in range(5))
+        + "<h3>Detalle</h3></body></html>"
+    )
+
+
+def render_site_page(index: int, total: int, fanout: int) -> str:
+    """Página del sitio sintético con enlaces a hijas, padre, duplicados y externos."""
+    children = [child for child in range(index * fanout + 1, index * fanout + fanout + 1) if child < total]
+    links = [f'<a href="/sitio/{child}">Hija {child}</a>' for child in children]
+    links.append(f'<a href="/sitio/{max(0, (index - 1) // fanout)}#arriba">Padre</a>')
+    links.append(f'<a href="{index}">Relativo a sí misma</a>')
+    links.append(f'<a href="/privado/{index}">Privado</a>')
+    links.append('<a href="https://externo.example/">Externo</a>')
+    links.append('<a href="/logo.png">Imagen</a>')
+    return (
+        "<!DOCTYPE html><html><head>"
+        f"<title>Sitio {index}</title>"
+        f'<meta name="description" content="Página {index} del sitio sintético">'
+        "</head><body>"
+        f"<h1>Sitio {index}</h1><nav>{''.join(links)}</nav></body></html>"
+    )
+
+
+ROBOTS_TXT = "User-agent: *\nDisallow: /privado/\n"
+NEWLINES = {'crlf': b'\r\n', 'cr': b'\r', 'lf': b'\n'}   # ?newline=
+PADDING_BLOCK = b"<!-- relleno -->" * 4096   # 64 KB añadidos tras la página con ?pad_mb= o ?endless
+ROBOTS_PADDING_BLOCK = b"# relleno\n" * 6554   # ~64 KB de comentarios tras el robots.txt (robots_pad_mb)
+
+
+@lru_cache(maxsize=4096)
+def render_synthetic_body(index: int, size_kb: int, headings: int, metas: int, seed: int) -> bytes:
+    """Página sintética ya codificada (se genera una sola vez por combinación de parámetros)."""
+    return render_synthetic_page(index, size_kb, headings, metas, seed).encode('utf-8')
+
+
+def path_random(path: str, seed: int) -> random.Random:
+    """Generador determinista por ruta: la misma URL recibe siempre la misma latencia y error."""
+    return random.Random(f"{seed}:{path}")
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Manejador que genera las páginas y aplica la latencia/errores pedidos."""
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        params = parse_qs(parsed.query)
+
+        server = self.server
+        with server.lock:
+            server.requests_seen[self.path] += 1
+            attempt = server.requests_seen[self.path]
+        if attempt <= int(params.get('fail', ['0'])[0]) and self.inject_fault(params):
+            return
+
+        # Latencia y errores inyectados a nivel de servidor (robots.txt solo admite robots_delay)
+        status = 200
+        delay = float(params.get('delay', ['0'])[0])
+        if parsed.path == '/robots.txt':
+            delay += server.robots_delay
+        elif server.latency or server.latency_jitter or server.error_rate:
+            rng = path_random(self.path, server.seed)
+            delay += server.latency + rng.uniform(0, server.latency_jitter)
+            if rng.random() < server.error_rate:
+                status = server.error_status
+        if delay:
+            time.sleep(delay)
+
+        status = int(params.get('status', [status])[0])
+        if parsed.path == '/robots.txt':
+            body = ROBOTS_TXT.encode('utf-8')
+        elif parsed.path.startswith('/sitio/'):
+            index = int(parsed.path.rsplit('/', 1)[-1] or 0)
+            if index >= self.server.site_pages:
+                status = 404
+            body = render_site_page(index, self.server.site_pages, self.server.site_fanout).encode('utf-8')
+        elif parsed.path.startswith('/sintetica/'):
+            body = render_synthetic_body(int(parsed.path.rsplit('/', 1)[-1] or 0),
+                                         int(params.get('kb', [DEFAULT_PAGE_KB])[0]),
+                                         int(params.get('headings', [DEFAULT_HEADINGS])[0]),
+                                         int(params.get('metas', [DEFAULT_METAS])[0]), server.seed)
+        else:
+            body = render_page(parsed.path.rsplit('/', 1)[-1] or 'inicio').encode('utf-8')
+        if 'newline' in params:
+            body = body.replace(b'><', b'>' + NEWLINES[params['newline'][0]] + b'<')
+        if 'nohead' in params:
+            body = body.replace(b'</head>', b'', 1).replace(b'<body>', b'', 1)
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+
+        if status == 200 and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        # Respuestas problemáticas para los límites de descarga (download_policy.py)
+        padding = int(float(params.get('pad_mb', ['0'])[0]) * 1024 * 1024)
+        padding_block = PADDING_BLOCK
+        if parsed.path == '/robots.txt':
+            padding, padding_block = int(server.robots_pad_mb * 1024 * 1024), ROBOTS_PADDING_BLOCK
+        endless = 'endless' in params
+        self.send_response(status)
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', 'Mon, 05 Oct 2026 10:00:00 GMT')
+        self.send_header('Content-Type', params.get('ctype', ['text/html; charset=utf-8'])[0])
+        if endless:
+            # Sin Content-Length: el cuerpo termina cuando se cierra la conexión (nunca)
+            self.close_connection = True
+        else:
+            self.send_header('Content-Length', str(len(body) + padding))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+            while padding > 0 or endless:
+                block = padding_block[:padding] if not endless else padding_block
+                self.wfile.write(block)
+                padding -= len(block)
+        except (BrokenPipeError, ConnectionResetError):
+            # El cliente dejó de leer (límite de tamaño o modo head-only)
+            pass
+
+    def inject_fault(self, params) -> bool:
+        """Aplica el fallo `fault` de la URL; devuelve True si la petición ya quedó respondida."""
+        fault = params.get('fault', ['503'])[0]
+        if fault == 'reset':
+            # Sin respuesta: el cliente ve la conexión cerrada (RemoteDisconnected)
+            self.close_connection = True
+            return True
+        if fault == 'hang':
+            time.sleep(float(params.get('hang', ['30'])[0]))
+            return False
+        body = f"Fallo inyectado {fault}".encode('utf-8')
+        self.send_response(int(fault))
+        if 'retry_after' in params:
+            self.send_header('Retry-After', params['retry_after'][0])
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        return True
+
+    def log_message(self, format, *args):
+        # Silencioso: no ensuciar la salida de los benchmarks
+        pass
+
+
+def start_stub_server(host: str = '127.0.0.1', port: int = 0,
+                      site_pages: int = 100, site_fanout: int = 5,
+                      latency: float = 0.0, latency_jitter: float = 0.0,
+                      error_rate: float = 0.0, error_status: int = 503,
+                      seed: int = DEFAULT_SEED, robots_delay: float = 0.0,
+                      robots_pad_mb: float = 0.0) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Arranca el servidor en un hilo daemon y devuelve (servidor, URL base).
+
+    Args:
+        latency: Segundos de espera añadidos a cada respuesta.
+        latency_jitter: Espera adicional aleatoria entre 0 y este valor.
+        error_rate: Fracción de rutas que responden con `error_status`.
+        seed: Semilla de las páginas sintéticas y de la latencia/errores por ruta.
+        robots_delay: Segundos de espera antes de responder /robots.txt.
+        robots_pad_mb: MB de comentarios añadidos al final de /robots.txt.
+    """
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.site_pages = site_pages
+    server.site_fanout = site_fanout
+    server.latency = latency
+    server.latency_jitter = latency_jitter
+    server.error_rate = error_rate
+    server.error_status = error_status
+    server.seed = seed
+    server.robots_delay = robots_delay
+    server.robots_pad_mb = robots_pad_mb
+    server.lock = threading.Lock()
+    server.requests_seen = Counter()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    args = parser.parse_args()
+
+    stub, base_url = start_stub_server(args.host, args.port, latency=args.latency, latency_jitter=args.jitter,
+                                       error_rate=args.error_rate, error_status=args.error_status, seed=args.seed)
+    print(f"🌐 Servidor local en {base_url} (páginas sintéticas en {base_url}/sintetica/<n>). Ctrl+C para salir.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        stub.shutdown()
@@ -0,0 +1,147 @@
+"""
+Generadores deterministas de datos sintéticos para la suite de benchmarks (run_suite.py)
+y el servidor local (stub_server.py).
+
+- Páginas HTML de tamaño configurable (`size_kb`) con un número configurable de
+  encabezados H1/H2/H3 (`headings`) y de etiquetas <meta> (`metas`).
+- Libros de palabras clave (.xlsx) con el mismo formato que Keywords_ejemplo.xlsx
+  (columna 'Keywords' y pujas), con una fracción de keywords presentes en las páginas.
+- Listas de URLs (urls.txt) que apuntan al servidor local.
+
+El texto de las páginas y las keywords salen del mismo vocabulario de frases, así que
+la misma semilla produce exactamente las mismas páginas, keywords y coincidencias.
+"""
+import random
+from functools import lru_cache
+from typing import List, Optional
+
+# --- CONFIGURACIÓN DE LOS DATOS SINTÉTICOS ---
+DEFAULT_SEED = 42
+DEFAULT_PAGE_KB = 40
+DEFAULT_HEADINGS = 30
+DEFAULT_METAS = 15
+VOCABULARY_WORDS = 3000
+VOCABULARY_PHRASES = 5000
+ALPHABET = 'abcdefghijklmnopqrstuvwxyzñáéíóú'
+# Palabras reales con acentos para que las páginas se parezcan a contenido en español
+COMMON_WORDS = ['auditoría', 'información', 'señal', 'posicionamiento', 'búsqueda', 'página', 'análisis',
+                'categoría', 'envío', 'teléfono', 'dirección', 'opinión', 'compañía', 'diseño', 'cámara']
+# ---------------------------------------------
+
+
+@lru_cache(maxsize=8)
+def get_vocabulary(seed: int = DEFAULT_SEED) -> List[str]:
+    """Frases de una a tres palabras (deterministas para cada semilla)."""
+    rng = random.Random(seed)
+    words = set(COMMON_WORDS)
+    while len(words) < VOCABULARY_WORDS:
+        words.add(''.join(rng.choice(ALPHABET) for _ in range(rng.randint(3, 10))))
+    words_list = sorted(words)
+    phrases = set()
+    while len(phrases) < VOCABULARY_PHRASES:
+        phrases.add(' '.join(rng.choice(words_list) for _ in range(rng.choice((1, 1, 2, 3)))))
+    return sorted(phrases)
+
+
+def render_synthetic_page(index: int, size_kb: int = DEFAULT_PAGE_KB, headings: int = DEFAULT_HEADINGS,
+                          metas: int = DEFAULT_METAS, seed: int = DEFAULT_SEED) -> str:
+    """
+    Página HTML determinista de ~`size_kb` KB con `metas` etiquetas <meta> (description,
+    keywords, robots, Open Graph y genéricas) y `headings` encabezados repartidos por el
+    cuerpo (1 H1, el resto alternando H2/H3).
+    """
+    rng = random.Random(seed * 1_000_003 + index)
+    vocabulary = get_vocabulary(seed)
+
+    def sentence(n_phrases: int) -> str:
+        return ' '.join(rng.choice(vocabulary) for _ in range(n_phrases)).capitalize() + '.'
+
+    head = [f"<title>Página sintética {index} – {sentence(3)}</title>",
+            '<meta charset="utf-8">',
+            f'<link rel="canonical" href="/sintetica/{index}">']
+    meta_tags = [f'<meta name="description" content="{sentence(8)}">',
+                 f'<meta name="keywords" content="{", ".join(rng.sample(vocabulary, 5))}">',
+                 '<meta name="robots" content="index, follow">',
+                 f'<meta property="og:title" content="{sentence(3)}">']
+    meta_tags += [f'<meta name="generico-{i}" content="{sentence(2)}">' for i in range(max(0, metas - 4))]
+    head += meta_tags[:max(0, metas)]
+
+    heading_tags = [f"<h1>{sentence(3)}</h1>"] if headings > 0 else []
+    heading_tags += [f"<h{2 + (i % 2)}>{sentence(2)}</h{2 + (i % 2)}>" for i in range(max(0, headings - 1))]
+
+    body: List[str] = []
+    target = size_kb * 1024
+    size = sum(len(part) for part in head) + sum(len(tag) for tag in heading_tags)
+    paragraphs: List[str] = []
+    while size < target:
+        paragraph = f'<p class="texto">{sentence(rng.randint(8, 30))}</p>'
+        paragraphs.append(paragraph)
+        size += len(paragraph.encode('utf-8'))
+    # Encabezados intercalados de forma uniforme entre los párrafos
+    step = max(1, len(paragraphs) // max(1, len(heading_tags)))
+    for i, paragraph in enumerate(paragraphs):
+        if i % step == 0 and heading_tags:
+            body.append(heading_tags.pop(0))
+        body.append(paragraph)
+    body.extend(heading_tags)
+
+    return ("<!DOCTYPE html><html><head>" + "".join(head) + "</head><body>"
+            + "\n".join(body) + "</body></html>")
+
+
+def generate_keywords(n_keywords: int, hit_ratio: float = 0.5, seed: int = DEFAULT_SEED) -> List[str]:
+    """
+    `n_keywords` keywords únicas: una fracción `hit_ratio` sale del vocabulario de las
+    páginas (tendrá coincidencias) y el resto son frases inventadas que no aparecen.
+    """
+    rng = random.Random(seed + 1)
+    vocabulary = get_vocabulary(seed)
+    n_hits = min(len(vocabulary), int(n_keywords * hit_ratio))
+    keywords = set(rng.sample(vocabulary, n_hits))
+    vocabulary_set = set(vocabulary)
+    while len(keywords) < n_keywords:
+        candidate = ' '.join(''.join(rng.choice(ALPHABET) for _ in range(rng.randint(4, 9)))
+                             for _ in range(rng.randint(1, 3)))
+        if candidate not in vocabulary_set:
+            keywords.add(candidate)
+    keywords_list = sorted(keywords)
+    rng.shuffle(keywords_list)
+    return keywords_list
+
+
+def write_keyword_workbook(path: str, n_keywords: int, hit_ratio: float = 0.5, seed: int = DEFAULT_SEED,
+                           duplicates: int = 0) -> List[str]:
+    """
+    Escribe un .xlsx con el formato de Keywords_ejemplo.xlsx (columna 'Keywords' y pujas) y
+    devuelve las keywords. `duplicates` repite keywords (en otra capitalización) para
+    ejercitar la eliminación de duplicados de get_keywords_from_excel.
+    """
+    import pandas as pd  # Solo se necesita al generar el libro
+
+    keywords = generate_keywords(n_keywords, hit_ratio, seed)
+    rng = random.Random(seed + 2)
+    rows = keywords + [rng.choice(keywords).upper() for _ in range(duplicates)]
+    pd.DataFrame({
+        'Keywords': rows,
+        'Top of Page Bid (Low Range) (USD)': [round(rng.uniform(0.1, 2), 2) for _ in rows],
+        'Top of Page Bid (High Range) (USD)': [round(rng.uniform(2, 8), 2) for _ in rows],
+    }).to_excel(path, index=False)
+    return keywords
+
+
+def synthetic_url(base_url: str, index: int, size_kb: int = DEFAULT_PAGE_KB, headings: int = DEFAULT_HEADINGS,
+                  metas: int = DEFAULT_METAS) -> str:
+    """URL de una página sintética servida por stub_server."""
+    return f"{base_url}/sintetica/{index}?kb={size_kb}&headings={headings}&metas={metas}"
+
+
+def write_url_list(path: str, base_urls: List[str], n_pages: int, size_kb: int = DEFAULT_PAGE_KB,
+                   headings: int = DEFAULT_HEADINGS, metas: int = DEFAULT_METAS,
+                   comment: Optional[str] = None) -> List[str]:
+    """Escribe urls.txt con `n_pages` páginas sintéticas repartidas entre los servidores."""
+    urls = [synthetic_url(base_urls[i % len(base_urls)], i, size_kb, headings, metas) for i in range(n_pages)]
+    with open(path, 'w', encoding='utf-8') as f:
+        if comment:
+            f.write(f"# {comment}\n")
+        f.write("\n".join(urls) + "\n")
+    return urls
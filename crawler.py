@@ -0,0 +1,260 @@
+import hashlib
+import math
+import time
+from collections import deque
+from html.parser import HTMLParser
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse, urlunparse
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+from fetch_scheduler import DEFAULT_TIMEOUT, FetchScheduler
+
+# --- CONFIGURACIÓN DEL CRAWLER ---
+DEFAULT_MAX_DEPTH = 3          # Saltos máximos desde las URLs semilla
+DEFAULT_MAX_PAGES = 1000       # Páginas máximas a auditar en total
+BLOOM_THRESHOLD = 50000        # A partir de este presupuesto se usa un filtro de Bloom
+BLOOM_ERROR_RATE = 0.001       # Probabilidad de falso positivo del filtro de Bloom
+MAX_ROBOTS_TXT_BYTES = 500 * 1024   # Como Google: lo que sigue en robots.txt se ignora
+ROBOTS_CHUNK_SIZE = 16 * 1024
+# Extensiones que no son páginas HTML y no se encolan
+SKIPPED_EXTENSIONS = (
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.ico', '.bmp', '.pdf', '.zip', '.gz',
+    '.rar', '.7z', '.mp3', '.mp4', '.avi', '.mov', '.webm', '.css', '.js', '.json', '.xml',
+    '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.woff', '.woff2', '.ttf', '.eot'
+)
+# ---------------------------------
+
+
+def normalize_url(url: str, base_url: Optional[str] = None) -> Optional[str]:
+    """
+    Normaliza una URL para deduplicarla: la resuelve contra `base_url`, pasa esquema y
+    host a minúsculas, elimina el puerto por defecto y el fragmento (#...) y usa '/'
+    como ruta vacía. Devuelve None si no es una URL http(s).
+    """
+    if base_url:
+        url = urljoin(base_url, url.strip())
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower()
+    if scheme not in ('http', 'https') or not parsed.hostname:
+        return None
+
+    host = parsed.hostname.lower()
+    try:
+        port = parsed.port
+    except ValueError:
+        return None
+    if port and not ((scheme == 'http' and port == 80) or (scheme == 'https' and port == 443)):
+        host = f"{host}:{port}"
+
+    return urlunparse((scheme, host, parsed.path or '/', parsed.params, parsed.query, ''))
+
+
+def get_site_key(url: str) -> str:
+    """Sitio al que pertenece una URL: host sin 'www.' (www.dominio.com == dominio.com)."""
+    host = (urlparse(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+class LinkExtractor(HTMLParser):
+    """Extrae los href de los enlaces <a> (respetando <base href>) sin construir el DOM."""
+
+    def __init__(self, page_url: str):
+        super().__init__(convert_charrefs=True)
+        self.base_url = page_url
+        self.links: List[str] = []
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        if tag == 'base':
+            href = dict(attrs).get('href')
+            if href:
+                self.base_url = urljoin(self.base_url, href)
+        elif tag == 'a':
+            attributes = dict(attrs)
+            href = attributes.get('href')
+            if href and 'nofollow' not in (attributes.get('rel') or '').lower().split():
+                self.links.append(href)
+
+
+def extract_internal_links(html_content: str, page_url: str) -> List[str]:
+    """Enlaces normalizados de la página que pertenecen al mismo sitio."""
+    extractor = LinkExtractor(page_url)
+    try:
+        extractor.feed(html_content)
+        extractor.close()
+    except Exception:
+        pass
+
+    site = get_site_key(page_url)
+    links = []
+    for href in extractor.links:
+        url = normalize_url(href, extractor.base_url)
+        if url and get_site_key(url) == site and not urlparse(url).path.lower().endswith(SKIPPED_EXTENSIONS):
+            links.append(url)
+    return links
+
+
+class BloomFilter:
+    """
+    Conjunto probabilístico de tamaño fijo para deduplicar cientos de miles de URLs con
+    poca memoria. Nunca da falsos negativos; con probabilidad `error_rate` puede indicar
+    que una URL nueva ya fue vista (y esa URL no se visitará).
+    """
+
+    def __init__(self, capacity: int, error_rate: float = BLOOM_ERROR_RATE):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterator[int]:
+        # Doble hashing: h1 + i*h2 a partir de un único digest
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+def read_robots_lines(response: Any, max_bytes: int = MAX_ROBOTS_TXT_BYTES) -> List[str]:
+    """
+    Líneas del robots.txt (respuesta pedida con stream=True) leyendo como máximo
+    `max_bytes`; si se corta, se descarta la última línea incompleta. Se decodifica como
+    UTF-8, la codificación del estándar (RFC 9309).
+    """
+    blocks, size = [], 0
+    for block in response.iter_content(chunk_size=ROBOTS_CHUNK_SIZE):
+        blocks.append(block)
+        size += len(block)
+        if size >= max_bytes:
+            body = b''.join(blocks)[:max_bytes]
+            body = body[:body.rfind(b'\n') + 1]
+            break
+    else:
+        body = b''.join(blocks)
+    return body.decode('utf-8', errors='replace').splitlines()
+
+
+class RobotsPolicy:
+    """
+    Descarga y cachea el robots.txt de cada host, y aplica sus reglas (can_fetch)
+    y su Crawl-delay entre peticiones consecutivas al mismo host.
+
+    El robots.txt se pide con los tiempos de espera de `scheduler` (los adaptativos del
+    host) o, sin él, con DEFAULT_TIMEOUT, y solo se leen sus primeros
+    MAX_ROBOTS_TXT_BYTES: uno lento o enorme no bloquea ni agota la memoria del rastreo.
+    """
+
+    def __init__(self, user_agent: str, session: Optional[requests.Session] = None,
+                 min_delay: float = 0.0, respect_robots: bool = True,
+                 scheduler: Optional[FetchScheduler] = None):
+        self.user_agent = user_agent
+        self.session = session if session is not None else requests.Session()
+        self.min_delay = min_delay
+        self.respect_robots = respect_robots
+        self.scheduler = scheduler
+        self._parsers: Dict[str, Optional[RobotFileParser]] = {}
+        self._last_request: Dict[str, float] = {}
+
+    def _get_parser(self, url: str) -> Optional[RobotFileParser]:
+        parsed = urlparse(url)
+        origin = f"{parsed.scheme}://{parsed.netloc}"
+        if origin not in self._parsers:
+            parser: Optional[RobotFileParser] = None
+            robots_url = origin + '/robots.txt'
+            timeout = self.scheduler.get_timeouts(robots_url) if self.scheduler is not None else DEFAULT_TIMEOUT
+            try:
+                with self.session.get(robots_url, headers={'User-Agent': self.user_agent}, verify=False,
+                                      timeout=timeout, stream=True) as response:
+                    parser = RobotFileParser(robots_url)
+                    if response.status_code in (401, 403):
+                        parser.disallow_all = True
+                    elif response.status_code >= 400:
+                        parser.allow_all = True
+                    else:
+                        parser.parse(read_robots_lines(response))
+            except requests.exceptions.RequestException:
+                parser = None  # Sin robots.txt accesible: se permite todo
+            self._parsers[origin] = parser
+        return self._parsers[origin]
+
+    def can_fetch(self, url: str) -> bool:
+        if not self.respect_robots:
+            return True
+        parser = self._get_parser(url)
+        return parser is None or parser.can_fetch(self.user_agent, url)
+
+    def wait_turn(self, url: str):
+        """Espera lo necesario para respetar el Crawl-delay del host."""
+        delay = self.min_delay
+        if self.respect_robots:
+            parser = self._get_parser(url)
+            robots_delay = parser.crawl_delay(self.user_agent) if parser is not None else None
+            if robots_delay:
+                delay = max(delay, float(robots_delay))
+
+        host = urlparse(url).netloc
+        elapsed = time.monotonic() - self._last_request.get(host, float('-inf'))
+        if elapsed < delay:
+            time.sleep(delay - elapsed)
+        self._last_request[host] = time.monotonic()
+
+
+def crawl_site(seeds: List[str],
+               extract: Callable[[str], Tuple[Dict[str, Any], str]],
+               robots: RobotsPolicy,
+               max_depth: int = DEFAULT_MAX_DEPTH,
+               max_pages: int = DEFAULT_MAX_PAGES) -> Iterator[Tuple[Dict[str, Any], str]]:
+    """
+    Recorre en anchura los sitios de las URLs semilla siguiendo solo enlaces internos.
+
+    - `extract(url)` descarga y analiza una página (p. ej. seo_auditor.extract_seo_data).
+    - La frontera guarda solo URLs; cada HTML se entrega al consumidor y se descarta, por
+      lo que la memoria no crece con el número de páginas.
+    - Las URLs se normalizan y deduplican con un set o, a partir de BLOOM_THRESHOLD
+      páginas de presupuesto, con un filtro de Bloom.
+    - Se respetan robots.txt y Crawl-delay (ver RobotsPolicy), `max_depth` y `max_pages`.
+
+    Produce las tuplas (resultados SEO, HTML) de cada página auditada.
+    """
+    if max_pages >= BLOOM_THRESHOLD:
+        seen: Any = BloomFilter(capacity=max_pages * 10)
+    else:
+        seen = set()
+
+    frontier: deque = deque()
+    for seed in seeds:
+        url = normalize_url(seed)
+        if url and url not in seen:
+            seen.add(url)
+            frontier.append((url, 0))
+
+    pages = 0
+    while frontier and pages < max_pages:
+        url, depth = frontier.popleft()
+        if not robots.can_fetch(url):
+            print(f"🚫 Bloqueada por robots.txt: {url}")
+            continue
+
+        robots.wait_turn(url)
+        results, html_content = extract(url)
+        pages += 1
+
+        if depth < max_depth and html_content and not results.get('error'):
+            for link in extract_internal_links(html_content, url):
+                if link not in seen:
+                    seen.add(link)
+                    frontier.append((link, depth + 1))
+
+        yield results, html_content
+
+    if frontier:
+        print(f"⚠️ Presupuesto de {max_pages} páginas agotado: {len(frontier)} URLs quedaron sin visitar.")
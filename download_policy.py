@@ -0,0 +1,201 @@
+import re
+import threading
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+# --- CONFIGURACIÓN DE LA DESCARGA ---
+DEFAULT_MAX_BODY_MB = 10       # Tamaño máximo del cuerpo de una página
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Tipos de contenido que se descargan (prefijos); sin Content-Type también se descarga
+ALLOWED_CONTENT_TYPES = ('text/', 'application/xhtml+xml', 'application/xml')
+# Modo head-only: se deja de leer tras </head> y el cierre de estas etiquetas
+HEAD_ONLY_TAGS = ('h1',)
+# ...o, si no aparecen (páginas sin H1), al abrirse tras </head> una de estas etiquetas
+# (el contenido que sigue al encabezado principal) o tras leer este presupuesto de bytes
+HEAD_ONLY_BOUNDARY_TAGS = ('h2',)
+HEAD_ONLY_BODY_BUDGET = 128 * 1024
+HEAD_ONLY_TAIL_BYTES = 32      # Solapamiento entre fragmentos al buscar las etiquetas de cierre
+# Etiquetas que pueden ir dentro de <head>: la primera etiqueta de apertura que no sea una
+# de ellas (p. ej. <body>, <div> o <h1>) cierra el head aunque la página omita </head>
+HEAD_ELEMENTS = frozenset((b'html', b'head', b'title', b'base', b'link', b'meta', b'style', b'script',
+                           b'noscript', b'template'))
+HEAD_RAW_TEXT_ELEMENTS = frozenset((b'script', b'style'))  # Su contenido no se interpreta como etiquetas
+# Apertura o cierre de cualquier etiqueta; el lookahead exige que el nombre esté completo
+HEAD_TAG_RE = re.compile(rb'<(/?)([a-zA-Z][a-zA-Z0-9-]*)(?=[\s/>])')
+# ------------------------------------
+
+
+class BodyTooLargeError(Exception):
+    """La respuesta supera el tamaño máximo permitido."""
+
+
+def get_content_length(response: Any) -> Optional[int]:
+    """Content-Length de la respuesta (bytes en la red) o None si no se conoce."""
+    try:
+        return int(response.headers.get('Content-Length'))
+    except (TypeError, ValueError):
+        return None
+
+
+class DownloadPolicy:
+    """
+    Límites de la descarga del cuerpo de cada página (respuestas pedidas con stream=True):
+
+    - Antes de leer el cuerpo se comprueba el Content-Type (solo tipos de texto/HTML) y el
+      Content-Length; las respuestas que no pasan se descartan sin descargarlas.
+    - El cuerpo se lee por fragmentos y se interrumpe al superar `max_bytes`
+      (BodyTooLargeError), de modo que una respuesta enorme o interminable no agota la
+      memoria ni bloquea un hilo.
+    - Modo head-only (opcional, para auditorías de metadatos): se deja de leer en cuanto
+      han aparecido el final del head y el cierre de `head_only_tags` (por defecto el
+      primer `</h1>`). El head termina en `</head>` o, si la página lo omite, en `<body>`
+      o en la primera etiqueta que no puede ir en el head. Title, metas, canonical y H1 quedan completos; H2/H3 solo incluyen los
+      que aparezcan antes del corte. Para que una página sin H1 no se descargue entera,
+      tras el head también se corta al abrirse una de `head_only_boundary_tags` (por
+      defecto el primer `<h2>`) o al superar `head_only_budget` bytes; un H1 posterior a
+      ese punto no se encuentra.
+
+    Acumula estadísticas de bytes descargados y evitados (thread-safe) para el resumen
+    de la ejecución.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BODY_MB * 1024 * 1024, check_content_type: bool = True,
+                 head_only: bool = False, head_only_tags: Sequence[str] = HEAD_ONLY_TAGS,
+                 head_only_boundary_tags: Sequence[str] = HEAD_ONLY_BOUNDARY_TAGS,
+                 head_only_budget: int = HEAD_ONLY_BODY_BUDGET):
+        self.max_bytes = max_bytes
+        self.check_content_type = check_content_type
+        self.head_only = head_only
+        self.head_only_budget = head_only_budget
+        self._required_tags = frozenset(('head',) + tuple(tag.lower() for tag in head_only_tags))
+        # Cierre de una etiqueta requerida (grupo 1) o apertura de una etiqueta límite (grupo 2)
+        self._closing_tag_re = re.compile(
+            rb'</(' + b'|'.join(re.escape(tag.encode('ascii')) for tag in sorted(self._required_tags)) + rb')\s*>'
+            + b''.join(rb'|<(' + re.escape(tag.lower().encode('ascii')) + rb')[\s/>]' for tag in head_only_boundary_tags),
+            re.IGNORECASE)
+        self._lock = threading.Lock()
+        self.stats = {'responses': 0, 'bytes_downloaded': 0, 'bytes_saved': 0, 'rejected_type': 0,
+                      'rejected_size': 0, 'head_only_stops': 0, 'head_only_fallback_stops': 0,
+                      'unknown_savings': 0}
+
+    def _add(self, **increments: int):
+        with self._lock:
+            for key, value in increments.items():
+                self.stats[key] += value
+
+    def check_headers(self, response: Any) -> Optional[str]:
+        """Mensaje de error si la respuesta no debe descargarse (tipo o tamaño), o None."""
+        content_length = get_content_length(response)
+        content_type = response.headers.get('Content-Type', '').split(';', 1)[0].strip().lower()
+        if self.check_content_type and content_type and not content_type.startswith(ALLOWED_CONTENT_TYPES):
+            self._add(responses=1, rejected_type=1, bytes_saved=content_length or 0,
+                      unknown_savings=int(content_length is None))
+            return f"Tipo de contenido no HTML ({content_type}): no se descarga el cuerpo."
+        if content_length is not None and content_length > self.max_bytes:
+            self._add(responses=1, rejected_size=1, bytes_saved=content_length)
+            return (f"Respuesta demasiado grande ({content_length / (1024 * 1024):.1f} MB, límite "
+                    f"{self.max_bytes / (1024 * 1024):.1f} MB): no se descarga el cuerpo.")
+        return None
+
+    @staticmethod
+    def _find_head_end(window: bytes, seen: int, raw_tag: Optional[bytes]) -> Tuple[Optional[int], Optional[bytes]]:
+        """
+        Posición de `window` donde termina el head (tras `</head>` o antes de la primera
+        etiqueta de cuerpo) o None, y la etiqueta script/style abierta al final del
+        fragmento. Las etiquetas que acaban antes de `seen` ya se vieron en el anterior.
+        """
+        for match in HEAD_TAG_RE.finditer(window):
+            if match.end() < seen:
+                continue
+            closing, name = match.group(1), match.group(2).lower()
+            if raw_tag is not None:
+                if closing and name == raw_tag:
+                    raw_tag = None
+            elif closing:
+                if name == b'head':
+                    return match.end(), None
+            elif name in HEAD_RAW_TEXT_ELEMENTS:
+                raw_tag = name
+            elif name not in HEAD_ELEMENTS:
+                return match.start(), None
+        return None, raw_tag
+
+    def iter_body(self, response: Any, chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Fragmentos del cuerpo (ya descomprimidos) respetando el tamaño máximo y el modo
+        head-only. Lanza BodyTooLargeError si se supera el límite.
+        """
+        size = 0
+        pending = set(self._required_tags) if self.head_only else None
+        body_start: Optional[int] = None   # Bytes leídos al terminar el head
+        raw_tag: Optional[bytes] = None    # script/style del head abierto entre fragmentos
+        tail = b''
+        stopped = False
+        try:
+            for block in response.iter_content(chunk_size=chunk_size):
+                size += len(block)
+                if size > self.max_bytes:
+                    self._add(rejected_size=1, unknown_savings=1)
+                    raise BodyTooLargeError(f"Respuesta mayor que el límite de {self.max_bytes / (1024 * 1024):.1f} MB: "
+                                            f"descarga interrumpida.")
+                yield block
+                if pending is not None:
+                    window = tail + block
+                    boundary = False
+                    head_end: Optional[int] = 0   # Las etiquetas límite solo cuentan tras el head
+                    if 'head' in pending:
+                        head_end, raw_tag = self._find_head_end(window, len(tail), raw_tag)
+                        if head_end is not None:
+                            pending.discard('head')
+                    if head_end is not None:
+                        for match in self._closing_tag_re.finditer(window, head_end):
+                            tag = match.group(1)
+                            if tag is not None:
+                                pending.discard(tag.lower().decode('ascii'))
+                            elif match.end() > len(tail):
+                                boundary = True
+                    tail = window[-HEAD_ONLY_TAIL_BYTES:]
+                    if body_start is None and 'head' not in pending:
+                        body_start = size
+                    if not pending:
+                        stopped = True
+                        break
+                    if body_start is not None and (boundary or size - body_start > self.head_only_budget):
+                        # Sin </h1> hasta el primer <h2> o en todo el presupuesto: no se espera más
+                        stopped = True
+                        self._add(head_only_fallback_stops=1)
+                        break
+        finally:
+            self._account(response, size, stopped)
+
+    def _account(self, response: Any, decoded_size: int, stopped: bool):
+        """Bytes descargados (en la red si se conocen) y, tras un corte head-only, los evitados."""
+        raw = getattr(response, 'raw', None)
+        wire_bytes = raw.tell() if raw is not None and hasattr(raw, 'tell') else decoded_size
+        increments: Dict[str, int] = {'responses': 1, 'bytes_downloaded': wire_bytes}
+        if stopped:
+            increments['head_only_stops'] = 1
+            content_length = get_content_length(response)
+            if content_length is not None:
+                increments['bytes_saved'] = max(0, content_length - wire_bytes)
+            else:
+                increments['unknown_savings'] = 1
+        self._add(**increments)
+
+    def read_body(self, response: Any) -> bytes:
+        """Cuerpo completo (o hasta el corte head-only) respetando el tamaño máximo."""
+        return b''.join(self.iter_body(response))
+
+    def summary(self) -> str:
+        """Resumen de bytes descargados y evitados de la ejecución para mostrar al final."""
+        stats = self.stats
+        total = stats['bytes_downloaded'] + stats['bytes_saved']
+        saved_pct = (100.0 * stats['bytes_saved'] / total) if total else 0.0
+        unknown = f" (+{stats['unknown_savings']} de tamaño desconocido)" if stats['unknown_savings'] else ""
+        return (
+            f"📉 Descargas: {stats['responses']} respuestas | {stats['bytes_downloaded'] / (1024 * 1024):.2f} MB "
+            f"descargados | {stats['bytes_saved'] / (1024 * 1024):.2f} MB evitados ({saved_pct:.1f}%){unknown} | "
+            f"{stats['rejected_type']} descartadas por tipo | {stats['rejected_size']} por tamaño | "
+            f"{stats['head_only_stops']} cortadas tras </head>"
+            + (f" ({stats['head_only_fallback_stops']} sin </h1>: en el primer <h2> o a los "
+               f"{self.head_only_budget // 1024} KB)" if stats['head_only_fallback_stops'] else "")
+        )
@@ -0,0 +1,284 @@
+import email.utils
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+from instrumentation import record_stage
+
+# --- CONFIGURACIÓN DE REINTENTOS Y TIEMPOS DE ESPERA ---
+DEFAULT_TIMEOUT = 15.0          # Tiempo de espera fijo original (y máximo de los adaptativos)
+DEFAULT_MAX_RETRIES = 3         # Reintentos tras el primer intento (0 = un solo intento)
+BACKOFF_BASE = 0.5              # Segundos del primer reintento (se duplica en cada intento)
+BACKOFF_MAX = 30.0              # Espera máxima entre reintentos
+RETRY_AFTER_MAX = 120.0         # Retry-After mayor que esto: no se reintenta
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+# Tiempos de espera adaptativos por host (estimador de RFC 6298, como el RTO de TCP)
+ADAPTIVE_MIN_SAMPLES = 3        # Respuestas necesarias antes de ajustar los tiempos de espera
+TIMEOUT_SAFETY_FACTOR = 3.0     # Margen sobre srtt + 4 * rttvar
+MIN_CONNECT_TIMEOUT = 3.05      # Algo más que la retransmisión del SYN de TCP (3 s en muchos sistemas)
+# La latencia medida es solo hasta las cabeceras: el cuerpo de una página lenta de generar
+# puede tardar bastante más, así que la espera de lectura nunca baja de la mitad de la fija
+MIN_READ_TIMEOUT = DEFAULT_TIMEOUT / 2
+MAX_TIMEOUT_BACKOFF = 16.0       # Multiplicador máximo tras timeouts seguidos
+# Cortacircuitos por host
+DEFAULT_CIRCUIT_THRESHOLD = 5   # Fallos consecutivos que abren el circuito (0 = desactivado)
+CIRCUIT_RESET_SECONDS = 30.0    # Tiempo con el circuito abierto antes de probar de nuevo
+# --------------------------------------------------------
+
+RETRYABLE_EXCEPTIONS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                        requests.exceptions.ChunkedEncodingError)
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """El host falló demasiadas veces seguidas y sus peticiones se rechazan sin intentarlas."""
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Segundos indicados por una cabecera Retry-After (en segundos o como fecha HTTP)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment is None:
+        return None
+    return max(0.0, moment.timestamp() - (now if now is not None else time.time()))
+
+
+class HostState:
+    """Latencia estimada, tiempos de espera y estado del circuito de un host."""
+
+    def __init__(self):
+        self.samples = 0
+        self.srtt = 0.0                 # Latencia suavizada (hasta recibir las cabeceras)
+        self.rttvar = 0.0               # Variación de la latencia
+        self.timeout_backoff = 1.0      # Se duplica tras cada timeout, vuelve a 1 con un éxito
+        self.consecutive_failures = 0
+        self.open_until = 0.0           # Circuito abierto hasta este instante (0 = cerrado)
+        self.half_open_trial = False    # Hay una petición de prueba en curso con el circuito semiabierto
+        self.not_before = 0.0           # Pausa pedida por el servidor (Retry-After)
+
+    def observe_latency(self, seconds: float):
+        if self.samples == 0:
+            self.srtt, self.rttvar = seconds, seconds / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - seconds)
+            self.srtt = 0.875 * self.srtt + 0.125 * seconds
+        self.samples += 1
+
+    def timeouts(self, default_timeout: float) -> Tuple[float, float]:
+        """(conexión, lectura) en segundos para la próxima petición."""
+        if self.samples < ADAPTIVE_MIN_SAMPLES:
+            return default_timeout, default_timeout
+        estimate = TIMEOUT_SAFETY_FACTOR * (self.srtt + 4 * self.rttvar) * self.timeout_backoff
+        return (min(default_timeout, max(MIN_CONNECT_TIMEOUT, estimate)),
+                min(default_timeout, max(MIN_READ_TIMEOUT, estimate)))
+
+
+class FetchScheduler:
+    """
+    Planificador de peticiones GET con reintentos, tiempos de espera adaptativos y
+    cortacircuitos por host.
+
+    - Reintentos: errores de conexión, timeouts y respuestas 429/5xx se reintentan hasta
+      `max_retries` veces con espera exponencial con jitter completo
+      (uniforme entre 0 y base * 2^intento). Si el servidor envía Retry-After se respeta
+      (todas las peticiones a ese host esperan), y si pide más de RETRY_AFTER_MAX
+      segundos no se reintenta.
+    - Tiempos de espera adaptativos: con la latencia de cada host (response.elapsed) se
+      estima un tiempo de espera como el RTO de TCP (srtt + 4 * rttvar, con margen), entre
+      un mínimo y el tiempo fijo original; cada timeout lo duplica hasta el siguiente éxito.
+      Así un host rápido no espera 15 s cuando deja de responder.
+    - Cortacircuitos: tras `circuit_threshold` fallos consecutivos (no cuentan los 429) el
+      host queda abierto `circuit_reset` segundos y sus peticiones fallan al instante
+      (CircuitOpenError); después se deja pasar una petición de prueba que lo cierra o
+      lo vuelve a abrir.
+
+    Si se agotan los reintentos de una respuesta 429/5xx se devuelve esa respuesta (el
+    llamador produce el mismo error HTTP que antes); si es una excepción, se relanza.
+    Es seguro usarlo desde varios hilos.
+    """
+
+    def __init__(self, max_retries: int = DEFAULT_MAX_RETRIES, backoff_base: float = BACKOFF_BASE,
+                 backoff_max: float = BACKOFF_MAX, default_timeout: float = DEFAULT_TIMEOUT,
+                 adaptive_timeouts: bool = True, circuit_threshold: int = DEFAULT_CIRCUIT_THRESHOLD,
+                 circuit_reset: float = CIRCUIT_RESET_SECONDS,
+                 sleep: Callable[[float], None] = time.sleep, clock: Callable[[], float] = time.monotonic,
+                 rng: Optional[random.Random] = None):
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.default_timeout = default_timeout
+        self.adaptive_timeouts = adaptive_timeouts
+        self.circuit_threshold = max(0, circuit_threshold)
+        self.circuit_reset = circuit_reset
+        self._sleep = sleep
+        self._clock = clock
+        self._rng = rng if rng is not None else random.Random()
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, HostState] = {}
+        self.stats = {'requests': 0, 'retries': 0, 'recovered': 0, 'failed': 0, 'timeouts': 0,
+                      'retry_after': 0, 'circuit_opened': 0, 'circuit_rejected': 0, 'wait_seconds': 0.0}
+
+    # --- Estado por host -----------------------------------------------------
+
+    @staticmethod
+    def host_key(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    def _host(self, host: str) -> HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = HostState()
+        return state
+
+    def get_timeouts(self, url: str) -> Tuple[float, float]:
+        """Tiempos de espera (conexión, lectura) que se usarían ahora para la URL."""
+        if not self.adaptive_timeouts:
+            return self.default_timeout, self.default_timeout
+        with self._lock:
+            return self._host(self.host_key(url)).timeouts(self.default_timeout)
+
+    def _acquire(self, host: str) -> Tuple[Tuple[float, float], float]:
+        """
+        Comprueba el circuito y devuelve (tiempos de espera, pausa pendiente por Retry-After).
+        Lanza CircuitOpenError si el host está abierto.
+        """
+        with self._lock:
+            state = self._host(host)
+            now = self._clock()
+            if state.open_until:
+                if now < state.open_until or state.half_open_trial:
+                    self.stats['circuit_rejected'] += 1
+                    raise CircuitOpenError(f"Circuito abierto para {host}: {state.consecutive_failures} "
+                                           f"fallos consecutivos")
+                # Semiabierto: esta petición es la de prueba
+                state.half_open_trial = True
+            timeouts = (state.timeouts(self.default_timeout) if self.adaptive_timeouts
+                        else (self.default_timeout, self.default_timeout))
+            return timeouts, max(0.0, state.not_before - now)
+
+    def _record_success(self, host: str, latency: float):
+        with self._lock:
+            state = self._host(host)
+            state.observe_latency(latency)
+            state.timeout_backoff = 1.0
+            state.consecutive_failures = 0
+            state.open_until = 0.0
+            state.half_open_trial = False
+
+    def _record_failure(self, host: str, timed_out: bool = False, counts_for_circuit: bool = True):
+        with self._lock:
+            state = self._host(host)
+            state.half_open_trial = False
+            if timed_out:
+                self.stats['timeouts'] += 1
+                state.timeout_backoff = min(state.timeout_backoff * 2, MAX_TIMEOUT_BACKOFF)
+            if not counts_for_circuit:
+                return
+            state.consecutive_failures += 1
+            if self.circuit_threshold and (state.consecutive_failures >= self.circuit_threshold or state.open_until):
+                if not state.open_until or self._clock() >= state.open_until:
+                    self.stats['circuit_opened'] += 1
+                state.open_until = self._clock() + self.circuit_reset
+
+    def _pause_host(self, host: str, seconds: float):
+        with self._lock:
+            state = self._host(host)
+            state.not_before = max(state.not_before, self._clock() + seconds)
+
+    def _wait(self, seconds: float, url: str, reason: str):
+        if seconds <= 0:
+            return
+        with self._lock:
+            self.stats['wait_seconds'] += seconds
+        record_stage('http.retry_wait', seconds, url=url, reason=reason)
+        self._sleep(seconds)
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Espera antes del reintento número `attempt` (1, 2...): jitter completo."""
+        return self._rng.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1))))
+
+    # --- Petición ------------------------------------------------------------
+
+    def get(self, url: str, http_client: Any = requests, **kwargs: Any) -> requests.Response:
+        """
+        GET con reintentos; mismos argumentos que requests.get salvo `timeout`,
+        que calcula el planificador.
+        """
+        host = self.host_key(url)
+        with self._lock:
+            self.stats['requests'] += 1
+        attempt = 0
+        while True:
+            try:
+                timeouts, pause = self._acquire(host)
+            except CircuitOpenError:
+                self._count_final(attempt, success=False)
+                raise
+            self._wait(pause, url, 'retry_after')
+            try:
+                response = http_client.get(url, timeout=timeouts, **kwargs)
+            except RETRYABLE_EXCEPTIONS as e:
+                self._record_failure(host, timed_out=isinstance(e, requests.exceptions.Timeout))
+                if attempt >= self.max_retries:
+                    self._count_final(attempt, success=False)
+                    raise
+                attempt += 1
+                self._wait(self.backoff_delay(attempt), url, type(e).__name__)
+                continue
+            except Exception:
+                # Error no reintentable (URL inválida...): no debe bloquear el circuito semiabierto
+                self._record_failure(host, counts_for_circuit=False)
+                self._count_final(attempt, success=False)
+                raise
+
+            if response.status_code not in RETRYABLE_STATUS:
+                self._record_success(host, response.elapsed.total_seconds())
+                self._count_final(attempt, success=True)
+                return response
+
+            # 429/5xx: el servidor respondió, pero hay que esperar y reintentar
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            self._record_failure(host, counts_for_circuit=response.status_code != 429)
+            if attempt >= self.max_retries or (retry_after is not None and retry_after > RETRY_AFTER_MAX):
+                self._count_final(attempt, success=False)
+                return response
+            response.close()
+            attempt += 1
+            delay = self.backoff_delay(attempt)
+            if retry_after is not None:
+                with self._lock:
+                    self.stats['retry_after'] += 1
+                self._pause_host(host, retry_after)
+                delay = max(0.0, delay - retry_after)   # La pausa del host ya cubre parte de la espera
+            self._wait(delay, url, str(response.status_code))
+
+    def _count_final(self, attempt: int, success: bool):
+        with self._lock:
+            self.stats['retries'] += attempt
+            if success and attempt:
+                self.stats['recovered'] += 1
+            elif not success:
+                self.stats['failed'] += 1
+
+    def summary(self) -> str:
+        """Resumen de reintentos y circuitos de la ejecución para mostrar al final."""
+        stats = self.stats
+        with self._lock:
+            open_hosts = sum(1 for state in self._hosts.values() if state.open_until)
+        return (
+            f"🔁 Reintentos: {stats['requests']} URLs | {stats['retries']} reintentos | "
+            f"{stats['recovered']} recuperadas | {stats['failed']} fallidas tras reintentar | "
+            f"{stats['timeouts']} timeouts | {stats['retry_after']} Retry-After | "
+            f"{stats['wait_seconds']:.1f} s de espera acumulada | circuitos abiertos {stats['circuit_opened']} "
+            f"({stats['circuit_rejected']} peticiones rechazadas, {open_hosts} hosts abiertos al final)"
+        )
@@ -0,0 +1,193 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+
+# --- CONFIGURACIÓN DE LA CACHÉ HTTP ---
+CACHE_FOLDER = '.http_cache'   # Directorio de la caché en disco
+DEFAULT_CACHE_MAX_MB = 500     # Tamaño máximo antes de expulsar las entradas menos usadas
+# --------------------------------------
+
+
+class HTTPCache:
+    """
+    Caché HTTP en disco para peticiones GET condicionales (ETag / Last-Modified).
+
+    Por cada URL guarda dos archivos en `<carpeta>/<xx>/<sha256>`:
+      - `.json`: URL, validadores (ETag, Last-Modified) y el diccionario SEO extraído.
+      - `.html`: el cuerpo descargado.
+
+    Cuando el servidor responde 304 Not Modified se reutilizan el cuerpo y el
+    diccionario SEO guardados, sin descargar ni volver a parsear la página. Si la
+    caché supera `max_bytes`, se expulsan las entradas usadas hace más tiempo (LRU).
+    Es segura para usarse desde varios hilos.
+    """
+
+    def __init__(self, folder: str = CACHE_FOLDER, max_bytes: int = DEFAULT_CACHE_MAX_MB * 1024 * 1024):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Índice en memoria: clave -> [tamaño en bytes, último uso]
+        self._entries: Dict[str, list] = {}
+        self._total_bytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0, 'evicted': 0, 'bytes_saved': 0}
+        self._load_index()
+
+    # --- Rutas e índice ------------------------------------------------------
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        base = os.path.join(self.folder, key[:2], key)
+        return base + '.json', base + '.html'
+
+    def _load_index(self):
+        """Reconstruye el índice en memoria recorriendo la carpeta de la caché."""
+        if not os.path.isdir(self.folder):
+            return
+        for root, _, files in os.walk(self.folder):
+            for filename in files:
+                if not filename.endswith('.json'):
+                    continue
+                key = filename[:-len('.json')]
+                meta_path, body_path = self._paths(key)
+                try:
+                    size = os.path.getsize(meta_path) + os.path.getsize(body_path)
+                    last_used = os.path.getmtime(meta_path)
+                except OSError:
+                    continue
+                self._entries[key] = [size, last_used]
+                self._total_bytes += size
+
+    # --- Lectura -------------------------------------------------------------
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Devuelve los metadatos guardados de la URL (validadores y resultados SEO)
+        o None si no hay entrada válida.
+        """
+        key = self._key(url)
+        with self._lock:
+            if key not in self._entries:
+                return None
+        meta_path, _ = self._paths(key)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get('url') == url else None
+
+    def read_body(self, url: str) -> Optional[str]:
+        """Lee el cuerpo HTML guardado de la URL."""
+        _, body_path = self._paths(self._key(url))
+        try:
+            # newline='': el cuerpo vuelve con sus saltos de línea originales (\r\n, \r)
+            with open(body_path, 'r', encoding='utf-8', newline='') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Cabeceras If-None-Match / If-Modified-Since para revalidar una entrada."""
+        headers: Dict[str, str] = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def mark_hit(self, url: str, entry: Dict[str, Any], body: str) -> Dict[str, Any]:
+        """
+        Registra un 304 y devuelve una copia de los resultados SEO guardados.
+        """
+        key = self._key(url)
+        meta_path, _ = self._paths(key)
+        now = time.time()
+        try:
+            os.utime(meta_path, (now, now))
+        except OSError:
+            pass
+        with self._lock:
+            self.stats['hits'] += 1
+            self.stats['bytes_saved'] += len(body.encode('utf-8'))
+            if key in self._entries:
+                self._entries[key][1] = now
+        return copy.deepcopy(entry['results'])
+
+    def mark_miss(self):
+        """Registra una descarga completa (sin entrada o con la página modificada)."""
+        with self._lock:
+            self.stats['misses'] += 1
+
+    # --- Escritura -----------------------------------------------------------
+
+    def store(self, url: str, etag: Optional[str], last_modified: Optional[str],
+              body: str, results: Dict[str, Any]):
+        """
+        Guarda el cuerpo y los resultados SEO de la URL. Solo se guardan las respuestas
+        con algún validador: sin ETag ni Last-Modified no es posible revalidarlas.
+        """
+        if not etag and not last_modified:
+            return
+
+        key = self._key(url)
+        meta_path, body_path = self._paths(key)
+        entry = {'url': url, 'etag': etag, 'last_modified': last_modified, 'results': results}
+
+        try:
+            os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+            # Escritura atómica: primero a un temporal y luego se reemplaza
+            for path, content in ((body_path, body), (meta_path, json.dumps(entry, ensure_ascii=False))):
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+                    f.write(content)
+                os.replace(tmp_path, path)
+            size = os.path.getsize(meta_path) + os.path.getsize(body_path)
+        except OSError:
+            return
+
+        with self._lock:
+            previous = self._entries.get(key)
+            if previous:
+                self._total_bytes -= previous[0]
+            self._entries[key] = [size, time.time()]
+            self._total_bytes += size
+            self.stats['stored'] += 1
+            self._evict_locked()
+
+    def _evict_locked(self):
+        """Expulsa las entradas menos usadas hasta respetar el tamaño máximo."""
+        if self._total_bytes <= self.max_bytes:
+            return
+        for key, (size, _) in sorted(self._entries.items(), key=lambda item: item[1][1]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            del self._entries[key]
+            self._total_bytes -= size
+            self.stats['evicted'] += 1
+
+    # --- Resumen -------------------------------------------------------------
+
+    def summary(self) -> str:
+        """Resumen de aciertos/fallos de la ejecución para mostrar al final."""
+        lookups = self.stats['hits'] + self.stats['misses']
+        hit_rate = (100.0 * self.stats['hits'] / lookups) if lookups else 0.0
+        return (
+            f"📦 Caché HTTP: {self.stats['hits']} aciertos (304) | {self.stats['misses']} fallos | "
+            f"tasa de acierto {hit_rate:.1f}% | {self.stats['bytes_saved'] / (1024 * 1024):.2f} MB no descargados | "
+            f"{self.stats['stored']} entradas guardadas | {self.stats['evicted']} expulsadas | "
+            f"tamaño {self._total_bytes / (1024 * 1024):.2f} MB"
+        )
@@ -0,0 +1,159 @@
+import io
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# --- CONFIGURACIÓN DE LA INSTRUMENTACIÓN ---
+PERCENTILES = (50, 95, 99)
+PROFILE_TOP_FUNCTIONS = 25   # Funciones mostradas al final con --profile
+# -------------------------------------------
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Percentil por rango más cercano de una lista ya ordenada."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(-(-pct * len(sorted_values) // 100)))  # ceil(pct/100 * n)
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class StageTimer:
+    """
+    Acumula la duración de cada etapa (descarga, parseo, escritura, conteo...) y
+    muestra al final un resumen con p50/p95/p99 por etapa.
+
+    Con `trace_path` escribe además una traza JSONL legible por máquina: una línea por
+    medición con la etapa, el inicio relativo a la ejecución, la duración en ms, el
+    hilo y los atributos (URL, archivo, bytes...).
+
+    Es segura entre hilos. Las mediciones hechas en procesos hijos (fork) se ignoran;
+    el pool de parseo devuelve su duración al proceso principal (ver call_timed).
+    """
+
+    def __init__(self, trace_path: Optional[str] = None):
+        self._lock = threading.Lock()
+        self._durations: Dict[str, List[float]] = {}
+        self._pid = os.getpid()
+        self._origin = time.perf_counter()
+        self.wall_start = time.time()
+        self._trace = open(trace_path, 'w', encoding='utf-8') if trace_path else None
+        self.trace_path = trace_path
+
+    def record(self, stage: str, seconds: float, start: Optional[float] = None, **attrs: Any):
+        """Registra una duración ya medida (en segundos)."""
+        if os.getpid() != self._pid:
+            return
+        with self._lock:
+            self._durations.setdefault(stage, []).append(seconds)
+            if self._trace is not None:
+                start = start if start is not None else time.perf_counter() - seconds
+                event = {'stage': stage, 'start_ms': round((start - self._origin) * 1000, 3),
+                         'ms': round(seconds * 1000, 3), 'thread': threading.current_thread().name}
+                event.update(attrs)
+                self._trace.write(json.dumps(event, ensure_ascii=False) + '\n')
+
+    @contextmanager
+    def measure(self, stage: str, **attrs: Any) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, start, **attrs)
+
+    def summary(self) -> str:
+        """Tabla con el número de mediciones, total y percentiles (ms) por etapa."""
+        with self._lock:
+            stages = {stage: sorted(values) for stage, values in self._durations.items()}
+        if not stages:
+            return "⏱️ Tiempos por etapa: sin mediciones."
+
+        width = max(len(stage) for stage in stages)
+        header = (f"{'Etapa':<{width}} | {'n':>7} | {'total s':>9} | "
+                  + " | ".join(f"{'p%d ms' % p:>9}" for p in PERCENTILES) + f" | {'máx ms':>9}")
+        lines = [f"⏱️ Tiempos por etapa (ejecución de {time.perf_counter() - self._origin:.2f} s):",
+                 header, "-" * len(header)]
+        for stage, values in sorted(stages.items(), key=lambda item: -sum(item[1])):
+            lines.append(f"{stage:<{width}} | {len(values):>7} | {sum(values):>9.2f} | "
+                         + " | ".join(f"{percentile(values, p) * 1000:>9.2f}" for p in PERCENTILES)
+                         + f" | {values[-1] * 1000:>9.2f}")
+        if self.trace_path:
+            lines.append(f"Traza JSONL guardada en: {os.path.abspath(self.trace_path)}")
+        return "\n".join(lines)
+
+    def close(self):
+        with self._lock:
+            if self._trace is not None:
+                self._trace.close()
+                self._trace = None
+
+
+# Temporizador activo del proceso (None = instrumentación desactivada, coste casi nulo)
+_active_timer: Optional[StageTimer] = None
+
+
+def enable_timing(trace_path: Optional[str] = None) -> StageTimer:
+    """Activa la instrumentación para el resto de la ejecución."""
+    global _active_timer
+    _active_timer = StageTimer(trace_path)
+    return _active_timer
+
+
+def get_active_timer() -> Optional[StageTimer]:
+    return _active_timer
+
+
+@contextmanager
+def timed_stage(stage: str, **attrs: Any) -> Iterator[None]:
+    """Mide el bloque como `stage` si la instrumentación está activa."""
+    timer = _active_timer
+    if timer is None:
+        yield
+        return
+    with timer.measure(stage, **attrs):
+        yield
+
+
+def record_stage(stage: str, seconds: float, **attrs: Any):
+    """Registra una duración medida por otros medios (p. ej. response.elapsed)."""
+    timer = _active_timer
+    if timer is not None:
+        timer.record(stage, seconds, **attrs)
+
+
+def call_timed(func: Callable[..., Any], *args: Any) -> Tuple[Any, float]:
+    """
+    Ejecuta func(*args) y devuelve (resultado, segundos). Se usa en los pools de procesos,
+    donde la duración tiene que volver al proceso principal para registrarse.
+    """
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def start_profiler(enabled: bool) -> Optional[Any]:
+    """Inicia cProfile si se pidió con --profile (solo perfila el hilo principal)."""
+    if not enabled:
+        return None
+    import cProfile  # Solo se carga con --profile (pstats tarda en importarse)
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def stop_profiler(profiler: Optional[Any], output_path: str):
+    """Detiene cProfile, guarda las estadísticas (.prof, para snakeviz/pstats) y muestra las más costosas."""
+    if profiler is None:
+        return
+    import pstats
+
+    profiler.disable()
+    profiler.dump_stats(output_path)
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+    print(stream.getvalue(), file=sys.stderr)
+    print(f"🧪 Perfil de cProfile guardado en: {os.path.abspath(output_path)}")
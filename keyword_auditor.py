@@ -1,16 +1,41 @@
-import pandas as pd
 import os
 import sys
+import re
+import mmap
+import codecs
+import argparse
 import datetime 
-from typing import List, Dict, Any
+import zipfile
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple, TYPE_CHECKING
+
+from keyword_matching import (build_keyword_automaton, count_keywords_in_content, count_keywords_in_chunks,
+                              MATCH_MODES)
+from keyword_index import KeywordIndex, INDEX_DB_FILE
+from report_storage import is_stored_file, is_shard_folder, is_compressed_file, open_stored_file, open_stored_text
+from keyword_manifest import MANIFEST_FILE, new_manifest, load_manifest, save_manifest, file_sha256, is_file_unchanged
+from instrumentation import timed_stage, enable_timing, get_active_timer, start_profiler, stop_profiler
+from xlsx_reader import read_first_column, UnsupportedSheetError
+
+# pandas/NumPy (keyword_matrix) tardan cientos de ms en importarse: se cargan solo al
+# llegar al análisis, de modo que --help o una ejecución sin keywords arrancan al instante
+if TYPE_CHECKING:
+    from keyword_matrix import KeywordDocumentMatrix
 
 # --- CONFIGURACIÓN ---
 KEYWORD_FILE = 'keywords.xlsx'
 REPORT_FOLDER = 'reports'   # Subdirectorio de entrada para los archivos .txt (Reportes resumidos)
 INDEX_FOLDER = 'index'      # Subdirectorio de entrada para los archivos .html (Contenido completo)
 OUTPUT_FOLDER = 'outputs'   # Subdirectorio de salida para el reporte XLSX
+READ_CHUNK_SIZE = 256 * 1024        # Fragmento de lectura del lector con mmap
+ENCODING_SAMPLE_SIZE = 64 * 1024    # Prefijo usado para detectar la codificación
+# Destino del desglose largo (una fila por documento y keyword): hoja del XLSX (lenta con
+# openpyxl y limitada a EXCEL_MAX_ROWS), CSV junto al XLSX (sin límite) o ninguno
+BREAKDOWN_FORMATS = ('xlsx', 'csv', 'none')
+BREAKDOWN_CSV_SUFFIX = '_desglose.csv'
 # ---------------------
 
+META_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([a-zA-Z0-9_.:-]+)', re.IGNORECASE)
+
 def get_keywords_from_excel(filepath: str) -> List[str]:
     """
     Lee el archivo XLSX, extrae las palabras clave de la primera columna
@@ -18,11 +43,19 @@ def get_keywords_from_excel(filepath: str) -> List[str]:
     """
     print(f"🔎 Leyendo palabras clave desde: {filepath}")
     try:
-        # Lee el archivo completo. header=None, ya que la fila 1 es el encabezado del usuario.
-        df = pd.read_excel(filepath, header=None)
-        
-        # Seleccionar la primera columna (índice 0) y empezar desde la segunda fila (índice 1)
-        keywords = df.iloc[1:, 0].dropna().astype(str).str.strip().tolist()
+        try:
+            # Lector ligero (sin pandas ni openpyxl): primera columna a partir de la segunda fila
+            keywords = [cell.strip() for cell in read_first_column(filepath)[1:] if cell is not None]
+        except (UnsupportedSheetError, zipfile.BadZipFile, KeyError) as e:
+            # Celdas no textuales u otro formato: se lee con pandas, que las convierte igual que siempre
+            print(f"ℹ️ Lectura con pandas ({e}).")
+            import pandas as pd
+
+            # Lee el archivo completo. header=None, ya que la fila 1 es el encabezado del usuario.
+            df = pd.read_excel(filepath, header=None)
+
+            # Seleccionar la primera columna (índice 0) y empezar desde la segunda fila (índice 1)
+            keywords = df.iloc[1:, 0].dropna().astype(str).str.strip().tolist()
         
         # Convertir todas las palabras clave a minúsculas para una búsqueda sin distinción de mayúsculas
         lower_keywords = [kw.lower() for kw in keywords]
@@ -49,13 +82,14 @@ def get_keywords_from_excel(filepath: str) -> List[str]:
 
 def find_report_files(folders: List[str]) -> List[str]:
     """
-    Busca archivos con extensiones .txt y .html en la lista de carpetas proporcionadas.
+    Busca archivos con extensiones .txt y .html (comprimidos o no) en la lista de
+    carpetas proporcionadas y sus subdirectorios.
     """
     all_files = []
     # Archivos que sabemos que son de entrada o temporales, no reportes de URL.
     EXCLUDE_FILES = ['urls.txt'] 
     
-    print("\n🔍 Buscando archivos de reporte (*.txt y *.html) en los directorios:")
+    print("\n🔍 Buscando archivos de reporte (*.txt y *.html, también comprimidos) en los directorios:")
     
     for folder in folders:
         # Comprobar si el subdirectorio existe
@@ -65,12 +99,15 @@ def find_report_files(folders: List[str]) -> List[str]:
         
         print(f"  - Inspeccionando: {os.path.abspath(folder)}")
     
-        for filename in os.listdir(folder):
-            file_path = os.path.join(folder, filename)
-            
-            # Solo archivos que terminan en .txt o .html y no están en la lista de exclusión
-            if (filename.endswith(".txt") or filename.endswith(".html")) and filename not in EXCLUDE_FILES:
-                all_files.append(file_path)
+        # Recorrido recursivo: los archivos se reparten en subdirectorios (ver report_storage)
+        for root, dirs, filenames in os.walk(folder):
+            dirs.sort()
+            for filename in sorted(filenames):
+                file_path = os.path.join(root, filename)
+
+                # Solo .txt/.html (o .gz/.zst) que no están en la lista de exclusión
+                if is_stored_file(filename) and filename not in EXCLUDE_FILES:
+                    all_files.append(file_path)
             
     print(f"✅ Total de archivos de reporte/contenido encontrados: {len(all_files)}")
     return all_files
@@ -80,12 +117,13 @@ def read_file_content_robustly(file_path: str) -> str:
     """
     Intenta leer el contenido de un archivo usando múltiples codificaciones 
     hasta que una tenga éxito. Esto corrige los errores de 'invalid start byte'.
+    Los archivos comprimidos (.gz/.zst) se descomprimen de forma transparente.
     """
     encodings = ['utf-8', 'utf-16', 'latin-1']
     
     for encoding in encodings:
         try:
-            with open(file_path, 'r', encoding=encoding) as f:
+            with open_stored_text(file_path, encoding) as f:
                 # Al tener éxito, devolvemos el contenido en minúsculas
                 return f.read().lower()
         except UnicodeDecodeError:
@@ -101,58 +139,380 @@ def read_file_content_robustly(file_path: str) -> str:
     return ""
 
 
-def analyze_keywords_in_reports(keywords: List[str], all_files: List[str]) -> List[Dict[str, Any]]:
+def sniff_encodings(sample: bytes) -> List[str]:
+    """
+    Detecta la codificación de un archivo a partir de su prefijo, UNA sola vez:
+    BOM -> prefijo UTF-8 válido -> <meta charset> -> latin-1.
+
+    Devuelve las codificaciones candidatas en orden; la primera es la detectada y las
+    siguientes solo se usan si el resto del archivo contradice la detección.
+    """
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        candidates = ['utf-16']
+    elif sample.startswith(codecs.BOM_UTF8):
+        candidates = ['utf-8']
+    else:
+        candidates = []
+        try:
+            # final=False: una secuencia multibyte cortada al final del prefijo es válida
+            codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+            candidates.append('utf-8')
+        except UnicodeDecodeError:
+            pass
+
+        match = META_CHARSET_RE.search(sample)
+        if match:
+            try:
+                candidates.append(codecs.lookup(match.group(1).decode('ascii')).name)
+            except (LookupError, UnicodeDecodeError):
+                pass
+
+    candidates.append('latin-1')
+    return list(dict.fromkeys(candidates))
+
+
+def iter_byte_blocks(data: Any, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[bytes]:
+    """Bloques consecutivos de `data` (p. ej. un mmap) sin copiar el archivo completo."""
+    for offset in range(0, len(data), chunk_size):
+        yield data[offset:offset + chunk_size]
+
+
+def iter_stream_blocks(stream: Any, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[bytes]:
+    """Bloques leídos de un archivo abierto en binario (p. ej. uno comprimido)."""
+    return iter(lambda: stream.read(chunk_size), b'')
+
+
+def iter_lowercase_chunks(blocks: Iterable[bytes], encoding: str) -> Iterator[str]:
+    """
+    Decodifica los bloques de bytes de un archivo y los devuelve en minúsculas,
+    sin crear nunca una copia completa del archivo.
+
+    Los cortes se hacen justo después de un espacio en blanco para que lower() dé
+    exactamente el mismo resultado que sobre el texto completo (la sigma final griega
+    depende de los caracteres vecinos). Lanza UnicodeDecodeError si `encoding` no es válida.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    carry = ''
+    for block in blocks:
+        text = carry + decoder.decode(block)
+        cut = len(text) - 1
+        while cut >= 0 and not text[cut].isspace():
+            cut -= 1
+        yield text[:cut + 1].lower()
+        carry = text[cut + 1:]
+    yield (carry + decoder.decode(b'', final=True)).lower()
+
+
+def count_keywords_in_file_mmap(automaton: Dict[str, Any], file_path: str) -> Optional[List[int]]:
+    """
+    Lector de bajo consumo de memoria: mapea el archivo con mmap, detecta su codificación
+    una vez (sniff_encodings) y cuenta las keywords por fragmentos con el autómata.
+
+    Returns:
+        Conteos por keyword, o None si el archivo está vacío o no se puede leer.
+
+    Diferencia con read_file_content_robustly: un archivo sin BOM que no es UTF-8 válido
+    se decodifica según su <meta charset> o como latin-1, en lugar de intentar UTF-16.
+    Los archivos comprimidos (.gz/.zst) no admiten mmap y se descomprimen por bloques.
+    """
+    if is_compressed_file(file_path):
+        return count_keywords_in_compressed_file(automaton, file_path)
+
+    try:
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for encoding in sniff_encodings(data[:ENCODING_SAMPLE_SIZE]):
+                    try:
+                        counts, length = count_keywords_in_chunks(
+                            automaton, iter_lowercase_chunks(iter_byte_blocks(data), encoding))
+                    except UnicodeDecodeError:
+                        # El resto del archivo contradice la detección: siguiente candidata
+                        continue
+                    return counts if length else None
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Advertencia: Error inesperado al intentar leer '{file_path}' con mmap: {e}")
+    return None
+
+
+def count_keywords_in_compressed_file(automaton: Dict[str, Any], file_path: str) -> Optional[List[int]]:
+    """
+    Variante de count_keywords_in_file_mmap para archivos comprimidos: misma detección
+    de codificación, descomprimiendo por bloques (cada candidata relee el archivo).
+    """
+    try:
+        with open_stored_file(file_path) as f:
+            sample = f.read(ENCODING_SAMPLE_SIZE)
+        if not sample:
+            return None
+        for encoding in sniff_encodings(sample):
+            try:
+                with open_stored_file(file_path) as f:
+                    counts, length = count_keywords_in_chunks(
+                        automaton, iter_lowercase_chunks(iter_stream_blocks(f), encoding))
+            except UnicodeDecodeError:
+                continue
+            return counts if length else None
+    except (OSError, EOFError) as e:
+        print(f"⚠️ Advertencia: Error inesperado al intentar leer '{file_path}' comprimido: {e}")
+    return None
+
+
+def count_keywords_in_file(automaton: Dict[str, Any], file_path: str, use_mmap: bool = False) -> Optional[List[int]]:
+    """
+    Conteos por keyword de un archivo con el lector elegido, o None si no tiene contenido.
+    """
+    with timed_stage('keywords.file', file=file_path, reader='mmap' if use_mmap else 'robusto'):
+        if use_mmap:
+            return count_keywords_in_file_mmap(automaton, file_path)
+
+        content = read_file_content_robustly(file_path)
+        return count_keywords_in_content(automaton, content) if content else None
+
+
+def analyze_keywords_in_reports(keywords: List[str], all_files: List[str],
+                                use_mmap: bool = False,
+                                match_mode: str = 'raw') -> Tuple[List[Dict[str, Any]], 'KeywordDocumentMatrix']:
     """
     Analiza cada palabra clave en todos los archivos de reporte (.txt y .html).
+
+    Cada archivo se lee una única vez y todas las palabras clave se cuentan en una
+    sola pasada con un autómata Aho-Corasick (ver build_keyword_automaton). Con
+    `use_mmap` se usa el lector por fragmentos (ver count_keywords_in_file_mmap).
+    `match_mode` elige entre subcadenas del contenido ('raw') y palabras completas del
+    texto visible sin distinguir acentos ('words').
+
+    Returns:
+        Una tupla: (una fila por keyword, matriz dispersa keyword x documento).
+    """
+    from keyword_matrix import KeywordDocumentMatrix
+
+    print("\n--- Iniciando Análisis de Coincidencias (Robusto en TXT y HTML"
+          f"{', palabras completas' if match_mode == 'words' else ''}) ---")
+
+    with timed_stage('keywords.build_automaton', keywords=len(keywords), mode=match_mode):
+        automaton = build_keyword_automaton(keywords, match_mode)
+    # Usamos el nombre del archivo con su extensión y subdirectorio para el reporte final
+    matrix = KeywordDocumentMatrix(keywords, all_files, [get_display_name(path) for path in all_files])
+
+    for doc_index, file_path in enumerate(all_files):
+        # Lectura UNA vez por archivo (no una vez por keyword), contando todas las keywords a la vez
+        file_counts = count_keywords_in_file(automaton, file_path, use_mmap)
+
+        if file_counts is not None:
+            matrix.add_document_counts(doc_index, file_counts)
+
+    with timed_stage('keywords.results', keywords=len(keywords), documents=len(all_files)):
+        results = build_keyword_results(matrix)
+
+    print("\n--- Análisis Finalizado ---")
+    return results, matrix
+
+
+def build_keyword_results(matrix: 'KeywordDocumentMatrix') -> List[Dict[str, Any]]:
+    """
+    Construye una fila por palabra clave ÚNICA a partir de la matriz keyword x
+    documento y muestra su resumen en consola.
     """
     results: List[Dict[str, Any]] = []
-    
-    print("\n--- Iniciando Análisis de Coincidencias (Robusto en TXT y HTML) ---")
-    
-    for keyword in keywords:
-        match_count = 0
-        found_in_files = []
-        
-        # Iterar sobre todos los archivos de reporte para una sola palabra clave
-        for file_path in all_files:
-            # Usamos el nombre del archivo con su extensión y subdirectorio para el reporte final
-            # Ejemplo: index/dominio_com.html o reports/dominio_com.txt
-            file_name_with_folder = os.path.join(os.path.basename(os.path.dirname(file_path)), os.path.basename(file_path))
-            
-            # Usamos la nueva función de lectura robusta
-            content = read_file_content_robustly(file_path)
-            
-            if content:
-                # Contar las coincidencias
-                count = content.count(keyword)
-                
-                if count > 0:
-                    match_count += count
-                    found_in_files.append(file_name_with_folder)
-                    
+    match_counts = matrix.keyword_totals().tolist()
+    found_in_files = matrix.found_in_files()
+
+    for idx, keyword in enumerate(matrix.keywords):
         # Almacenar el resultado para esta palabra clave
         # Esta sección garantiza una sola fila por palabra clave ÚNICA
         results.append({
             'keyword': keyword,
-            'coincidencias': match_count,
+            'coincidencias': match_counts[idx],
             # La lista se une como cadena para que pandas la guarde fácilmente en una celda
-            'archivos_encontrados': ' | '.join(found_in_files) if found_in_files else 'No encontrada'
+            'archivos_encontrados': ' | '.join(found_in_files[idx]) if found_in_files[idx] else 'No encontrada'
         })
         
-        print(f"Keyword '{keyword}' | Coincidencias: {match_count} | Encontrada en {len(found_in_files)} archivos.")
+        print(f"Keyword '{keyword}' | Coincidencias: {match_counts[idx]} | Encontrada en {len(found_in_files[idx])} archivos.")
 
-    print("\n--- Análisis Finalizado ---")
     return results
 
 
-def save_results_to_xlsx(results: List[Dict[str, Any]], output_file: str, output_folder: str):
+def get_display_name(file_path: str) -> str:
+    """
+    Nombre del archivo con su subdirectorio para el reporte final (sin el
+    subdirectorio de reparto por hash).
+    Ejemplo: index/dominio_com_3fa1b2c4d5e6f708.html.gz o reports/dominio_com_3fa1b2c4d5e6f708.txt
+    """
+    folder = os.path.dirname(file_path)
+    if is_shard_folder(os.path.basename(folder)):
+        folder = os.path.dirname(folder)
+    return os.path.join(os.path.basename(folder), os.path.basename(file_path))
+
+
+def analyze_keywords_with_index(keywords: List[str], all_files: List[str],
+                                index_path: str = INDEX_DB_FILE) -> Tuple[List[Dict[str, Any]], 'KeywordDocumentMatrix']:
+    """
+    Igual que analyze_keywords_in_reports, pero respondiendo desde el índice persistente
+    (ver keyword_index.KeywordIndex). Solo se leen los archivos nuevos o modificados.
+    """
+    from keyword_matrix import matrix_from_file_counts
+
+    print(f"\n--- Iniciando Análisis de Coincidencias (Índice persistente: {index_path}) ---")
+
+    index = KeywordIndex(index_path)
+    try:
+        with timed_stage('index.sync', files=len(all_files)):
+            stats = index.sync(all_files, read_file_content_robustly)
+        print(f"🗂️ Índice sincronizado: {stats['nuevos']} nuevos | {stats['modificados']} modificados | "
+              f"{stats['eliminados']} eliminados | {stats['sin_cambios']} sin cambios.")
+        with timed_stage('index.query', keywords=len(keywords)):
+            counts_by_keyword = index.count_keywords(keywords)
+        if index.evicted_keywords:
+            print(f"🧹 Índice: {index.evicted_keywords} keywords no consultadas recientemente olvidadas "
+                  f"(límite {index.max_cached_keywords}).")
+    finally:
+        index.close()
+
+    # Conteos por posición de archivo: mismo orden de documentos que el análisis directo
+    positions: Dict[str, List[int]] = {}
+    for position, path in enumerate(all_files):
+        positions.setdefault(path, []).append(position)
+
+    counts_by_document: Dict[int, Dict[str, int]] = {}
+    for keyword in dict.fromkeys(keywords):
+        for path, count in counts_by_keyword[keyword].items():
+            for position in positions.get(path, []):
+                counts_by_document.setdefault(position, {})[keyword] = count
+
+    matrix = matrix_from_file_counts(keywords, all_files, [get_display_name(path) for path in all_files],
+                                     counts_by_document)
+    with timed_stage('keywords.results', keywords=len(keywords), documents=len(all_files)):
+        results = build_keyword_results(matrix)
+
+    print("\n--- Análisis Finalizado ---")
+    return results, matrix
+
+
+def count_keywords_by_name(keywords: List[str], automaton: Dict[str, Any], file_path: str,
+                           use_mmap: bool = False) -> Optional[Dict[str, int]]:
+    """
+    Conteos de un archivo como diccionario {keyword: coincidencias}, solo los > 0
+    (None si el archivo no tiene contenido).
+    """
+    counts = count_keywords_in_file(automaton, file_path, use_mmap)
+    if counts is None:
+        return None
+    return {kw: count for kw, count in zip(keywords, counts) if count > 0}
+
+
+def analyze_keywords_incrementally(keywords: List[str], all_files: List[str],
+                                   manifest_path: str = MANIFEST_FILE,
+                                   use_mmap: bool = False,
+                                   match_mode: str = 'raw') -> Tuple[List[Dict[str, Any]], 'KeywordDocumentMatrix']:
+    """
+    Igual que analyze_keywords_in_reports, pero reutilizando los conteos por archivo de la
+    ejecución anterior guardados en el manifiesto (ver keyword_manifest):
+
+    - Archivos nuevos o modificados (tamaño/mtime y, si difieren, hash): se analizan
+      con todas las keywords.
+    - Archivos sin cambios: se reutilizan sus conteos y solo se analizan las keywords
+      que no existían en la ejecución anterior.
+    - Archivos eliminados: se descartan del manifiesto.
+
+    Los totales resultantes son idénticos a los de un análisis completo.
+    """
+    from keyword_matrix import matrix_from_file_counts
+
+    print(f"\n--- Iniciando Análisis de Coincidencias (Incremental, manifiesto: {manifest_path}) ---")
+
+    with timed_stage('manifest.load'):
+        manifest = load_manifest(manifest_path)
+    # Los conteos solo son reutilizables si se obtuvieron con el mismo lector y modo de búsqueda
+    reader = 'mmap' if use_mmap else 'robusto'
+    if match_mode != 'raw':
+        reader += f'/{match_mode}'
+    if manifest.get('reader', 'robusto') != reader:
+        manifest = new_manifest()
+    manifest['reader'] = reader
+    previous_keywords = set(manifest['keywords'])
+    current_keywords = set(keywords)
+    new_keywords = [kw for kw in keywords if kw not in previous_keywords]
+
+    # Los autómatas se construyen solo si hacen falta
+    automata: Dict[str, Any] = {}
+
+    def get_automaton(name: str, automaton_keywords: List[str]) -> Dict[str, Any]:
+        if name not in automata:
+            with timed_stage('keywords.build_automaton', keywords=len(automaton_keywords), batch=name,
+                             mode=match_mode):
+                automata[name] = build_keyword_automaton(automaton_keywords, match_mode)
+        return automata[name]
+
+    stats = {'nuevos': 0, 'modificados': 0, 'sin_cambios': 0, 'eliminados': 0}
+    files: Dict[str, Dict[str, Any]] = {}
+
+    for file_path in dict.fromkeys(all_files):
+        try:
+            stat = os.stat(file_path)
+        except OSError as e:
+            print(f"⚠️ Advertencia: No se pudo acceder a '{file_path}': {e}")
+            continue
+
+        entry = manifest['files'].get(file_path)
+        if is_file_unchanged(file_path, entry, stat):
+            # Conteos previos de las keywords que siguen vigentes + solo las keywords nuevas
+            counts = {kw: count for kw, count in entry['counts'].items() if kw in current_keywords}
+            if new_keywords and not entry.get('empty'):
+                new_counts = count_keywords_by_name(new_keywords, get_automaton('nuevas', new_keywords),
+                                                    file_path, use_mmap)
+                counts.update(new_counts or {})
+            stats['sin_cambios'] += 1
+        else:
+            stats['modificados' if entry is not None else 'nuevos'] += 1
+            all_counts = count_keywords_by_name(keywords, get_automaton('todas', keywords), file_path, use_mmap)
+            counts = all_counts or {}
+            entry = {'size': stat.st_size, 'mtime': stat.st_mtime, 'sha256': file_sha256(file_path),
+                     'empty': all_counts is None}
+
+        entry['counts'] = counts
+        files[file_path] = entry
+
+    stats['eliminados'] = len(set(manifest['files']) - set(files))
+    print(f"🧾 Manifiesto: {stats['nuevos']} nuevos | {stats['modificados']} modificados | "
+          f"{stats['eliminados']} eliminados | {stats['sin_cambios']} sin cambios | "
+          f"{len(new_keywords)} keywords nuevas.")
+
+    manifest['keywords'] = sorted(current_keywords)
+    manifest['files'] = files
+    with timed_stage('manifest.save', files=len(files)):
+        save_manifest(manifest, manifest_path)
+
+    # Fusionar los conteos por archivo en el mismo orden que el análisis directo
+    counts_by_document = {position: files[file_path]['counts'] for position, file_path in enumerate(all_files)
+                          if file_path in files}
+    matrix = matrix_from_file_counts(keywords, all_files, [get_display_name(path) for path in all_files],
+                                     counts_by_document)
+    with timed_stage('keywords.results', keywords=len(keywords), documents=len(all_files)):
+        results = build_keyword_results(matrix)
+
+    print("\n--- Análisis Finalizado ---")
+    return results, matrix
+
+
+def save_results_to_xlsx(results: List[Dict[str, Any]], output_file: str, output_folder: str,
+                         matrix: Optional['KeywordDocumentMatrix'] = None, breakdown: str = 'xlsx'):
     """
     Guarda los resultados del análisis en un archivo XLSX dentro del subdirectorio especificado.
+
+    Si se pasa la matriz keyword x documento se añaden las hojas 'Resumen por Documento'
+    y 'Resumen por Dominio', y el desglose largo (una fila por documento y keyword con
+    coincidencias) según `breakdown`: hoja 'Desglose por Documento' ('xlsx'), archivo CSV
+    junto al XLSX ('csv', sin el límite de filas de Excel) o ninguno ('none').
     """
     if not results:
         print("⚠️ No hay resultados para guardar.")
         return
 
+    import pandas as pd
+    from keyword_matrix import EXCEL_MAX_ROWS
+
     try:
         # Asegurarse de que la carpeta de salida exista
         if not os.path.exists(output_folder):
@@ -173,33 +533,107 @@ def save_results_to_xlsx(results: List[Dict[str, Any]], output_file: str, output
         }, inplace=True)
 
         # Guardar en archivo XLSX
-        df.to_excel(full_output_path, index=False, sheet_name='Reporte Coincidencias')
-            
+        with pd.ExcelWriter(full_output_path) as writer:
+            df.to_excel(writer, index=False, sheet_name='Reporte Coincidencias')
+
+            if matrix is not None:
+                if breakdown == 'xlsx':
+                    with timed_stage('xlsx.breakdown'):
+                        long_df = matrix.to_long_dataframe()
+                        if len(long_df) >= EXCEL_MAX_ROWS:
+                            print(f"⚠️ Advertencia: El desglose tiene {len(long_df)} filas; se guardan solo las "
+                                  f"{EXCEL_MAX_ROWS - 1} primeras (límite de Excel). Usa --breakdown csv para "
+                                  f"guardarlo completo.")
+                            long_df = long_df.iloc[:EXCEL_MAX_ROWS - 1]
+                        long_df.to_excel(writer, index=False, sheet_name='Desglose por Documento')
+                matrix.document_summary().to_excel(writer, index=False, sheet_name='Resumen por Documento')
+                matrix.domain_summary().to_excel(writer, index=False, sheet_name='Resumen por Dominio')
+
+        csv_path = None
+        if matrix is not None and breakdown == 'csv':
+            csv_path = os.path.splitext(full_output_path)[0] + BREAKDOWN_CSV_SUFFIX
+            with timed_stage('csv.breakdown'):
+                # utf-8-sig: Excel abre el CSV con los acentos correctos
+                matrix.to_long_dataframe().to_csv(csv_path, index=False, encoding='utf-8-sig')
+
         print(f"\n✅ Reporte XLSX generado con éxito en: {os.path.abspath(full_output_path)}")
         print(f"El reporte se encuentra en la hoja 'Reporte Coincidencias'.")
+        if matrix is not None:
+            print("Los resúmenes por documento y dominio están en las hojas 'Resumen por Documento' y "
+                  "'Resumen por Dominio'.")
+            if breakdown == 'xlsx':
+                print("El desglose por documento está en la hoja 'Desglose por Documento'.")
+            elif csv_path is not None:
+                print(f"El desglose por documento está en: {os.path.abspath(csv_path)}")
 
     except Exception as e:
         print(f"❌ ERROR al guardar el archivo XLSX: {e}")
 
 
+def parse_arguments() -> argparse.Namespace:
+    """Define y procesa los argumentos de línea de comandos."""
+    parser = argparse.ArgumentParser(description="Conteo de palabras clave en los reportes TXT y HTML.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--index', action='store_true',
+                      help="Usa el índice persistente: solo se leen los archivos nuevos o modificados.")
+    mode.add_argument('--incremental', action='store_true',
+                      help="Reutiliza los conteos por archivo del manifiesto de la ejecución anterior.")
+    parser.add_argument('--index-file', default=INDEX_DB_FILE, help="Ruta del índice SQLite.")
+    parser.add_argument('--manifest-file', default=MANIFEST_FILE, help="Ruta del manifiesto incremental.")
+    parser.add_argument('--mmap', action='store_true',
+                        help="Lector con mmap y detección de codificación: menos memoria con archivos grandes.")
+    parser.add_argument('--match', choices=MATCH_MODES, default='raw',
+                        help="'raw': subcadenas del contenido en minúsculas (marcado incluido); 'words': palabras o "
+                             "frases completas del texto visible, sin distinguir acentos.")
+    parser.add_argument('--breakdown', choices=BREAKDOWN_FORMATS, default='xlsx',
+                        help="Desglose por documento y keyword: hoja del XLSX (lenta con muchas filas y limitada "
+                             "al máximo de Excel), CSV junto al XLSX o ninguno.")
+    parser.add_argument('--timings', action='store_true',
+                        help="Mide cada etapa (lectura y conteo por archivo, Excel...) y muestra p50/p95/p99 al final.")
+    parser.add_argument('--trace', default=None, metavar='ARCHIVO',
+                        help="Guarda cada medición en un archivo JSONL (implica --timings).")
+    parser.add_argument('--profile', default=None, metavar='ARCHIVO',
+                        help="Perfila la ejecución con cProfile y guarda las estadísticas (.prof).")
+    args = parser.parse_args()
+    if args.index and args.match != 'raw':
+        parser.error("--index cuenta subcadenas del contenido guardado: no admite --match words.")
+    if args.index and args.mmap:
+        parser.error("--index lee los archivos con el lector por defecto al indexarlos: no admite --mmap.")
+    return args
+
+
 if __name__ == "__main__":
+    args = parse_arguments()
+    if args.timings or args.trace:
+        enable_timing(args.trace)
+    profiler = start_profiler(args.profile is not None)
     
     # 1. Obtener la lista de palabras clave
     # Ahora esta función garantiza que solo se procesen palabras clave únicas
-    keywords = get_keywords_from_excel(KEYWORD_FILE)
+    with timed_stage('keywords.load_excel'):
+        keywords = get_keywords_from_excel(KEYWORD_FILE)
     
     if not keywords:
         sys.exit("Terminando el script. No se pudieron obtener palabras clave válidas.")
         
     # 2. Encontrar los archivos de reporte de auditoría (TXT y HTML)
     folders_to_inspect = [REPORT_FOLDER, INDEX_FOLDER]
-    all_files_to_analyze = find_report_files(folders_to_inspect)
+    with timed_stage('files.discover'):
+        all_files_to_analyze = find_report_files(folders_to_inspect)
     
     if not all_files_to_analyze:
         sys.exit("Terminando el script. No se encontraron archivos TXT o HTML para analizar en los subdirectorios.")
 
     # 3. Analizar las palabras clave en los reportes
-    analysis_results = analyze_keywords_in_reports(keywords, all_files_to_analyze)
+    if args.index:
+        analysis_results, keyword_matrix = analyze_keywords_with_index(keywords, all_files_to_analyze,
+                                                                       args.index_file)
+    elif args.incremental:
+        analysis_results, keyword_matrix = analyze_keywords_incrementally(keywords, all_files_to_analyze,
+                                                                          args.manifest_file, args.mmap, args.match)
+    else:
+        analysis_results, keyword_matrix = analyze_keywords_in_reports(keywords, all_files_to_analyze, args.mmap,
+                                                                       args.match)
     
     # --- Generar nombre de archivo dinámico: output_YYYYMMDD_HHMMSS.xlsx ---
     timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -207,4 +641,11 @@ if __name__ == "__main__":
     # -----------------------------------------------------------------------
 
     # 4. Guardar los resultados en XLSX, especificando la carpeta de salida
-    save_results_to_xlsx(analysis_results, output_filename, OUTPUT_FOLDER)
\ No newline at end of file
+    with timed_stage('xlsx.write', keywords=len(keywords), documents=len(all_files_to_analyze)):
+        save_results_to_xlsx(analysis_results, output_filename, OUTPUT_FOLDER, keyword_matrix, args.breakdown)
+
+    stop_profiler(profiler, args.profile)
+    stage_timer = get_active_timer()
+    if stage_timer is not None:
+        stage_timer.close()
+        print(stage_timer.summary())
\ No newline at end of file
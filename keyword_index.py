@@ -0,0 +1,194 @@
+import os
+import sqlite3
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from keyword_matching import build_keyword_automaton, count_keywords_in_content
+
+# --- CONFIGURACIÓN DEL ÍNDICE ---
+INDEX_DB_FILE = '.keyword_index.sqlite'   # Índice persistente del corpus reports/ + index/
+MIN_TRIGRAM_KEYWORD = 3                   # Longitud mínima para filtrar candidatos con trigramas
+# Keywords memorizadas como máximo: sync() recuenta todas en cada archivo nuevo o modificado,
+# así que al superarse se olvidan las consultadas hace más tiempo (LRU)
+MAX_CACHED_KEYWORDS = 5000
+# --------------------------------
+
+
+class KeywordIndex:
+    """
+    Índice invertido persistente (SQLite FTS5 con tokenizador de trigramas) sobre el
+    contenido de los archivos encontrados por find_report_files.
+
+    - `sync()` indexa solo los archivos nuevos o modificados (tamaño/mtime) y elimina
+      los que ya no existen, por lo que cada ejecución es incremental.
+    - `count_keywords()` responde desde el índice: el filtro de trigramas reduce los
+      documentos candidatos y el conteo final se hace con `str.count` sobre el contenido
+      guardado, de modo que los conteos son IDÉNTICOS al análisis sin índice.
+      Los resultados por keyword se memorizan y se actualizan al cambiar los archivos,
+      así que una keyword ya consultada se responde con una sola consulta SQL. Se
+      memorizan como máximo `max_cached_keywords` (nunca se olvidan las de la consulta
+      en curso): al superarse se borran los conteos de las usadas hace más tiempo.
+
+    Diferencias documentadas respecto al análisis sin índice:
+      - Un archivo modificado sin cambiar de tamaño ni de mtime no se reindexa.
+      - Las keywords de menos de 3 caracteres no pueden usar el filtro de trigramas y
+        recorren todos los documentos (con `instr` en SQLite); el conteo sigue siendo exacto.
+    """
+
+    def __init__(self, db_path: str = INDEX_DB_FILE, max_cached_keywords: int = MAX_CACHED_KEYWORDS):
+        self.db_path = db_path
+        self.max_cached_keywords = max_cached_keywords
+        self.evicted_keywords = 0   # Keywords olvidadas en la última consulta
+        self.conn = sqlite3.connect(db_path)
+        self._create_schema()
+
+    def _create_schema(self):
+        with self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    id INTEGER PRIMARY KEY,
+                    path TEXT UNIQUE NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL
+                );
+                CREATE VIRTUAL TABLE IF NOT EXISTS contents
+                    USING fts5(content, tokenize = 'trigram case_sensitive 1');
+                CREATE TABLE IF NOT EXISTS cached_keywords (
+                    keyword TEXT PRIMARY KEY,
+                    last_used INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE TABLE IF NOT EXISTS keyword_counts (
+                    keyword TEXT NOT NULL,
+                    doc_id INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (keyword, doc_id)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS keyword_counts_doc ON keyword_counts (doc_id);
+            """)
+            # Índices creados antes de limitar la memoria de keywords: añadir la columna LRU
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(cached_keywords)")}
+            if 'last_used' not in columns:
+                self.conn.execute("ALTER TABLE cached_keywords ADD COLUMN last_used INTEGER NOT NULL DEFAULT 0")
+
+    def close(self):
+        self.conn.close()
+
+    # --- Sincronización con el corpus ---------------------------------------
+
+    def sync(self, file_paths: Iterable[str], reader: Callable[[str], str]) -> Dict[str, int]:
+        """
+        Sincroniza el índice con la lista de archivos. `reader` devuelve el contenido
+        en minúsculas de un archivo (read_file_content_robustly).
+
+        Returns:
+            Estadísticas: {'nuevos', 'modificados', 'eliminados', 'sin_cambios'}.
+        """
+        stats = {'nuevos': 0, 'modificados': 0, 'eliminados': 0, 'sin_cambios': 0}
+        known = {path: (doc_id, size, mtime) for doc_id, path, size, mtime in
+                 self.conn.execute("SELECT id, path, size, mtime FROM documents")}
+        cached_keywords = [row[0] for row in self.conn.execute("SELECT keyword FROM cached_keywords")]
+        automaton = build_keyword_automaton(cached_keywords) if cached_keywords else None
+
+        seen = set()
+        with self.conn:
+            for path in file_paths:
+                seen.add(path)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+
+                previous = known.get(path)
+                if previous and previous[1] == stat.st_size and previous[2] == stat.st_mtime:
+                    stats['sin_cambios'] += 1
+                    continue
+
+                if previous:
+                    doc_id = previous[0]
+                    self._remove_content(doc_id)
+                    self.conn.execute("UPDATE documents SET size = ?, mtime = ? WHERE id = ?",
+                                      (stat.st_size, stat.st_mtime, doc_id))
+                    stats['modificados'] += 1
+                else:
+                    doc_id = self.conn.execute("INSERT INTO documents (path, size, mtime) VALUES (?, ?, ?)",
+                                               (path, stat.st_size, stat.st_mtime)).lastrowid
+                    stats['nuevos'] += 1
+
+                content = reader(path)
+                if not content:
+                    # Igual que en el análisis directo: los archivos vacíos/ilegibles no cuentan
+                    continue
+                self.conn.execute("INSERT INTO contents (rowid, content) VALUES (?, ?)", (doc_id, content))
+
+                # Mantener al día los conteos ya memorizados con una sola pasada Aho-Corasick
+                if automaton is not None:
+                    counts = count_keywords_in_content(automaton, content)
+                    self.conn.executemany(
+                        "INSERT INTO keyword_counts (keyword, doc_id, count) VALUES (?, ?, ?)",
+                        [(kw, doc_id, count) for kw, count in zip(cached_keywords, counts) if count > 0])
+
+            for path, (doc_id, _, _) in known.items():
+                if path not in seen:
+                    self._remove_content(doc_id)
+                    self.conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+                    stats['eliminados'] += 1
+
+        return stats
+
+    def _remove_content(self, doc_id: int):
+        self.conn.execute("DELETE FROM contents WHERE rowid = ?", (doc_id,))
+        self.conn.execute("DELETE FROM keyword_counts WHERE doc_id = ?", (doc_id,))
+
+    # --- Consultas -----------------------------------------------------------
+
+    def _candidates(self, keyword: str) -> Iterable[Tuple[int, str]]:
+        """Documentos que pueden contener la keyword (id, contenido)."""
+        if len(keyword) >= MIN_TRIGRAM_KEYWORD:
+            phrase = '"' + keyword.replace('"', '""') + '"'
+            return self.conn.execute("SELECT rowid, content FROM contents WHERE contents MATCH ?", (phrase,))
+        if keyword:
+            return self.conn.execute("SELECT rowid, content FROM contents WHERE instr(content, ?) > 0", (keyword,))
+        return self.conn.execute("SELECT rowid, content FROM contents")
+
+    def _compute_keyword(self, keyword: str, generation: int):
+        """Calcula y memoriza los conteos exactos de una keyword nueva."""
+        rows = []
+        for doc_id, content in self._candidates(keyword):
+            count = content.count(keyword)
+            if count > 0:
+                rows.append((keyword, doc_id, count))
+        self.conn.executemany("INSERT INTO keyword_counts (keyword, doc_id, count) VALUES (?, ?, ?)", rows)
+        self.conn.execute("INSERT INTO cached_keywords (keyword, last_used) VALUES (?, ?)", (keyword, generation))
+
+    def _evict_keywords(self, generation: int) -> int:
+        """Olvida las keywords usadas hace más tiempo hasta volver a max_cached_keywords."""
+        excess = self.conn.execute("SELECT COUNT(*) FROM cached_keywords").fetchone()[0] - self.max_cached_keywords
+        if excess <= 0:
+            return 0
+        stale = [row for row in self.conn.execute(
+            "SELECT keyword FROM cached_keywords WHERE last_used < ? ORDER BY last_used LIMIT ?",
+            (generation, excess))]
+        self.conn.executemany("DELETE FROM keyword_counts WHERE keyword = ?", stale)
+        self.conn.executemany("DELETE FROM cached_keywords WHERE keyword = ?", stale)
+        return len(stale)
+
+    def count_keywords(self, keywords: List[str]) -> Dict[str, Dict[str, int]]:
+        """
+        Devuelve {keyword: {ruta: coincidencias}} con solo los archivos con coincidencias.
+        """
+        cached = {row[0] for row in self.conn.execute("SELECT keyword FROM cached_keywords")}
+        generation = self.conn.execute("SELECT COALESCE(MAX(last_used), 0) + 1 FROM cached_keywords").fetchone()[0]
+        with self.conn:
+            for keyword in keywords:
+                if keyword not in cached:
+                    self._compute_keyword(keyword, generation)
+                    cached.add(keyword)
+            self.conn.executemany("UPDATE cached_keywords SET last_used = ? WHERE keyword = ?",
+                                  [(generation, keyword) for keyword in dict.fromkeys(keywords)])
+            self.evicted_keywords = self._evict_keywords(generation)
+
+        results: Dict[str, Dict[str, int]] = {}
+        for keyword in keywords:
+            results[keyword] = {path: count for path, count in self.conn.execute(
+                "SELECT d.path, k.count FROM keyword_counts k JOIN documents d ON d.id = k.doc_id "
+                "WHERE k.keyword = ?", (keyword,))}
+        return results
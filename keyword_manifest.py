@@ -0,0 +1,85 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional
+
+# --- CONFIGURACIÓN DEL MANIFIESTO ---
+MANIFEST_FILE = '.keyword_manifest.json'   # Conteos por archivo de la última ejecución
+MANIFEST_VERSION = 1
+HASH_BLOCK_SIZE = 1024 * 1024
+# ------------------------------------
+
+
+def new_manifest() -> Dict[str, Any]:
+    """Manifiesto vacío: keywords analizadas y datos por archivo."""
+    return {'version': MANIFEST_VERSION, 'keywords': [], 'files': {}}
+
+
+def load_manifest(path: str = MANIFEST_FILE) -> Dict[str, Any]:
+    """
+    Carga el manifiesto de la ejecución anterior. Si no existe, está corrupto o es de
+    otra versión, devuelve uno vacío (lo que equivale a una ejecución completa).
+
+    Estructura:
+        {
+          'version': 1,
+          'keywords': [...],                # keywords analizadas en TODOS los archivos
+          'files': {
+              ruta: {'size': int, 'mtime': float, 'sha256': str,
+                     'counts': {keyword: coincidencias > 0}}
+          }
+        }
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return new_manifest()
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Advertencia: No se pudo leer el manifiesto '{path}' ({e}). Se hará un análisis completo.")
+        return new_manifest()
+
+    if manifest.get('version') != MANIFEST_VERSION:
+        return new_manifest()
+    return manifest
+
+
+def save_manifest(manifest: Dict[str, Any], path: str = MANIFEST_FILE):
+    """Guarda el manifiesto de forma atómica (temporal + reemplazo)."""
+    tmp_path = path + '.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️ Advertencia: No se pudo guardar el manifiesto '{path}': {e}")
+
+
+def file_sha256(file_path: str) -> Optional[str]:
+    """Hash SHA-256 del contenido binario del archivo (None si no se puede leer)."""
+    digest = hashlib.sha256()
+    try:
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def is_file_unchanged(file_path: str, entry: Optional[Dict[str, Any]], stat: os.stat_result) -> bool:
+    """
+    Compara el archivo con su entrada del manifiesto: primero tamaño y mtime (sin leer
+    el archivo) y, si difieren, el hash del contenido. Si el contenido es el mismo se
+    actualiza el mtime de la entrada para no volver a calcular el hash.
+    """
+    if entry is None:
+        return False
+    if entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime:
+        return True
+    if entry['size'] != stat.st_size:
+        return False
+    if file_sha256(file_path) == entry['sha256']:
+        entry['mtime'] = stat.st_mtime
+        return True
+    return False
@@ -0,0 +1,249 @@
+import html
+import re
+import unicodedata
+from collections import deque
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Sequence, Tuple
+
+# --- CONFIGURACIÓN DE LA BÚSQUEDA ---
+MATCH_MODES = ('raw', 'words')   # raw: subcadenas del contenido; words: palabras completas del texto visible
+# Su contenido no es texto visible: se descarta entero en el modo 'words'
+HIDDEN_BLOCK_TAGS = ('script', 'style', 'noscript', 'template')
+MAX_MARKUP_CARRY = 64 * 1024     # Una etiqueta o comentario sin cerrar más largo se trata como texto
+# Por debajo de este número de keywords, en el modo 'raw' con el contenido completo en memoria,
+# un `str.count` por keyword (en C) es más rápido que el autómata en Python puro (punto de
+# corte medido con benchmarks/bench_keyword_matching.py: entre 200 y 400 con páginas de 200 KB)
+AUTOMATON_MIN_KEYWORDS = 250
+# Marcas diacríticas combinantes (tildes, diéresis, virgulilla...) que quedan sueltas tras NFKD
+COMBINING_MARKS_RE = re.compile('[\u0300-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]')
+WORD_RE = re.compile(r'\w+')
+TAG_NAME_RE = re.compile(r'/?([a-zA-Z][a-zA-Z0-9-]*)')
+# Fin de una etiqueta: el primer '>' fuera de los valores de atributo entre comillas
+# (title='a > b'). Una comilla que no sigue a '=' es texto del valor (href=a'b).
+TAG_END_RE = re.compile(r'''(?:[^>"'=]|=\s*"[^"]*"|=\s*'[^']*'|=(?!\s*["'])|["'])*>''')
+HIDDEN_END_RES = {tag: re.compile(rf'</{tag}\s*>', re.IGNORECASE) for tag in HIDDEN_BLOCK_TAGS}
+# ------------------------------------
+
+
+def normalize_for_matching(text: str) -> str:
+    """
+    Texto comparable sin distinguir mayúsculas ni acentos: casefold + NFKD sin marcas
+    diacríticas ('Información' -> 'informacion'; también 'ñ' -> 'n' y 'ﬁ' -> 'fi').
+    """
+    text = text.casefold()
+    if text.isascii():
+        return text
+    return COMBINING_MARKS_RE.sub('', unicodedata.normalize('NFKD', text))
+
+
+def keyword_words(keyword: str) -> Tuple[str, ...]:
+    """Palabras normalizadas de una keyword ('SEO On-Page' -> ('seo', 'on', 'page'))."""
+    return tuple(WORD_RE.findall(normalize_for_matching(keyword)))
+
+
+def find_tag_end(text: str, lt: int) -> int:
+    """
+    Posición del '>' que cierra la etiqueta que empieza en `lt`, sin contar los que van
+    dentro de un valor entre comillas; -1 si la etiqueta o una comilla siguen abiertas.
+    """
+    end = text.find('>', lt)
+    if end < 0 or ('"' not in text[lt:end] and "'" not in text[lt:end]):
+        return end
+    match = TAG_END_RE.match(text, lt)
+    return match.end() - 1 if match else -1
+
+
+def iter_visible_text(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Quita el marcado de un documento que llega por fragmentos, en una sola pasada: las
+    etiquetas y comentarios se sustituyen por un espacio, el contenido de
+    script/style/noscript/template se descarta y se resuelven las entidades (&oacute;).
+
+    Una etiqueta (también con un valor entre comillas abierto), comentario o bloque
+    oculto que cruza un corte se completa con el fragmento siguiente. Un '<' que no abre una etiqueta ('a < b') es texto. Los textos
+    sin marcado (informes TXT) se devuelven igual, salvo las entidades.
+    """
+    carry = ''
+    hidden: Optional[str] = None   # Bloque oculto abierto (p. ej. 'script')
+    for chunk in chunks:
+        text = carry + chunk
+        carry = ''
+        visible: List[str] = []
+        pos = 0
+        while pos < len(text):
+            if hidden is not None:
+                end = HIDDEN_END_RES[hidden].search(text, pos)
+                if end is None:
+                    # El cierre puede llegar partido: se conserva solo la cola del fragmento
+                    carry = text[max(pos, len(text) - len(hidden) - 16):]
+                    break
+                hidden = None
+                pos = end.end()
+                visible.append(' ')
+                continue
+
+            lt = text.find('<', pos)
+            if lt < 0:
+                visible.append(text[pos:])
+                break
+            visible.append(text[pos:lt])
+            if text.startswith('<!--', lt):
+                end = text.find('-->', lt + 4)
+                close = end + 3
+            else:
+                name = TAG_NAME_RE.match(text, lt + 1)
+                if name is None and not text.startswith(('<!', '<?'), lt):
+                    if text[lt + 1:] in ('', '/'):   # '<' o '</' al final del fragmento: aún no se sabe
+                        carry = text[lt:]
+                        break
+                    visible.append('<')   # 'a < b': no es una etiqueta
+                    pos = lt + 1
+                    continue
+                end = find_tag_end(text, lt)
+                close = end + 1
+                if end >= 0 and name is not None and text[lt + 1] != '/' \
+                        and name.group(1).lower() in HIDDEN_END_RES and text[end - 1] != '/':
+                    hidden = name.group(1).lower()
+            if end < 0:
+                if len(text) - lt > MAX_MARKUP_CARRY:
+                    visible.append(text[lt:])   # Marcado sin cerrar demasiado largo: se trata como texto
+                else:
+                    carry = text[lt:]
+                break
+            visible.append(' ')
+            pos = close
+        yield html.unescape(''.join(visible))
+    # Lo que queda es una etiqueta sin cerrar o un bloque oculto: no es texto visible
+
+
+def iter_word_chunks(chunks: Iterable[str]) -> Iterator[List[str]]:
+    """Palabras normalizadas del texto visible de un documento, por fragmentos."""
+    for text in iter_visible_text(chunks):
+        words = WORD_RE.findall(normalize_for_matching(text))
+        if words:
+            yield words
+
+
+def build_keyword_automaton(keywords: List[str], mode: str = 'raw',
+                            min_automaton_keywords: int = AUTOMATON_MIN_KEYWORDS) -> Dict[str, Any]:
+    """
+    Construye un autómata Aho-Corasick con todas las palabras clave, de modo que
+    cada archivo pueda recorrerse UNA sola vez contando todas las keywords a la vez.
+
+    Con mode='raw' el autómata recorre el contenido carácter a carácter (mismos conteos
+    que `content.count(keyword)`). Con mode='words' recorre las palabras del texto
+    visible (ver iter_word_chunks) y cada keyword es su secuencia de palabras
+    normalizadas, así que solo cuentan las palabras o frases completas, sin distinguir
+    acentos: 'seo' no aparece en 'seoul' e 'información' aparece en 'informacion'.
+
+    Con mode='raw' y menos de `min_automaton_keywords` keywords, count_keywords_in_content
+    usa `str.count` en lugar del autómata (más rápido con pocas keywords); el recorrido
+    por fragmentos (count_keywords_in_chunks) usa siempre el autómata.
+    """
+    if mode not in MATCH_MODES:
+        raise ValueError(f"Modo de búsqueda desconocido: {mode!r} (válidos: {', '.join(MATCH_MODES)})")
+    symbols: Sequence[Sequence[Any]] = keywords if mode == 'raw' else [keyword_words(kw) for kw in keywords]
+
+    goto: List[Dict[str, int]] = [{}]   # Transiciones del trie
+    fail: List[int] = [0]               # Enlaces de fallo
+    output: List[List[int]] = [[]]      # Índices de keywords que terminan en cada estado
+
+    for idx, keyword in enumerate(symbols):
+        if not keyword:
+            # La cadena vacía se resuelve aparte (ver count_keywords_in_content)
+            continue
+        state = 0
+        for ch in keyword:
+            next_state = goto[state].get(ch)
+            if next_state is None:
+                next_state = len(goto)
+                goto.append({})
+                fail.append(0)
+                output.append([])
+                goto[state][ch] = next_state
+            state = next_state
+        output[state].append(idx)
+
+    # Recorrido en anchura para calcular los enlaces de fallo y propagar las salidas
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        for ch, child in goto[state].items():
+            queue.append(child)
+            fallback = fail[state]
+            while fallback and ch not in goto[fallback]:
+                fallback = fail[fallback]
+            fail[child] = goto[fallback].get(ch, 0)
+            if output[fail[child]]:
+                output[child] = output[child] + output[fail[child]]
+
+    return {
+        'mode': mode,
+        'use_str_count': mode == 'raw' and len(keywords) < min_automaton_keywords,
+        'keywords': list(keywords),
+        'lengths': [len(kw) for kw in symbols],
+        'goto': goto,
+        'fail': fail,
+        'output': output,
+    }
+
+
+def count_keywords_in_chunks(automaton: Dict[str, Any], chunks: Iterable[str]) -> Tuple[List[int], int]:
+    """
+    Cuenta todas las palabras clave del autómata en una sola pasada sobre un texto que
+    llega por fragmentos (el estado del autómata se conserva entre fragmentos, así que
+    las coincidencias que cruzan un corte también se cuentan). En el modo 'words' los
+    fragmentos deben cortarse entre palabras (como iter_lowercase_chunks).
+
+    Returns:
+        Una tupla: (conteos por keyword, longitud total del texto; en el modo 'words',
+        número de palabras visibles).
+    """
+    if automaton['mode'] == 'words':
+        chunks = iter_word_chunks(chunks)
+    keywords = automaton['keywords']
+    lengths = automaton['lengths']
+    goto = automaton['goto']
+    fail = automaton['fail']
+    output = automaton['output']
+
+    counts = [0] * len(keywords)
+    # Posición mínima en la que puede empezar la siguiente coincidencia de cada keyword
+    next_start = [0] * len(keywords)
+
+    state = 0
+    offset = 0
+    for chunk in chunks:
+        for pos, ch in enumerate(chunk, offset):
+            transitions = goto[state]
+            while state and ch not in transitions:
+                state = fail[state]
+                transitions = goto[state]
+            state = transitions.get(ch, 0)
+
+            for idx in output[state]:
+                start = pos - lengths[idx] + 1
+                if start >= next_start[idx]:
+                    counts[idx] += 1
+                    next_start[idx] = pos + 1
+        offset += len(chunk)
+
+    # str.count('') devuelve len(content) + 1; se respeta la misma semántica (en el modo
+    # 'words' una keyword sin palabras no aparece nunca)
+    for idx, keyword in enumerate(keywords):
+        if not keyword and automaton['mode'] == 'raw':
+            counts[idx] = offset + 1
+
+    return counts, offset
+
+
+def count_keywords_in_content(automaton: Dict[str, Any], content: str) -> List[int]:
+    """
+    Cuenta todas las palabras clave del autómata en una sola pasada sobre el contenido.
+
+    Los conteos son idénticos a `content.count(keyword)`: ocurrencias NO solapadas,
+    buscadas de izquierda a derecha (p. ej. 'aa' aparece 2 veces en 'aaaa', no 3).
+    En el modo 'words', lo mismo sobre las palabras del texto visible.
+    """
+    if automaton['use_str_count']:
+        return [content.count(keyword) for keyword in automaton['keywords']]
+    return count_keywords_in_chunks(automaton, (content,))[0]
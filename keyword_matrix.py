@@ -0,0 +1,191 @@
+import os
+import re
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# --- CONFIGURACIÓN DE LA MATRIZ ---
+EXCEL_MAX_ROWS = 1048576   # Filas máximas de una hoja de Excel (incluida la cabecera)
+# Sufijo de hash que añade report_storage.get_filename_base (dominio_com_<16 hex>)
+URL_HASH_SUFFIX_RE = re.compile(r'_[0-9a-f]{16}$')
+# ----------------------------------
+
+
+def get_document_domain(display_name: str) -> str:
+    """
+    Dominio de un documento a partir de su nombre (dominio_com_<hash>.html.gz -> dominio_com).
+    """
+    name = os.path.basename(display_name)
+    name = name.split('.', 1)[0]
+    return URL_HASH_SUFFIX_RE.sub('', name)
+
+
+class KeywordDocumentMatrix:
+    """
+    Matriz dispersa keyword x documento con el número de coincidencias.
+
+    Se guarda en formato de coordenadas (COO): tres arrays de NumPy con la fila
+    (índice de la keyword), la columna (índice del documento) y el conteo, solo para
+    las celdas distintas de cero. Todos los totales (por keyword, por documento, por
+    dominio) se calculan con operaciones vectorizadas (np.bincount / groupby de pandas)
+    en lugar de bucles de Python.
+
+    Los documentos conservan el orden en que se añaden (el de find_report_files), que
+    es el orden en que se listan en 'Archivos Encontrados'.
+    """
+
+    def __init__(self, keywords: Sequence[str], documents: Sequence[str],
+                 display_names: Optional[Sequence[str]] = None):
+        self.keywords = list(keywords)
+        self.documents = list(documents)
+        self.display_names = list(display_names) if display_names is not None else list(documents)
+        self._row_parts: List[np.ndarray] = []
+        self._col_parts: List[np.ndarray] = []
+        self._count_parts: List[np.ndarray] = []
+        self._finalized: Optional[tuple] = None
+
+    # --- Construcción --------------------------------------------------------
+
+    def add_document_counts(self, doc_index: int, counts: Sequence[int]):
+        """Añade los conteos de un documento (un valor por keyword, en orden)."""
+        counts_array = np.fromiter(counts, dtype=np.int64, count=len(counts))
+        rows = np.flatnonzero(counts_array)
+        if rows.size:
+            self.add_entries(rows, np.full(rows.size, doc_index, dtype=np.int64), counts_array[rows])
+
+    def add_entries(self, rows: np.ndarray, cols: np.ndarray, counts: np.ndarray):
+        """Añade celdas (keyword, documento, conteo) distintas de cero."""
+        self._row_parts.append(rows)
+        self._col_parts.append(cols)
+        self._count_parts.append(counts)
+        self._finalized = None
+
+    @property
+    def coo(self) -> tuple:
+        """(filas, columnas, conteos) ordenados por keyword y, dentro de cada una, por documento."""
+        if self._finalized is None:
+            if self._row_parts:
+                rows = np.concatenate(self._row_parts)
+                cols = np.concatenate(self._col_parts)
+                counts = np.concatenate(self._count_parts)
+            else:
+                rows = cols = counts = np.zeros(0, dtype=np.int64)
+            order = np.lexsort((cols, rows))
+            rows, cols, counts = rows[order], cols[order], counts[order]
+            # Se conserva la versión ordenada para no volver a concatenar
+            self._row_parts, self._col_parts, self._count_parts = [rows], [cols], [counts]
+            self._finalized = (rows, cols, counts)
+        return self._finalized
+
+    @property
+    def document_domains(self) -> List[str]:
+        """Dominio de cada documento (ver get_document_domain)."""
+        return [get_document_domain(name) for name in self.display_names]
+
+    @property
+    def nnz(self) -> int:
+        """Número de celdas distintas de cero."""
+        return int(self.coo[0].size)
+
+    # --- Agregaciones vectorizadas ------------------------------------------
+
+    def keyword_totals(self) -> np.ndarray:
+        """Coincidencias totales por keyword."""
+        rows, _, counts = self.coo
+        return np.bincount(rows, weights=counts, minlength=len(self.keywords)).astype(np.int64)
+
+    def keyword_document_frequency(self) -> np.ndarray:
+        """Número de documentos en los que aparece cada keyword."""
+        return np.bincount(self.coo[0], minlength=len(self.keywords))
+
+    def document_totals(self) -> np.ndarray:
+        """Coincidencias totales por documento."""
+        _, cols, counts = self.coo
+        return np.bincount(cols, weights=counts, minlength=len(self.documents)).astype(np.int64)
+
+    def document_keyword_frequency(self) -> np.ndarray:
+        """Número de keywords distintas encontradas en cada documento."""
+        return np.bincount(self.coo[1], minlength=len(self.documents))
+
+    def found_in_files(self) -> List[List[str]]:
+        """Para cada keyword, los documentos con coincidencias en orden de documento."""
+        rows, cols, _ = self.coo
+        names = np.asarray(self.display_names, dtype=object)
+        boundaries = np.cumsum(self.keyword_document_frequency())[:-1]
+        return [list(part) for part in np.split(names[cols], boundaries)] if self.keywords else []
+
+    # --- Vistas para pandas / Excel -----------------------------------------
+
+    def to_long_dataframe(self) -> pd.DataFrame:
+        """Celdas distintas de cero en formato largo: documento, dominio, keyword, coincidencias."""
+        rows, cols, counts = self.coo
+        names = np.asarray(self.display_names, dtype=object)
+        domains = np.asarray(self.document_domains, dtype=object)
+        keywords = np.asarray(self.keywords, dtype=object)
+        df = pd.DataFrame({
+            'Documento': names[cols] if cols.size else names[:0],
+            'Dominio': domains[cols] if cols.size else domains[:0],
+            'Keyword': keywords[rows] if rows.size else keywords[:0],
+            'Coincidencias': counts,
+        })
+        # Orden natural de lectura: por documento y, dentro de cada uno, por keyword
+        return df.iloc[np.lexsort((rows, cols))].reset_index(drop=True)
+
+    def document_summary(self) -> pd.DataFrame:
+        """Una fila por documento con sus totales."""
+        return pd.DataFrame({
+            'Documento': self.display_names,
+            'Dominio': self.document_domains,
+            'Keywords Distintas': self.document_keyword_frequency(),
+            'Coincidencias Totales': self.document_totals(),
+        })
+
+    def domain_summary(self) -> pd.DataFrame:
+        """Una fila por dominio: documentos, coincidencias y keywords distintas."""
+        domain_codes, domain_names = pd.factorize(pd.Series(self.document_domains, dtype=object), sort=True)
+        n_domains = len(domain_names)
+        rows, cols, _ = self.coo
+        # Pares (dominio, keyword) únicos -> keywords distintas por dominio
+        pairs = np.unique(domain_codes[cols].astype(np.int64) * max(1, len(self.keywords)) + rows)
+        return pd.DataFrame({
+            'Dominio': domain_names,
+            'Documentos': np.bincount(domain_codes, minlength=n_domains),
+            'Keywords Distintas': np.bincount(pairs // max(1, len(self.keywords)), minlength=n_domains),
+            'Coincidencias Totales': np.bincount(domain_codes, weights=self.document_totals(),
+                                                 minlength=n_domains).astype(np.int64),
+        })
+
+    def to_dense_dataframe(self) -> pd.DataFrame:
+        """Matriz completa keyword x documento (solo para conjuntos pequeños)."""
+        dense = np.zeros((len(self.keywords), len(self.documents)), dtype=np.int64)
+        rows, cols, counts = self.coo
+        np.add.at(dense, (rows, cols), counts)
+        return pd.DataFrame(dense, index=self.keywords, columns=self.display_names)
+
+
+def matrix_from_file_counts(keywords: Sequence[str], documents: Sequence[str],
+                            display_names: Sequence[str],
+                            counts_by_document: Dict[int, Dict[str, int]]) -> KeywordDocumentMatrix:
+    """
+    Construye la matriz a partir de conteos por documento como diccionarios
+    {keyword: coincidencias} (manifiesto incremental / índice persistente).
+    """
+    matrix = KeywordDocumentMatrix(keywords, documents, display_names)
+    keyword_positions: Dict[str, List[int]] = {}
+    for idx, keyword in enumerate(keywords):
+        keyword_positions.setdefault(keyword, []).append(idx)
+
+    rows: List[int] = []
+    cols: List[int] = []
+    counts: List[int] = []
+    for doc_index, doc_counts in counts_by_document.items():
+        for keyword, count in doc_counts.items():
+            for idx in keyword_positions.get(keyword, []):
+                rows.append(idx)
+                cols.append(doc_index)
+                counts.append(count)
+    if rows:
+        matrix.add_entries(np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64),
+                       np.asarray(counts, dtype=np.int64))
+    return matrix
@@ -0,0 +1,454 @@
+import datetime
+import functools
+import hashlib
+import json
+import random
+import re
+import sqlite3
+import threading
+import zlib
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # NumPy solo se importa al calcular o comparar firmas: importar el módulo no lo carga
+    import numpy as np
+
+# --- CONFIGURACIÓN DE LAS HUELLAS Y LA DEDUPLICACIÓN ---
+FINGERPRINTS_DB_FILE = 'seo_fingerprints.sqlite'   # Última huella de cada URL auditada con --dedup
+DEFAULT_BATCH_SIZE = 200          # Huellas acumuladas antes de cada escritura en bloque
+SHINGLE_WORDS = 5                 # Palabras por shingle (fragmento solapado del texto)
+MIN_SHINGLES = 10                 # Menos shingles: texto demasiado corto para comparar
+MINHASH_PERMUTATIONS = 128        # Componentes de la firma MinHash (uint32)
+LSH_BANDS = 32                    # Bandas LSH (32 x 4 filas): candidatas desde ~0,45 de similitud
+MINHASH_SEED = 20240601           # Fija: las firmas guardadas deben ser comparables entre ejecuciones
+MINHASH_BLOCK = 8192              # Shingles por bloque al calcular la firma (acota la memoria)
+DEFAULT_NEAR_DUP_THRESHOLD = 0.8  # Similitud de Jaccard estimada para considerar casi duplicadas
+SMALL_BUCKET = 16                 # En cubetas mayores solo se compara con la primera página
+EXACT_FIELDS = ('title', 'meta_description', 'h1')
+PLACEHOLDER = 'No encontrado'     # Valor por defecto de seo_auditor.new_seo_results
+# Su texto no es contenido visible de la página
+HIDDEN_TEXT_TAGS = {'script', 'style', 'noscript', 'template', 'svg'}
+# Elementos que pueden ir en el <head>: cualquier otro (o texto) abre el cuerpo aunque
+# falte </head>, como en el algoritmo de parseo de HTML5
+HEAD_ELEMENTS = {'html', 'head', 'title', 'base', 'link', 'meta', 'style', 'script', 'noscript', 'template'}
+WORD_RE = re.compile(r'\w+')
+SHINGLE_MULTIPLIER = 1099511628211   # Primo FNV de 64 bits (combina los hashes de las palabras)
+# -------------------------------------------------------
+
+
+@functools.lru_cache(maxsize=1)
+def _minhash_parameters() -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Coeficientes (a, b) de las MINHASH_PERMUTATIONS funciones de hash
+    h(x) = ((a*x + b) mod 2^64) >> 32, con a impar (multiplicar-sumar-desplazar).
+    """
+    import numpy as np
+    rng = random.Random(MINHASH_SEED)
+    a = np.array([rng.getrandbits(64) | 1 for _ in range(MINHASH_PERMUTATIONS)], dtype=np.uint64)
+    b = np.array([rng.getrandbits(64) for _ in range(MINHASH_PERMUTATIONS)], dtype=np.uint64)
+    return a, b
+
+
+class VisibleTextParser(HTMLParser):
+    """
+    Texto visible del <body> (sin <head>, scripts, estilos ni plantillas). El <head>
+    termina en </head>, en <body>, en el primer elemento propio del cuerpo (<p>, <div>...)
+    o en el primer texto fuera de <title>, aunque falte </head>.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._hidden_depth = 0
+        self._in_head = True
+        self._in_title = False
+
+    def handle_starttag(self, tag: str, attrs):
+        if self._in_head:
+            if tag not in HEAD_ELEMENTS:
+                self._in_head = self._in_title = False
+            elif tag == 'title':
+                self._in_title = True
+        if tag in HIDDEN_TEXT_TAGS:
+            self._hidden_depth += 1
+
+    def handle_endtag(self, tag: str):
+        if tag == 'head':
+            self._in_head = self._in_title = False
+        elif tag == 'title':
+            self._in_title = False
+        if tag in HIDDEN_TEXT_TAGS and self._hidden_depth:
+            self._hidden_depth -= 1
+
+    def handle_data(self, data: str):
+        if self._in_head:
+            if self._in_title or self._hidden_depth or not data.strip():
+                return
+            self._in_head = False
+        if not self._hidden_depth:
+            self.parts.append(data)
+
+
+def extract_words(html_content: str) -> List[str]:
+    """Palabras del texto visible, en minúsculas."""
+    parser = VisibleTextParser()
+    parser.feed(html_content)
+    parser.close()
+    return WORD_RE.findall(' '.join(parser.parts).lower())
+
+
+def minhash_signature(words: List[str]) -> Optional["np.ndarray"]:
+    """
+    Firma MinHash (uint32[MINHASH_PERMUTATIONS]) de los shingles de SHINGLE_WORDS
+    palabras, o None si el texto es demasiado corto. La fracción de componentes iguales
+    entre dos firmas estima la similitud de Jaccard de sus conjuntos de shingles.
+    """
+    if len(words) - SHINGLE_WORDS + 1 < MIN_SHINGLES:
+        return None
+    import numpy as np
+    multiplier_a, offset_b = _minhash_parameters()
+    word_hashes = np.fromiter((zlib.crc32(word.encode('utf-8')) for word in words), dtype=np.uint64,
+                              count=len(words))
+    # Hash de cada ventana de SHINGLE_WORDS palabras, vectorizado (aritmética módulo 2^64)
+    n_shingles = len(words) - SHINGLE_WORDS + 1
+    shingles = np.zeros(n_shingles, dtype=np.uint64)
+    for offset in range(SHINGLE_WORDS):
+        shingles = shingles * np.uint64(SHINGLE_MULTIPLIER) + word_hashes[offset:offset + n_shingles]
+    shingles = np.unique((shingles ^ (shingles >> np.uint64(32))) & np.uint64(0xFFFFFFFF))
+    if len(shingles) < MIN_SHINGLES:
+        return None
+
+    signature = np.full(MINHASH_PERMUTATIONS, np.iinfo(np.uint64).max, dtype=np.uint64)
+    for start in range(0, len(shingles), MINHASH_BLOCK):
+        block = shingles[start:start + MINHASH_BLOCK]
+        hashes = (multiplier_a[:, None] * block[None, :] + offset_b[:, None]) >> np.uint64(32)
+        np.minimum(signature, hashes.min(axis=1), out=signature)
+    return signature.astype(np.uint32)
+
+
+def normalize_field(value: Any) -> Optional[str]:
+    """Valor comparable de title/meta_description/h1 (None si no hay valor)."""
+    if isinstance(value, list):
+        value = '\n'.join(value)
+    if not value or value == PLACEHOLDER:
+        return None
+    normalized = ' '.join(value.split()).lower()
+    return normalized or None
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8', errors='replace')).hexdigest()
+
+
+def compute_fingerprint(results: Dict[str, Any], html_content: str) -> Dict[str, Any]:
+    """
+    Huella de una página: hash del HTML (para detectar páginas sin cambios), hash del
+    texto visible (contenido idéntico), hashes exactos de title, meta description y H1
+    y firma MinHash del texto (contenido casi idéntico).
+    """
+    words = extract_words(html_content)
+    fingerprint = {
+        'url': results['url_analizada'],
+        'html_hash': text_digest(html_content),
+        'text_hash': text_digest(' '.join(words)) if words else None,
+        'minhash': minhash_signature(words),
+    }
+    for field in EXACT_FIELDS:
+        normalized = normalize_field(results[field])
+        fingerprint[field + '_hash'] = text_digest(normalized) if normalized is not None else None
+    return fingerprint
+
+
+class _DisjointSet:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, item: int) -> int:
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+
+    def union(self, first: int, second: int):
+        self.parent[self.find(first)] = self.find(second)
+
+
+def find_near_duplicates(signatures: List["np.ndarray"], threshold: float = DEFAULT_NEAR_DUP_THRESHOLD,
+                         bands: int = LSH_BANDS) -> List[Tuple[List[int], float]]:
+    """
+    Grupos de firmas MinHash casi idénticas: [(índices, similitud mínima verificada)].
+
+    LSH por bandas: cada firma se divide en `bands` bandas y solo se comparan las firmas
+    que coinciden en alguna banda completa (cubeta), en tiempo casi lineal. En las
+    cubetas de hasta SMALL_BUCKET firmas se comparan todos los pares; en las mayores
+    (plantillas muy repetidas) cada firma solo se compara con la primera, para no
+    volver a un coste cuadrático. Los pares por encima de `threshold` se unen en grupos.
+    """
+    if not signatures:
+        return []
+    import numpy as np
+    matrix = np.vstack(signatures)
+    rows = matrix.shape[1] // bands
+    # Cubetas con más de una firma: cada banda se agrupa con un único np.unique
+    buckets: List[List[int]] = []
+    for band in range(bands):
+        band_values = np.ascontiguousarray(matrix[:, band * rows:(band + 1) * rows])
+        keys = band_values.view(np.dtype((np.void, band_values.dtype.itemsize * rows))).ravel()
+        _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        shared = np.flatnonzero(counts[inverse.ravel()] > 1)
+        order = shared[np.argsort(inverse.ravel()[shared], kind='stable')]
+        boundaries = np.flatnonzero(np.diff(inverse.ravel()[order])) + 1
+        buckets.extend(members.tolist() for members in np.split(order, boundaries) if len(members) > 1)
+
+    groups = _DisjointSet(len(signatures))
+    similarities: Dict[Tuple[int, int], float] = {}
+    for members in buckets:
+        pairs = ([(members[i], other) for i in range(len(members)) for other in members[i + 1:]]
+                 if len(members) <= SMALL_BUCKET else [(members[0], other) for other in members[1:]])
+        for first, second in pairs:
+            key = (first, second)
+            if key in similarities:
+                continue
+            similarity = float(np.mean(matrix[first] == matrix[second]))
+            similarities[key] = similarity
+            if similarity >= threshold:
+                groups.union(first, second)
+
+    clusters: Dict[int, List[int]] = {}
+    for index in range(len(signatures)):
+        clusters.setdefault(groups.find(index), []).append(index)
+    lowest: Dict[int, float] = {}
+    for (first, _), similarity in similarities.items():
+        if similarity >= threshold:
+            root = groups.find(first)
+            lowest[root] = min(lowest.get(root, 1.0), similarity)
+    return [(members, lowest[root]) for root, members in clusters.items() if len(members) > 1]
+
+
+class FingerprintStore:
+    """
+    Huellas de las páginas auditadas (SQLite, una fila por URL con la última huella) para
+    detectar duplicados en todo el corpus y no volver a procesar páginas sin cambios.
+
+    - `precompute()` calcula la huella de una página (ver compute_fingerprint) en el hilo
+      que la parseó; los pools de procesos la calculan en el proceso hijo y la entregan
+      con `attach()`. Así el hilo principal no vuelve a parsear el HTML.
+    - `add()` escribe la huella (ya calculada o, si no, la calcula) en bloque cada
+      `batch_size` páginas; si el HTML no ha cambiado desde la última auditoría no se
+      recalcula nada.
+    - `reuse_results()` devuelve los resultados guardados de una URL cuyo HTML coincide
+      con el de su huella, para saltarse el parseo (y la escritura de informes).
+    - `find_duplicates()` agrupa en tiempo casi lineal las páginas con el mismo title,
+      meta description, H1 o texto visible (hashes exactos) y las de contenido casi
+      idéntico (MinHash + LSH).
+
+    Es seguro usarla desde varios hilos: reuse_results y precompute se llaman en los
+    hilos de descarga y add() en el hilo principal.
+    """
+
+    def __init__(self, db_path: str = FINGERPRINTS_DB_FILE, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.db_path = db_path
+        self.batch_size = max(1, batch_size)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._buffer: Dict[str, tuple] = {}
+        self._computed: Dict[str, Dict[str, Any]] = {}   # Huellas calculadas fuera del hilo principal
+        self.reused_urls = set()   # URLs cuya última descarga reutilizó resultados (ver was_reused)
+        self.stats = {'fingerprinted': 0, 'unchanged': 0, 'reused': 0, 'removed': 0}
+        with self.conn:
+            self.conn.executescript("""
+                PRAGMA journal_mode = WAL;
+                CREATE TABLE IF NOT EXISTS fingerprints (
+                    url TEXT PRIMARY KEY,
+                    html_hash TEXT NOT NULL,
+                    text_hash TEXT,
+                    title_hash TEXT,
+                    meta_description_hash TEXT,
+                    h1_hash TEXT,
+                    minhash BLOB,
+                    results TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                );
+            """)
+        # Hash del HTML de cada URL en memoria: la comprobación de cambios no toca el disco
+        self._html_hashes: Dict[str, str] = dict(self.conn.execute("SELECT url, html_hash FROM fingerprints"))
+
+    def reuse_results(self, url: str, html_content: str) -> Optional[Dict[str, Any]]:
+        """Resultados guardados de la URL si su HTML no ha cambiado (None si cambió o es nueva)."""
+        with self._lock:
+            stored_hash = self._html_hashes.get(url)
+        if stored_hash is None or stored_hash != text_digest(html_content):
+            with self._lock:
+                self.reused_urls.discard(url)
+            return None
+        with self._lock:
+            pending = self._buffer.get(url)
+            if pending is not None:
+                stored = pending[7]
+            else:
+                row = self.conn.execute("SELECT results FROM fingerprints WHERE url = ?", (url,)).fetchone()
+                if row is None:
+                    self.reused_urls.discard(url)
+                    return None
+                stored = row[0]
+            self.reused_urls.add(url)
+            self.stats['reused'] += 1
+        return json.loads(stored)
+
+    def was_reused(self, url: str) -> bool:
+        """
+        True si la última descarga de la URL reutilizó sus resultados guardados. La marca
+        se consume: una descarga posterior de la misma URL (p. ej. en --serve) vuelve a
+        decidir por sí misma.
+        """
+        with self._lock:
+            if url not in self.reused_urls:
+                return False
+            self.reused_urls.discard(url)
+            return True
+
+    def precompute(self, results: Dict[str, Any], html_content: str):
+        """
+        Calcula la huella de una página recién parseada para que add() no tenga que
+        hacerlo (no hace nada si la página tuvo error o su HTML no cambió).
+        """
+        if results['error']:
+            return
+        with self._lock:
+            stored_hash = self._html_hashes.get(results['url_analizada'])
+        if stored_hash is None or stored_hash != text_digest(html_content):
+            self.attach(compute_fingerprint(results, html_content))
+
+    def attach(self, fingerprint: Dict[str, Any]):
+        """Entrega una huella calculada en otro hilo o proceso; add() la usará."""
+        with self._lock:
+            self._computed[fingerprint['url']] = fingerprint
+
+    def add(self, results: Dict[str, Any], html_content: str):
+        """Guarda la huella de una página auditada sin error (no hace nada si no cambió)."""
+        url = results['url_analizada']
+        html_hash = text_digest(html_content)
+        with self._lock:
+            fingerprint = self._computed.pop(url, None)
+            if self._html_hashes.get(url) == html_hash:
+                self.stats['unchanged'] += 1
+                return
+        if fingerprint is None or fingerprint['html_hash'] != html_hash:
+            fingerprint = compute_fingerprint(results, html_content)
+        minhash = fingerprint['minhash']
+        row = (url, html_hash, fingerprint['text_hash'], fingerprint['title_hash'],
+               fingerprint['meta_description_hash'], fingerprint['h1_hash'],
+               minhash.tobytes() if minhash is not None else None,
+               json.dumps(results, ensure_ascii=False), datetime.datetime.now().isoformat(timespec='seconds'))
+        with self._lock:
+            self._buffer[url] = row
+            self._html_hashes[url] = html_hash
+            self.stats['fingerprinted'] += 1
+            if len(self._buffer) >= self.batch_size:
+                self._flush()
+
+    def remove(self, url: str):
+        """Elimina la huella de una URL que ya no se puede auditar (error)."""
+        with self._lock:
+            self._buffer.pop(url, None)
+            self._computed.pop(url, None)
+            self.reused_urls.discard(url)
+            if self._html_hashes.pop(url, None) is not None:
+                with self.conn:
+                    self.conn.execute("DELETE FROM fingerprints WHERE url = ?", (url,))
+                self.stats['removed'] += 1
+
+    def flush(self):
+        """Escribe en bloque las huellas acumuladas."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                  list(self._buffer.values()))
+        self._buffer = {}
+
+    def find_duplicates(self, threshold: float = DEFAULT_NEAR_DUP_THRESHOLD) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Grupos de duplicados entre todas las huellas guardadas, por tipo:
+        'title', 'meta_description', 'h1' y 'contenido' (idénticos: {'urls', 'valor'}) y
+        'casi_duplicados' (contenido casi idéntico: {'urls', 'similitud'}). Cada grupo
+        tiene al menos dos URLs; los grupos más grandes van primero.
+        """
+        import numpy as np
+        self.flush()
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT url, text_hash, title_hash, meta_description_hash, h1_hash, minhash, results "
+                "FROM fingerprints ORDER BY url").fetchall()
+
+        report: Dict[str, List[Dict[str, Any]]] = {}
+        columns = {'contenido': 1, 'title': 2, 'meta_description': 3, 'h1': 4}
+        for kind, column in columns.items():
+            groups: Dict[str, List[int]] = {}
+            for index, row in enumerate(rows):
+                if row[column] is not None:
+                    groups.setdefault(row[column], []).append(index)
+            clusters = []
+            for members in groups.values():
+                if len(members) < 2:
+                    continue
+                value = None
+                if kind != 'contenido':
+                    value = json.loads(rows[members[0]][6])[kind]
+                    value = '\n'.join(value) if isinstance(value, list) else value
+                clusters.append({'urls': [rows[index][0] for index in members], 'valor': value})
+            report[kind] = sorted(clusters, key=lambda cluster: -len(cluster['urls']))
+
+        with_signature = [index for index, row in enumerate(rows) if row[5] is not None]
+        signatures = [np.frombuffer(rows[index][5], dtype=np.uint32) for index in with_signature]
+        near = []
+        for members, similarity in find_near_duplicates(signatures, threshold):
+            indices = [with_signature[member] for member in members]
+            # Los grupos de contenido idéntico ya aparecen en 'contenido'
+            if len({rows[index][1] for index in indices}) > 1:
+                near.append({'urls': [rows[index][0] for index in indices], 'similitud': similarity})
+        report['casi_duplicados'] = sorted(near, key=lambda cluster: -len(cluster['urls']))
+        report['paginas'] = len(rows)
+        return report
+
+    def close(self):
+        """Escribe lo pendiente y cierra la conexión."""
+        self.flush()
+        self.conn.close()
+
+    def summary(self) -> str:
+        """Resumen de la ejecución para mostrar al final."""
+        stats = self.stats
+        return (f"🧬 Huellas: {stats['fingerprinted']} páginas nuevas o modificadas | {stats['unchanged']} sin cambios "
+                f"({stats['reused']} sin volver a parsear) | {stats['removed']} eliminadas por error | "
+                f"{len(self._html_hashes)} páginas en {self.db_path}")
+
+
+def format_duplicates_report(report: Dict[str, Any]) -> str:
+    """Informe de texto con los grupos de duplicados de find_duplicates."""
+    titles = {
+        'title': 'TITLE DUPLICADO',
+        'meta_description': 'META DESCRIPTION DUPLICADA',
+        'h1': 'H1 DUPLICADO',
+        'contenido': 'CONTENIDO IDÉNTICO',
+        'casi_duplicados': 'CONTENIDO CASI IDÉNTICO',
+    }
+    lines = [f"--- Duplicados entre {report['paginas']} páginas auditadas ---"]
+    for kind, title in titles.items():
+        clusters = report[kind]
+        lines.append(f"\n## {title}: {len(clusters)} grupos, "
+                     f"{sum(len(cluster['urls']) for cluster in clusters)} páginas")
+        for cluster in clusters:
+            if kind == 'casi_duplicados':
+                lines.append(f"\n  [{len(cluster['urls'])} páginas, similitud ≥ {cluster['similitud']:.2f}]")
+            elif cluster['valor'] is not None:
+                lines.append(f"\n  [{len(cluster['urls'])} páginas] {cluster['valor']!r}")
+            else:
+                lines.append(f"\n  [{len(cluster['urls'])} páginas]")
+            lines.extend(f"    - {url}" for url in cluster['urls'])
+    return '\n'.join(lines)
@@ -0,0 +1,220 @@
+import gzip
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from typing import Any, BinaryIO, Dict, Optional, TextIO
+from urllib.parse import urlparse
+
+try:
+    import zstandard
+except ImportError:  # Dependencia opcional: sin ella se usa gzip
+    zstandard = None
+
+# --- CONFIGURACIÓN DEL ALMACENAMIENTO ---
+STORAGE_MANIFEST_FILE = '.storage_manifest.jsonl'  # Registro URL -> archivos guardados
+COMPRESS_MIN_BYTES = 16 * 1024    # Los contenidos más pequeños se guardan sin comprimir
+DEFAULT_COMPRESSION = 'gzip'      # 'gzip', 'zstd' (requiere zstandard) o 'none'
+MANIFEST_COMPACT_MIN_LINES = 10000  # Líneas a partir de las que se compacta el manifiesto
+URL_HASH_LENGTH = 16              # Caracteres del hash de la URL en el nombre del archivo
+COMPRESSION_EXTENSIONS = {'gzip': '.gz', 'zstd': '.zst'}
+STORED_EXTENSIONS = ('.txt', '.html')
+# ----------------------------------------
+
+
+def get_url_hash(url: str) -> str:
+    """Hash SHA-256 (hex) de la URL: identifica sus archivos y su subdirectorio."""
+    return hashlib.sha256(url.replace('\x00', '').encode('utf-8')).hexdigest()
+
+
+def get_filename_base(url: str) -> str:
+    """
+    Genera un nombre de archivo seguro y ÚNICO por URL: el dominio (legible) seguido
+    de un hash de la URL completa, para que las páginas de un mismo host no se pisen.
+    Ejemplo: dominio_com_3fa1b2c4d5e6f708
+    """
+    safe_url = url.replace('\x00', '')
+    parsed_url = urlparse(safe_url)
+
+    # Usamos el netloc (hostname)
+    filename_base = parsed_url.netloc.split(':')[0]
+
+    if not filename_base:
+        # Si no hay host (ej: solo ruta), usamos una versión limpia de la ruta.
+        path_part = parsed_url.path.strip('/').replace('/', '_')
+        filename_base = path_part if path_part else "analisis_web"
+
+    # Saneamiento final
+    filename_base = filename_base.replace('.', '_').replace('-', '_')
+    return f"{filename_base}_{get_url_hash(safe_url)[:URL_HASH_LENGTH]}"
+
+
+def get_storage_path(folder: str, url: str, extension: str, compression: Optional[str] = None) -> str:
+    """
+    Ruta de un archivo de la URL, repartida en subdirectorios por los dos primeros
+    caracteres del hash para no acumular cientos de miles de archivos en una carpeta:
+        <carpeta>/<xx>/<dominio>_<hash><extensión>[.gz|.zst]
+    """
+    filename = get_filename_base(url) + extension + COMPRESSION_EXTENSIONS.get(compression, '')
+    return os.path.join(folder, get_url_hash(url)[:2], filename)
+
+
+def is_stored_file(filename: str) -> bool:
+    """True si el archivo es un informe/HTML guardado (comprimido o no)."""
+    for suffix in COMPRESSION_EXTENSIONS.values():
+        if filename.endswith(suffix):
+            filename = filename[:-len(suffix)]
+            break
+    return filename.endswith(STORED_EXTENSIONS)
+
+
+def is_shard_folder(name: str) -> bool:
+    """True si el nombre corresponde a un subdirectorio de reparto (dos caracteres hex)."""
+    return len(name) == 2 and all(c in '0123456789abcdef' for c in name)
+
+
+def open_stored_file(path: str) -> BinaryIO:
+    """Abre un archivo guardado en modo binario, descomprimiéndolo según su extensión."""
+    if path.endswith(COMPRESSION_EXTENSIONS['gzip']):
+        return gzip.open(path, 'rb')
+    if path.endswith(COMPRESSION_EXTENSIONS['zstd']):
+        if zstandard is None:
+            raise OSError("se necesita el paquete 'zstandard' para leer archivos .zst")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    return open(path, 'rb')
+
+
+def open_stored_text(path: str, encoding: str, errors: str = 'strict') -> TextIO:
+    """Abre un archivo guardado en modo texto (mismo resultado que open(path, 'r'))."""
+    return io.TextIOWrapper(open_stored_file(path), encoding=encoding, errors=errors)
+
+
+def is_compressed_file(path: str) -> bool:
+    return path.endswith(tuple(COMPRESSION_EXTENSIONS.values()))
+
+
+def compress_bytes(data: bytes, compression: Optional[str]) -> bytes:
+    if compression == 'gzip':
+        # mtime=0: mismo contenido -> mismos bytes (no invalida el manifiesto incremental)
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    if compression == 'zstd':
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return data
+
+
+class ReportStorage:
+    """
+    Almacén de los informes TXT y del HTML completo de cada URL.
+
+    - Cada URL tiene sus propios archivos (nombre con hash de la URL), repartidos en
+      subdirectorios (ver get_storage_path).
+    - Los contenidos de `compress_min_bytes` o más se guardan comprimidos (gzip o zstd).
+    - Cada escritura se añade al manifiesto `.storage_manifest.jsonl` (una línea JSON
+      por archivo guardado: URL, ruta, tamaños y fecha). La última línea de cada URL y
+      extensión es la vigente; si la ruta cambia (p. ej. otra compresión) el archivo
+      anterior se elimina. Al cargarlo, si acumula más del doble de líneas que
+      archivos vigentes, se reescribe solo con las vigentes.
+
+    Las escrituras son atómicas (temporal + reemplazo) y seguras entre hilos.
+    """
+
+    def __init__(self, manifest_path: str = STORAGE_MANIFEST_FILE,
+                 compression: str = DEFAULT_COMPRESSION,
+                 compress_min_bytes: int = COMPRESS_MIN_BYTES):
+        if compression == 'zstd' and zstandard is None:
+            print("⚠️ Advertencia: El paquete 'zstandard' no está instalado. Se usará compresión gzip.")
+            compression = 'gzip'
+        self.manifest_path = manifest_path
+        self.compression = compression if compression in COMPRESSION_EXTENSIONS else None
+        self.compress_min_bytes = compress_min_bytes
+        self._lock = threading.Lock()
+        # URL -> {extensión: registro vigente del manifiesto}
+        self.files: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._load_manifest()
+
+    def _load_manifest(self):
+        lines = 0
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Línea incompleta (p. ej. ejecución interrumpida)
+                    self.files.setdefault(record['url'], {})[record['extension']] = record
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            print(f"⚠️ Advertencia: No se pudo leer el manifiesto de almacenamiento '{self.manifest_path}': {e}")
+            return
+
+        # Tras muchas re-auditorías, reescribir solo las líneas vigentes
+        current = sum(len(by_extension) for by_extension in self.files.values())
+        if lines > MANIFEST_COMPACT_MIN_LINES and lines > 2 * current:
+            self._compact()
+
+    def _compact(self):
+        tmp_path = self.manifest_path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for by_extension in self.files.values():
+                    for record in by_extension.values():
+                        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            os.replace(tmp_path, self.manifest_path)
+        except OSError as e:
+            print(f"⚠️ Advertencia: No se pudo compactar el manifiesto de almacenamiento: {e}")
+
+    def save(self, folder: str, url: str, extension: str, content: str) -> str:
+        """
+        Guarda `content` como el archivo `extension` ('.txt' o '.html') de la URL
+        dentro de `folder` y devuelve su ruta.
+        """
+        data = content.encode('utf-8')
+        compression = self.compression if len(data) >= self.compress_min_bytes else None
+        path = get_storage_path(folder, url, extension, compression)
+        stored = compress_bytes(data, compression)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(stored)
+        os.replace(tmp_path, path)
+
+        record = {'url': url, 'extension': extension, 'path': path, 'bytes': len(data),
+                  'stored_bytes': len(stored), 'compression': compression or 'none', 'saved_at': time.time()}
+        with self._lock:
+            previous = self.files.setdefault(url, {}).get(extension)
+            if previous and previous['path'] != path:
+                try:
+                    os.remove(previous['path'])
+                except OSError:
+                    pass
+            self.files[url][extension] = record
+            with open(self.manifest_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        return path
+
+    def get_path(self, url: str, extension: str) -> Optional[str]:
+        """Ruta vigente del archivo `extension` de la URL (None si no se ha guardado)."""
+        record = self.files.get(url, {}).get(extension)
+        return record['path'] if record else None
+
+    def read(self, url: str, extension: str) -> Optional[str]:
+        """Contenido guardado de la URL (descomprimido), o None si no existe."""
+        path = self.get_path(url, extension)
+        if path is None:
+            return None
+        try:
+            with open_stored_file(path) as f:
+                return f.read().decode('utf-8')
+        except OSError:
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Totales del manifiesto: URLs, archivos vigentes y tamaño en disco."""
+        paths = [record['path'] for by_extension in self.files.values() for record in by_extension.values()]
+        disk_bytes = sum(os.path.getsize(path) for path in paths if os.path.exists(path))
+        return {'urls': len(self.files), 'files': len(paths), 'disk_bytes': disk_bytes}
@@ -0,0 +1,142 @@
+import datetime
+import json
+import sqlite3
+from typing import Any, Dict, List, Optional
+
+# --- CONFIGURACIÓN DEL ALMACÉN DE RESULTADOS ---
+RESULTS_DB_FILE = 'seo_results.sqlite'   # Resultados estructurados de todas las ejecuciones
+DEFAULT_BATCH_SIZE = 500                 # Filas acumuladas antes de cada escritura en bloque
+JSON_COLUMNS = ('h1', 'h2', 'h3', 'otras_meta')
+# -----------------------------------------------
+
+
+class ResultsStore:
+    """
+    Almacén estructurado (SQLite) de los diccionarios de extract_seo_data: una fila
+    por URL y ejecución, con las mismas claves que new_seo_results.
+
+    - Cada instancia abre una ejecución nueva en la tabla `runs` (run_id, fechas,
+      descripción).
+    - `add()` acumula los resultados en memoria y los escribe en bloque
+      (executemany en una sola transacción) cada `batch_size` filas y al cerrar.
+    - Los encabezados y `otras_meta` se guardan como JSON; además se guardan los
+      recuentos de H1/H2/H3 para poder filtrarlos en SQL.
+
+    Se usa desde un solo hilo (el que imprime y guarda los informes). Para analizar
+    los resultados, ver load_results_dataframe.
+    """
+
+    def __init__(self, db_path: str = RESULTS_DB_FILE, batch_size: int = DEFAULT_BATCH_SIZE,
+                 description: str = ''):
+        self.db_path = db_path
+        self.batch_size = max(1, batch_size)
+        self.conn = sqlite3.connect(db_path)
+        self._buffer: List[tuple] = []
+        self.rows_written = 0
+        self._create_schema()
+        with self.conn:
+            self.run_id = self.conn.execute(
+                "INSERT INTO runs (started_at, description) VALUES (?, ?)",
+                (datetime.datetime.now().isoformat(timespec='seconds'), description)).lastrowid
+
+    def _create_schema(self):
+        with self.conn:
+            self.conn.executescript("""
+                PRAGMA journal_mode = WAL;
+                CREATE TABLE IF NOT EXISTS runs (
+                    run_id INTEGER PRIMARY KEY,
+                    started_at TEXT NOT NULL,
+                    finished_at TEXT,
+                    description TEXT
+                );
+                CREATE TABLE IF NOT EXISTS results (
+                    run_id INTEGER NOT NULL,
+                    url TEXT NOT NULL,
+                    title TEXT,
+                    meta_description TEXT,
+                    meta_keywords TEXT,
+                    canonical TEXT,
+                    h1 TEXT,
+                    h2 TEXT,
+                    h3 TEXT,
+                    h1_count INTEGER,
+                    h2_count INTEGER,
+                    h3_count INTEGER,
+                    otras_meta TEXT,
+                    error TEXT,
+                    audited_at TEXT NOT NULL,
+                    PRIMARY KEY (run_id, url)
+                );
+                CREATE INDEX IF NOT EXISTS results_url ON results (url);
+            """)
+
+    def add(self, results: Dict[str, Any]):
+        """Añade los resultados de una URL (se escriben en el siguiente bloque)."""
+        self._buffer.append((
+            self.run_id, results['url_analizada'], results['title'], results['meta_description'],
+            results['meta_keywords'], results['canonical'],
+            json.dumps(results['h1'], ensure_ascii=False), json.dumps(results['h2'], ensure_ascii=False),
+            json.dumps(results['h3'], ensure_ascii=False),
+            len(results['h1']), len(results['h2']), len(results['h3']),
+            json.dumps(results['otras_meta'], ensure_ascii=False), results['error'],
+            datetime.datetime.now().isoformat(timespec='seconds'),
+        ))
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Escribe en bloque los resultados acumulados."""
+        if not self._buffer:
+            return
+        with self.conn:
+            # Una URL repetida en la misma ejecución conserva su último resultado
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", self._buffer)
+        self.rows_written += len(self._buffer)
+        self._buffer = []
+
+    def close(self):
+        """Escribe lo pendiente, cierra la ejecución y la conexión."""
+        self.flush()
+        with self.conn:
+            self.conn.execute("UPDATE runs SET finished_at = ? WHERE run_id = ?",
+                              (datetime.datetime.now().isoformat(timespec='seconds'), self.run_id))
+        self.conn.close()
+
+    def __enter__(self) -> 'ResultsStore':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def load_results_dataframe(db_path: str = RESULTS_DB_FILE, run_id: Optional[int] = None,
+                           latest_run: bool = False, decode_json: bool = True):
+    """
+    Carga los resultados en un DataFrame de pandas con una sola consulta.
+
+    Args:
+        run_id: Solo esa ejecución (None = todas).
+        latest_run: Solo la última ejecución (tiene prioridad sobre `run_id`).
+        decode_json: Convierte h1/h2/h3/otras_meta de JSON a listas/diccionarios.
+    """
+    import pandas as pd  # Solo se necesita al analizar los resultados
+
+    query = "SELECT r.*, runs.started_at FROM results r JOIN runs USING (run_id)"
+    params: tuple = ()
+    if latest_run:
+        query += " WHERE run_id = (SELECT MAX(run_id) FROM runs)"
+    elif run_id is not None:
+        query += " WHERE run_id = ?"
+        params = (run_id,)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        df = pd.read_sql_query(query + " ORDER BY run_id, url", conn, params=params)
+    finally:
+        conn.close()
+
+    if decode_json:
+        for column in JSON_COLUMNS:
+            df[column] = df[column].map(json.loads)
+    return df
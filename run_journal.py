@@ -0,0 +1,116 @@
+import datetime
+import sqlite3
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+# --- CONFIGURACIÓN DEL DIARIO DE EJECUCIÓN ---
+RUN_JOURNAL_FILE = 'seo_run_journal.sqlite'   # Estado de cada URL de la última ejecución
+DEFAULT_CHECKPOINT_EVERY = 50                 # URLs terminadas entre dos puntos de control
+SQLITE_BUSY_TIMEOUT = 30.0                    # Segundos de espera si otro proceso escribe
+STATUS_OK = 'ok'
+STATUS_ERROR = 'error'
+# ----------------------------------------------
+
+
+class RunJournal:
+    """
+    Diario de ejecución (SQLite) para reanudar auditorías largas: una fila por URL con
+    su estado (`ok` o `error`), el número de intentos y el último error.
+
+    - Sin reanudar, `start()` vacía el diario y la ejecución empieza de cero. Con
+      `resume=True` se conserva y `pending_urls()` descarta las URLs ya completadas:
+      solo se vuelven a procesar las que fallaron y las que no llegaron a terminar.
+    - `record()` acumula los estados en memoria y los escribe en una sola transacción
+      cada `checkpoint_every` URLs (punto de control) y al cerrar. Antes de cada punto
+      de control se llama a `before_checkpoint` (p. ej. ResultsStore.flush), de modo
+      que una URL marcada como completada tiene ya sus resultados escritos. Si la
+      ejecución muere de golpe, como mucho se repiten las últimas `checkpoint_every`.
+    - Es seguro llamar a `record()` desde varios hilos (un lock protege el búfer y la
+      conexión), y varios procesos pueden compartir el archivo (WAL y espera si la base
+      de datos está ocupada).
+    """
+
+    def __init__(self, db_path: str = RUN_JOURNAL_FILE, checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY,
+                 before_checkpoint: Optional[Callable[[], None]] = None):
+        self.db_path = db_path
+        self.checkpoint_every = max(1, checkpoint_every)
+        self.before_checkpoint = before_checkpoint
+        self.conn = sqlite3.connect(db_path, timeout=SQLITE_BUSY_TIMEOUT, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._buffer: Dict[str, tuple] = {}
+        self.stats = {'completed': 0, 'failed': 0, 'skipped': 0, 'checkpoints': 0}
+        with self.conn:
+            self.conn.executescript("""
+                PRAGMA journal_mode = WAL;
+                CREATE TABLE IF NOT EXISTS journal (
+                    url TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL,
+                    error TEXT,
+                    updated_at TEXT NOT NULL
+                );
+            """)
+
+    def start(self, resume: bool = False):
+        """Empieza una ejecución nueva (vacía el diario) o reanuda la anterior."""
+        if not resume:
+            with self._lock, self.conn:
+                self.conn.execute("DELETE FROM journal")
+
+    def completed_urls(self) -> Set[str]:
+        """URLs terminadas sin error según el último punto de control."""
+        with self._lock:
+            return {row[0] for row in self.conn.execute("SELECT url FROM journal WHERE status = ?", (STATUS_OK,))}
+
+    def pending_urls(self, urls: Iterable[str]) -> List[str]:
+        """URLs que faltan por completar, en el orden original (las completadas se omiten)."""
+        completed = self.completed_urls()
+        pending = [url for url in urls if url not in completed]
+        self.stats['skipped'] = len(completed.intersection(urls))
+        return pending
+
+    def record(self, url: str, error: Optional[str] = None):
+        """Registra el final de una URL; se escribe en el siguiente punto de control."""
+        with self._lock:
+            self._buffer[url] = (url, STATUS_ERROR if error else STATUS_OK, error,
+                                 datetime.datetime.now().isoformat(timespec='seconds'))
+            self.stats['failed' if error else 'completed'] += 1
+            if len(self._buffer) >= self.checkpoint_every:
+                self._checkpoint()
+
+    def checkpoint(self):
+        """Escribe los estados acumulados (punto de control)."""
+        with self._lock:
+            self._checkpoint()
+
+    def _checkpoint(self):
+        if not self._buffer:
+            return
+        if self.before_checkpoint is not None:
+            self.before_checkpoint()
+        with self.conn:
+            self.conn.executemany("""
+                INSERT INTO journal (url, status, attempts, error, updated_at) VALUES (?, ?, 1, ?, ?)
+                ON CONFLICT (url) DO UPDATE SET status = excluded.status, attempts = attempts + 1,
+                                                error = excluded.error, updated_at = excluded.updated_at
+            """, list(self._buffer.values()))
+        self._buffer = {}
+        self.stats['checkpoints'] += 1
+
+    def close(self):
+        """Escribe el último punto de control y cierra la conexión."""
+        self.checkpoint()
+        self.conn.close()
+
+    def summary(self) -> str:
+        """Resumen de la ejecución para mostrar al final."""
+        stats = self.stats
+        return (f"📒 Diario de ejecución: {stats['completed']} URLs completadas | {stats['failed']} con error "
+                f"(se reintentarán con --resume) | {stats['skipped']} omitidas por estar ya completadas | "
+                f"{stats['checkpoints']} puntos de control en {self.db_path}")
+
+    def __enter__(self) -> 'RunJournal':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,11 +1,33 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 import sys
 import urllib3
 import os
-from typing import Dict, List, Any, Tuple
+import argparse
+import json
+import threading
+import codecs
+from collections import Counter, OrderedDict, deque
+from functools import partial
+import queue
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List, Any, Tuple, Optional, Iterator, Callable, TextIO
 from urllib.parse import urlparse 
 
+from seo_stream_parser import SEOStreamParser, parse_seo_chunks, iter_string_chunks, STREAM_CHUNK_SIZE
+from http_cache import HTTPCache, CACHE_FOLDER, DEFAULT_CACHE_MAX_MB
+from report_storage import ReportStorage, DEFAULT_COMPRESSION, STORAGE_MANIFEST_FILE
+from results_store import ResultsStore, RESULTS_DB_FILE, DEFAULT_BATCH_SIZE
+from run_journal import RunJournal, RUN_JOURNAL_FILE, DEFAULT_CHECKPOINT_EVERY
+from page_fingerprints import (FingerprintStore, compute_fingerprint, format_duplicates_report, FINGERPRINTS_DB_FILE,
+                               DEFAULT_NEAR_DUP_THRESHOLD)
+from crawler import crawl_site, RobotsPolicy, DEFAULT_MAX_DEPTH, DEFAULT_MAX_PAGES
+from fetch_scheduler import (FetchScheduler, DEFAULT_TIMEOUT, DEFAULT_MAX_RETRIES, DEFAULT_CIRCUIT_THRESHOLD,
+                             CIRCUIT_RESET_SECONDS)
+from download_policy import DownloadPolicy, BodyTooLargeError, DEFAULT_MAX_BODY_MB
+from instrumentation import (timed_stage, record_stage, call_timed, enable_timing, get_active_timer,
+                             start_profiler, stop_profiler)
+
 # Deshabilita la advertencia de petición insegura
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -13,42 +35,26 @@ urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 URL_LIST_FILE = 'urls.txt'
 REPORT_FOLDER = 'reports'  # Directorio para los informes de auditoría TXT
 INDEX_FOLDER = 'index'    # Nuevo directorio para guardar el HTML completo
+DUPLICATES_REPORT_FILE = 'seo_duplicados.txt'  # Grupos de páginas duplicadas (--dedup)
 # ---------------------------------------------
 
-def get_filename_base(url: str) -> str:
-    """
-    Genera un nombre de archivo seguro basado en el dominio de la URL.
-    """
-    safe_url = url.replace('\x00', '')
-    parsed_url = urlparse(safe_url)
-    
-    # Usamos el netloc (hostname)
-    filename_base = parsed_url.netloc.split(':')[0] 
-    
-    if not filename_base:
-        # Si no hay host (ej: solo ruta), usamos una versión limpia de la ruta.
-        path_part = parsed_url.path.strip('/').replace('/', '_')
-        filename_base = path_part if path_part else "analisis_web"
-        
-    # Saneamiento final
-    return filename_base.replace('.', '_').replace('-', '_')
+# --- CONFIGURACIÓN DE CONCURRENCIA ---
+DEFAULT_WORKERS = 1        # 1 = modo secuencial original
+DEFAULT_MAX_PER_HOST = 2   # Conexiones simultáneas máximas contra un mismo host
+DEFAULT_PARSE_WORKERS = 0  # Procesos de parseo (0 = parsear en el mismo hilo que descarga)
+DEFAULT_PIPELINE_QUEUE_SIZE = 64  # Páginas descargadas en espera de parseo (contrapresión)
+# -------------------------------------
 
+REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
 
-def extract_seo_data(url: str) -> Tuple[Dict[str, Any], str]:
+
+def new_seo_results(url: str) -> Dict[str, Any]:
     """
-    Descarga el contenido de la URL y extrae los datos clave de SEO on-page.
-    
-    Args:
-        url: La URL de la página a analizar.
-        
-    Returns:
-        Una tupla: (diccionario de resultados SEO, contenido HTML completo).
+    Crea el diccionario de resultados SEO con sus valores por defecto.
     """
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-
-    results: Dict[str, Any] = {
+    return {
         'url_analizada': url,
         'title': 'No encontrado',
         'meta_description': 'No encontrado',
@@ -60,19 +66,145 @@ def extract_seo_data(url: str) -> Tuple[Dict[str, Any], str]:
         'otras_meta': {},
         'error': None
     }
-    html_content = "" # Inicializar el contenido HTML
 
+
+def describe_general_error(e: Exception) -> str:
+    """
+    Traduce una excepción no HTTP al mensaje de error del diccionario de resultados.
+    """
+    if "Failed to parse" in str(e):
+        return f"Error de formato de URL (posiblemente por codificación incorrecta del archivo urls.txt): {e}"
+    return f"Ocurrió un error general durante el parseo: {e}"
+
+
+def build_request_headers(cache_entry: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+    """
+    Cabeceras de la petición; si hay entrada en caché, se añaden las condicionales.
+    """
+    headers = dict(REQUEST_HEADERS)
+    headers.update(HTTPCache.conditional_headers(cache_entry))
+    return headers
+
+
+def http_get(url: str, session: Optional[requests.Session] = None,
+             cache: Optional[HTTPCache] = None, stream: bool = False,
+             scheduler: Optional[FetchScheduler] = None) -> Tuple[requests.Response, Dict[str, Any]]:
+    """
+    Realiza la petición GET (condicional si hay caché) y devuelve (respuesta, info HTTP).
+
+    `info['cached_results']` contiene el diccionario SEO guardado cuando el servidor
+    respondió 304 Not Modified; en ese caso `info['cached_body']` es el HTML guardado.
+    Con `scheduler` la petición se reintenta y usa tiempos de espera adaptativos por
+    host (ver fetch_scheduler.FetchScheduler); sin él, un solo intento de 15 s.
+    """
+    http_client = session if session is not None else requests
+    info: Dict[str, Any] = {'etag': None, 'last_modified': None, 'cached_results': None, 'cached_body': None}
+
+    def send(headers: Dict[str, str]) -> requests.Response:
+        if scheduler is not None:
+            return scheduler.get(url, http_client, headers=headers, verify=False, stream=stream)
+        return http_client.get(url, headers=headers, verify=False, timeout=DEFAULT_TIMEOUT, stream=stream)
+
+    cache_entry = cache.get(url) if cache is not None else None
+    with timed_stage('http.get', url=url, stream=stream):
+        response = send(build_request_headers(cache_entry))
+    # Hasta recibir las cabeceras (incluye DNS/conexión/TLS si la conexión es nueva)
+    record_stage('http.ttfb', response.elapsed.total_seconds(), url=url, status=response.status_code)
+
+    if response.status_code == 304 and cache_entry is not None:
+        with timed_stage('cache.read', url=url):
+            body = cache.read_body(url)
+        if body is not None:
+            response.close()
+            info['cached_results'] = cache.mark_hit(url, cache_entry, body)
+            info['cached_body'] = body
+            return response, info
+        # La entrada desapareció (expulsada): se repite la petición sin condiciones
+        response.close()
+        response = send(REQUEST_HEADERS)
+
+    if cache is not None:
+        cache.mark_miss()
+    info['etag'] = response.headers.get('ETag')
+    info['last_modified'] = response.headers.get('Last-Modified')
+    return response, info
+
+
+def store_in_cache(cache: Optional[HTTPCache], url: str, http_info: Dict[str, Any],
+                   html_content: str, results: Dict[str, Any],
+                   download_policy: Optional[DownloadPolicy] = None):
+    """
+    Guarda en la caché una respuesta descargada y parseada sin errores (no las cortadas
+    por el modo head-only: un 304 posterior reutilizaría una página incompleta).
+    """
+    if download_policy is not None and download_policy.head_only:
+        return
+    if cache is not None and results.get('error') is None:
+        with timed_stage('cache.store', url=url):
+            cache.store(url, http_info['etag'], http_info['last_modified'], html_content, results)
+
+
+def fetch_html(url: str, session: Optional[requests.Session] = None,
+               cache: Optional[HTTPCache] = None,
+               scheduler: Optional[FetchScheduler] = None,
+               download_policy: Optional[DownloadPolicy] = None) -> Tuple[str, Optional[str], Dict[str, Any]]:
+    """
+    Etapa de descarga: obtiene el HTML de la URL sin parsearlo.
+
+    Con `download_policy` el cuerpo se descarga por fragmentos, tras comprobar el tipo y
+    el tamaño, y con un tamaño máximo (ver download_policy.DownloadPolicy).
+
+    Returns:
+        Una tupla: (contenido HTML completo, mensaje de error o None, info HTTP de http_get).
+    """
+    http_info: Dict[str, Any] = {'etag': None, 'last_modified': None, 'cached_results': None, 'cached_body': None}
     try:
         # 1. Realizar la petición HTTP
-        response = requests.get(url, headers=headers, verify=False, timeout=15)
+        response, http_info = http_get(url, session, cache, stream=download_policy is not None,
+                                       scheduler=scheduler)
+        if http_info['cached_results'] is not None:
+            return http_info['cached_body'], None, http_info
+
+        if download_policy is not None:
+            with response:
+                response.raise_for_status()
+                error = download_policy.check_headers(response)
+                if error is not None:
+                    return "", error, http_info
+                with timed_stage('http.download', url=url):
+                    body = download_policy.read_body(response)
+            # Misma decodificación que response.text con encoding 'utf-8'
+            return str(body, 'utf-8', errors='replace'), None, http_info
+
         response.raise_for_status() 
 
         # --- AJUSTE CLAVE PARA LA CODIFICACIÓN (Solución de Acentos/Ñ) ---
         response.encoding = 'utf-8'
-        html_content = response.text # Guardamos el HTML completo
-        
+        with timed_stage('http.decode', url=url):
+            html_content = response.text
+        return html_content, None, http_info # Guardamos el HTML completo
+
+    except requests.exceptions.RequestException as e:
+        return "", f"Error al descargar la página o tiempo de espera agotado: {e}", http_info
+    except BodyTooLargeError as e:
+        return "", str(e), http_info
+    except Exception as e:
+        return "", describe_general_error(e), http_info
+
+
+def parse_seo_html(url: str, html_content: str) -> Dict[str, Any]:
+    """
+    Etapa de parseo: extrae los datos clave de SEO on-page de un HTML ya descargado.
+
+    Es una función pura a nivel de módulo para poder ejecutarse en un pool de procesos.
+    """
+    # BeautifulSoup solo se importa si se usa (--parser stream y --help arrancan sin él)
+    from bs4 import BeautifulSoup
+
+    results = new_seo_results(url)
+
+    try:
         soup = BeautifulSoup(html_content, 'html.parser')
-        # ------------------------------------------------------------------
 
         # 2. Extracción de <title>
         title_tag = soup.find('title')
@@ -108,16 +240,363 @@ def extract_seo_data(url: str) -> Tuple[Dict[str, Any], str]:
         results['h2'] = extract_headers('h2')
         results['h3'] = extract_headers('h3')
 
+    except Exception as e:
+        results['error'] = describe_general_error(e)
+
+    return results
+
+
+def parse_seo_html_streaming(url: str, html_content: str) -> Dict[str, Any]:
+    """
+    Etapa de parseo alternativa: mismo resultado que parse_seo_html, pero con un parser
+    por eventos que no construye el árbol DOM (ver seo_stream_parser.SEOStreamParser).
+    """
+    results = new_seo_results(url)
+    try:
+        parse_seo_chunks(results, iter_string_chunks(html_content))
+    except Exception as e:
+        results = new_seo_results(url)
+        results['error'] = describe_general_error(e)
+    return results
+
+
+# Backends de parseo disponibles (seleccionables con --parser)
+PARSER_BACKENDS: Dict[str, Callable[[str, str], Dict[str, Any]]] = {
+    'bs4': parse_seo_html,
+    'stream': parse_seo_html_streaming,
+}
+
+
+def fetch_and_parse_streaming(url: str, session: Optional[requests.Session] = None,
+                              cache: Optional[HTTPCache] = None,
+                              scheduler: Optional[FetchScheduler] = None,
+                              download_policy: Optional[DownloadPolicy] = None) -> Tuple[Dict[str, Any], str]:
+    """
+    Descarga la respuesta por fragmentos y la va entregando al parser por eventos,
+    sin esperar a tener el cuerpo completo ni construir el DOM.
+    """
+    results = new_seo_results(url)
+    chunks: List[str] = []
+    parser = SEOStreamParser(results)
+
+    try:
+        # Solo se reintenta hasta recibir las cabeceras: el cuerpo ya se va parseando
+        response, http_info = http_get(url, session, cache, stream=True, scheduler=scheduler)
+        if http_info['cached_results'] is not None:
+            return http_info['cached_results'], http_info['cached_body']
+
+        with response:
+            response.raise_for_status()
+            if download_policy is not None:
+                error = download_policy.check_headers(response)
+                if error is not None:
+                    results['error'] = error
+                    return results, ""
+                blocks = download_policy.iter_body(response, STREAM_CHUNK_SIZE)
+            else:
+                blocks = response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+            # Misma decodificación que iter_content(decode_unicode=True) con encoding 'utf-8'
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+            # Descarga y parseo se solapan: se miden juntos
+            with timed_stage('http.download+parse.stream', url=url):
+                for block in blocks:
+                    chunk = decoder.decode(block)
+                    if chunk:
+                        chunks.append(chunk)
+                        parser.feed(chunk)
+                chunk = decoder.decode(b'', final=True)
+                if chunk:
+                    chunks.append(chunk)
+                    parser.feed(chunk)
+                parser.close()
+        store_in_cache(cache, url, http_info, "".join(chunks), results, download_policy)
+
     except requests.exceptions.RequestException as e:
+        results = new_seo_results(url)
         results['error'] = f"Error al descargar la página o tiempo de espera agotado: {e}"
+        return results, ""
+    except BodyTooLargeError as e:
+        results = new_seo_results(url)
+        results['error'] = str(e)
+        return results, ""
     except Exception as e:
-        if "Failed to parse" in str(e):
-             results['error'] = f"Error de formato de URL (posiblemente por codificación incorrecta del archivo urls.txt): {e}"
-        else:
-             results['error'] = f"Ocurrió un error general durante el parseo: {e}"
+        results = new_seo_results(url)
+        results['error'] = describe_general_error(e)
+
+    return results, "".join(chunks)
 
+
+def extract_seo_data(url: str, session: Optional[requests.Session] = None,
+                     parser_backend: str = 'bs4',
+                     cache: Optional[HTTPCache] = None,
+                     scheduler: Optional[FetchScheduler] = None,
+                     download_policy: Optional[DownloadPolicy] = None,
+                     fingerprints: Optional[FingerprintStore] = None) -> Tuple[Dict[str, Any], str]:
+    """
+    Descarga el contenido de la URL y extrae los datos clave de SEO on-page.
+    
+    Args:
+        url: La URL de la página a analizar.
+        session: Sesión HTTP opcional para reutilizar conexiones (modo concurrente).
+        parser_backend: 'bs4' (BeautifulSoup) o 'stream' (parser por eventos, sin DOM).
+        cache: Caché HTTP opcional; con un 304 se reutilizan el HTML y los resultados guardados.
+        scheduler: Planificador opcional de reintentos y tiempos de espera adaptativos.
+        download_policy: Límites opcionales de la descarga (tipo, tamaño máximo, head-only).
+        fingerprints: Huellas opcionales (--dedup); si el HTML no cambió desde la última
+            auditoría se reutilizan sus resultados sin parsear (solo con 'bs4').
+        
+    Returns:
+        Una tupla: (diccionario de resultados SEO, contenido HTML completo).
+    """
+    if parser_backend == 'stream':
+        results, html_content = fetch_and_parse_streaming(url, session, cache, scheduler, download_policy)
+        precompute_fingerprint(fingerprints, results, html_content)
+        return results, html_content
+
+    html_content, error, http_info = fetch_html(url, session, cache, scheduler, download_policy)
+
+    if error is not None:
+        results = new_seo_results(url)
+        results['error'] = error
+        return results, html_content
+
+    if http_info['cached_results'] is not None:
+        # 304 Not Modified: ni descarga ni parseo
+        precompute_fingerprint(fingerprints, http_info['cached_results'], html_content)
+        return http_info['cached_results'], html_content
+
+    reused_results = fingerprints.reuse_results(url, html_content) if fingerprints is not None else None
+    if reused_results is not None:
+        # HTML idéntico al de la última auditoría: sin parseo
+        store_in_cache(cache, url, http_info, html_content, reused_results, download_policy)
+        return reused_results, html_content
+
+    with timed_stage('parse.bs4', url=url, bytes=len(html_content)):
+        results = parse_seo_html(url, html_content)
+    store_in_cache(cache, url, http_info, html_content, results, download_policy)
+    precompute_fingerprint(fingerprints, results, html_content)
     return results, html_content # Retorna resultados y el HTML
 
+
+def precompute_fingerprint(fingerprints: Optional[FingerprintStore], results: Dict[str, Any], html_content: str):
+    """Calcula la huella (--dedup) en el hilo que descargó y parseó la página, no en el principal."""
+    if fingerprints is not None:
+        with timed_stage('dedup.fingerprint', url=results['url_analizada']):
+            fingerprints.precompute(results, html_content)
+
+
+def parse_with_fingerprint(parse_task: Callable[[str, str], Dict[str, Any]], url: str,
+                           html_content: str) -> Tuple[Dict[str, Any], float, Optional[Dict[str, Any]], float]:
+    """
+    Parseo y huella de una página en un proceso hijo del pipeline (--dedup), para no
+    volver a parsear el HTML en el proceso principal.
+
+    Returns:
+        Una tupla: (resultados SEO, segundos de parseo, huella o None si hubo error,
+        segundos de la huella).
+    """
+    results, parse_seconds = call_timed(parse_task, url, html_content)
+    if results['error']:
+        return results, parse_seconds, None, 0.0
+    fingerprint, fingerprint_seconds = call_timed(compute_fingerprint, results, html_content)
+    return results, parse_seconds, fingerprint, fingerprint_seconds
+
+
+_thread_local = threading.local()
+
+
+def get_thread_session(pool_size: int = DEFAULT_MAX_PER_HOST) -> requests.Session:
+    """
+    Devuelve una sesión HTTP propia del hilo actual, creándola si no existe.
+    Cada hilo reutiliza sus conexiones keep-alive entre peticiones.
+    """
+    session = getattr(_thread_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _thread_local.session = session
+    return session
+
+
+def get_host_key(url: str) -> str:
+    """Clave de agrupación por host para los límites de concurrencia."""
+    return urlparse(url).netloc.lower()
+
+
+def run_per_host_pool(urls: List[str],
+                      task: Callable[[str, requests.Session], Any],
+                      max_workers: int = DEFAULT_WORKERS,
+                      max_per_host: int = DEFAULT_MAX_PER_HOST) -> Iterator[Any]:
+    """
+    Ejecuta `task(url, session)` sobre varias URLs con un pool de hilos acotado.
+
+    - `max_workers` limita las peticiones simultáneas en total.
+    - `max_per_host` limita las peticiones simultáneas contra un mismo host, de modo
+      que un host lento no acapara todos los hilos.
+
+    Produce los resultados de `task` en orden de finalización. Las URLs solo se lanzan
+    a medida que se consumen los resultados, por lo que un consumidor lento frena la descarga.
+    """
+    max_workers = max(1, max_workers)
+    max_per_host = max(1, max_per_host)
+
+    # Colas pendientes por host (en el orden de aparición) y peticiones en curso por host
+    pending_by_host: "OrderedDict[str, deque]" = OrderedDict()
+    for url in urls:
+        pending_by_host.setdefault(get_host_key(url), deque()).append(url)
+    in_flight_by_host: Counter = Counter()
+
+    def run_task(url: str) -> Any:
+        return task(url, get_thread_session(max_per_host))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures: Dict[Any, str] = {}
+
+        def dispatch():
+            """Lanza nuevas peticiones respetando ambos límites (reparto round-robin por host)."""
+            for host in list(pending_by_host):
+                if len(futures) >= max_workers:
+                    break
+                host_queue = pending_by_host[host]
+                while host_queue and in_flight_by_host[host] < max_per_host and len(futures) < max_workers:
+                    futures[executor.submit(run_task, host_queue.popleft())] = host
+                    in_flight_by_host[host] += 1
+                if not host_queue:
+                    del pending_by_host[host]
+
+        dispatch()
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                in_flight_by_host[futures.pop(future)] -= 1
+                yield future.result()
+            dispatch()
+
+
+def extract_seo_data_concurrently(urls: List[str],
+                                  max_workers: int = DEFAULT_WORKERS,
+                                  max_per_host: int = DEFAULT_MAX_PER_HOST,
+                                  parser_backend: str = 'bs4',
+                                  cache: Optional[HTTPCache] = None,
+                                  scheduler: Optional[FetchScheduler] = None,
+                                  download_policy: Optional[DownloadPolicy] = None,
+                                  fingerprints: Optional[FingerprintStore] = None) -> Iterator[Tuple[Dict[str, Any], str]]:
+    """
+    Ejecuta extract_seo_data sobre varias URLs con un pool de hilos acotado
+    (ver run_per_host_pool para el significado de los límites).
+
+    Produce las tuplas (resultados SEO, HTML) en orden de finalización; cada tupla es
+    idéntica a la que devolvería extract_seo_data en modo secuencial.
+    """
+    task = partial(extract_seo_data, parser_backend=parser_backend, cache=cache, scheduler=scheduler,
+                   download_policy=download_policy, fingerprints=fingerprints)
+    return run_per_host_pool(urls, task, max_workers, max_per_host)
+
+
+def run_seo_pipeline(urls: List[str],
+                     fetch_workers: int = DEFAULT_WORKERS,
+                     parse_workers: int = DEFAULT_PARSE_WORKERS,
+                     max_per_host: int = DEFAULT_MAX_PER_HOST,
+                     queue_size: int = DEFAULT_PIPELINE_QUEUE_SIZE,
+                     parser_backend: str = 'bs4',
+                     cache: Optional[HTTPCache] = None,
+                     scheduler: Optional[FetchScheduler] = None,
+                     download_policy: Optional[DownloadPolicy] = None,
+                     fingerprints: Optional[FingerprintStore] = None) -> Iterator[Tuple[Dict[str, Any], str]]:
+    """
+    Pipeline de dos etapas: descarga en un pool de hilos y parseo en un pool de procesos.
+
+    El parseo con BeautifulSoup es CPU intensivo y retiene el GIL, por lo que se reparte
+    entre varios procesos. Entre ambas etapas hay una cola acotada (`queue_size`): si el
+    parseo se retrasa, la cola se llena y la descarga se detiene, manteniendo la memoria
+    estable. Produce las mismas tuplas (resultados SEO, HTML) que extract_seo_data,
+    en orden de finalización. Las páginas sin cambios según `fingerprints` no se
+    envían a parsear.
+    """
+    # El pool de procesos (multiprocessing) solo se importa en este modo
+    from concurrent.futures import ProcessPoolExecutor
+
+    fetched: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+    end_of_stream = object()
+    parse_task = PARSER_BACKENDS[parser_backend]
+
+    def fetch_task(url: str, session: requests.Session) -> Tuple[str, str, Optional[str], Dict[str, Any]]:
+        html_content, error, http_info = fetch_html(url, session, cache, scheduler, download_policy)
+        if error is None and http_info['cached_results'] is not None:
+            precompute_fingerprint(fingerprints, http_info['cached_results'], html_content)
+        return url, html_content, error, http_info
+
+    def fetch_stage():
+        try:
+            for item in run_per_host_pool(urls, fetch_task, fetch_workers, max_per_host):
+                fetched.put(item)
+        finally:
+            fetched.put(end_of_stream)
+
+    fetch_thread = threading.Thread(target=fetch_stage, daemon=True)
+    fetch_thread.start()
+
+    max_parse_in_flight = max(1, parse_workers) * 2
+    with ProcessPoolExecutor(max_workers=max(1, parse_workers)) as executor:
+        parse_futures: Dict[Any, Tuple[str, str, Dict[str, Any]]] = {}
+        fetching = True
+
+        while fetching or parse_futures:
+            # 1. Alimentar la etapa de parseo mientras tenga capacidad
+            while fetching and len(parse_futures) < max_parse_in_flight:
+                try:
+                    # Si hay parseos en curso no bloqueamos: hay que recoger sus resultados
+                    item = fetched.get(timeout=0.05) if parse_futures else fetched.get()
+                except queue.Empty:
+                    break
+                if item is end_of_stream:
+                    fetching = False
+                    break
+
+                url, html_content, error, http_info = item
+                reused_results = None
+                if error is None and http_info['cached_results'] is None and fingerprints is not None:
+                    reused_results = fingerprints.reuse_results(url, html_content)
+                if error is not None:
+                    results = new_seo_results(url)
+                    results['error'] = error
+                    yield results, html_content
+                elif http_info['cached_results'] is not None:
+                    yield http_info['cached_results'], html_content
+                elif reused_results is not None:
+                    store_in_cache(cache, url, http_info, html_content, reused_results, download_policy)
+                    yield reused_results, html_content
+                elif fingerprints is not None:
+                    # El proceso hijo calcula también la huella (ver parse_with_fingerprint)
+                    future = executor.submit(parse_with_fingerprint, parse_task, url, html_content)
+                    parse_futures[future] = (url, html_content, http_info)
+                else:
+                    # El proceso hijo devuelve también su tiempo de parseo (ver call_timed)
+                    future = executor.submit(call_timed, parse_task, url, html_content)
+                    parse_futures[future] = (url, html_content, http_info)
+
+            # 2. Recoger los parseos terminados
+            if parse_futures:
+                done, _ = wait(parse_futures, timeout=None if not fetching else 0.05,
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    url, html_content, http_info = parse_futures.pop(future)
+                    if fingerprints is not None:
+                        results, parse_seconds, fingerprint, fingerprint_seconds = future.result()
+                        if fingerprint is not None:
+                            record_stage('dedup.fingerprint', fingerprint_seconds, url=url)
+                            fingerprints.attach(fingerprint)
+                    else:
+                        results, parse_seconds = future.result()
+                    record_stage(f'parse.{parser_backend}', parse_seconds, url=url, bytes=len(html_content))
+                    store_in_cache(cache, url, http_info, html_content, results, download_policy)
+                    yield results, html_content
+
+    fetch_thread.join()
+
+
 def format_seo_report(results: Dict[str, Any]) -> str:
     """
     Formatea los resultados de la auditoría SEO en una cadena de texto para consola y archivo.
@@ -168,30 +647,42 @@ def format_seo_report(results: Dict[str, Any]) -> str:
     
     return "\n".join(report_lines)
 
-def save_full_html(url: str, html_content: str):
+_default_storage: Optional[ReportStorage] = None
+
+
+def get_default_storage() -> ReportStorage:
+    """Almacén de informes con la configuración por defecto (se crea al primer uso)."""
+    global _default_storage
+    if _default_storage is None:
+        _default_storage = ReportStorage()
+    return _default_storage
+
+
+def ensure_output_folder(folder: str):
+    """Crea el directorio de salida si no existe."""
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+        print(f"📁 Subdirectorio '{folder}' creado.")
+
+
+def save_full_html(url: str, html_content: str, storage: Optional[ReportStorage] = None):
     """
-    Guarda el contenido HTML completo en un archivo dentro del directorio 'index'.
+    Guarda el contenido HTML completo en un archivo propio de la URL dentro del
+    directorio 'index' (ver report_storage: subdirectorios por hash y compresión).
     """
     if not html_content:
         # No guardamos si el contenido está vacío (generalmente por un error de conexión)
         return 
 
     try:
-        filename_base = get_filename_base(url)
-        filename = f"{filename_base}.html" 
-        
-        # 1. Asegurarse de que el directorio 'index' exista
-        if not os.path.exists(INDEX_FOLDER):
-            os.makedirs(INDEX_FOLDER)
-            print(f"📁 Subdirectorio '{INDEX_FOLDER}' creado.")
-
-        # 2. Construir la ruta completa al archivo de salida
-        full_output_path = os.path.join(INDEX_FOLDER, filename)
+        storage = storage if storage is not None else get_default_storage()
 
+        # 1. Asegurarse de que el directorio 'index' exista
+        ensure_output_folder(INDEX_FOLDER)
 
-        # Guardar el HTML
-        with open(full_output_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        # 2. Guardar el HTML (ruta única por URL, comprimido si es grande)
+        with timed_stage('save.html', url=url, bytes=len(html_content)):
+            full_output_path = storage.save(INDEX_FOLDER, url, '.html', html_content)
             
         print(f"✅ HTML completo guardado en: {os.path.abspath(full_output_path)}")
         
@@ -199,32 +690,29 @@ def save_full_html(url: str, html_content: str):
         print(f"\n❌ Error al guardar el archivo HTML: {e}", file=sys.stderr)
 
 
-def print_and_save_seo_report(results: Dict[str, Any], html_content: str):
+def print_and_save_seo_report(results: Dict[str, Any], html_content: str,
+                              storage: Optional[ReportStorage] = None, save: bool = True):
     """
     Imprime los resultados de la auditoría SEO en la consola, guarda el informe TXT 
-    y luego llama a la función para guardar el HTML.
+    y luego llama a la función para guardar el HTML (con save=False solo se imprime:
+    la página no cambió y sus archivos ya están guardados).
     """
     report = format_seo_report(results)
     print(report)
+    if not save:
+        print("\n♻️ Sin cambios desde la última auditoría: se conservan el informe TXT y el HTML guardados.")
+        return
+    storage = storage if storage is not None else get_default_storage()
     
     # Lógica de guardado del informe TXT
     if not results.get('error'): # Solo guardar TXT si no hubo error de conexión
         try:
-            filename_base = get_filename_base(results['url_analizada'])
-            filename = f"{filename_base}.txt" 
-            
             # 1. Asegurarse de que el directorio 'reports' exista
-            if not os.path.exists(REPORT_FOLDER):
-                os.makedirs(REPORT_FOLDER)
-                print(f"📁 Subdirectorio '{REPORT_FOLDER}' creado.")
-
-            # 2. Construir la ruta completa al archivo de salida
-            full_output_path = os.path.join(REPORT_FOLDER, filename)
+            ensure_output_folder(REPORT_FOLDER)
 
-
-            # Guardar el informe TXT
-            with open(full_output_path, 'w', encoding='utf-8') as f:
-                f.write(report)
+            # 2. Guardar el informe TXT (ruta única por URL)
+            with timed_stage('save.report', url=results['url_analizada']):
+                full_output_path = storage.save(REPORT_FOLDER, results['url_analizada'], '.txt', report)
                 
             print(f"\n✅ Informe TXT guardado con éxito en: {os.path.abspath(full_output_path)}")
             
@@ -232,10 +720,10 @@ def print_and_save_seo_report(results: Dict[str, Any], html_content: str):
             print(f"\n❌ Error al guardar el archivo de informe TXT: {e}", file=sys.stderr)
 
     # Lógica de guardado del HTML completo
-    save_full_html(results['url_analizada'], html_content)
+    save_full_html(results['url_analizada'], html_content, storage)
 
 
-def get_urls_to_analyze(default_url: str) -> List[str]:
+def get_urls_to_analyze(default_url: str, url_argument: Optional[str] = None) -> List[str]:
     """
     Determina la lista de URLs a analizar, priorizando argumentos de línea de comandos,
     luego el archivo de lista, y finalmente la URL por defecto.
@@ -243,9 +731,8 @@ def get_urls_to_analyze(default_url: str) -> List[str]:
     urls_list = []
     
     # 1. Chequea si hay un argumento en línea de comandos (una sola URL)
-    if len(sys.argv) > 1:
-        url_argument = sys.argv[1].replace('\x00', '')
-        urls_list.append(url_argument)
+    if url_argument:
+        urls_list.append(url_argument.replace('\x00', ''))
         return urls_list
 
     # 2. Chequea si existe el archivo de lista de URLs
@@ -283,25 +770,265 @@ def get_urls_to_analyze(default_url: str) -> List[str]:
     return [default_url]
 
 
+def normalize_url(url: str) -> str:
+    """Asegura que la URL comience con http:// o https:// para que la petición sea válida."""
+    return url if url.startswith(('http://', 'https://')) else 'https://' + url
+
+
+def iter_stdin_jobs(stream: TextIO) -> Iterator[str]:
+    """
+    Modo --serve: produce las URLs de `stream` (una por línea; las vacías y las que
+    empiezan por # se ignoran) a medida que llegan, sin esperar al final de la entrada.
+    """
+    for line in iter(stream.readline, ''):
+        url = line.strip().replace('\x00', '')
+        if url and not url.startswith('#'):
+            yield normalize_url(url)
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Define y procesa los argumentos de línea de comandos."""
+    parser = argparse.ArgumentParser(description="Auditoría SEO On-Page de una URL o de la lista de urls.txt.")
+    parser.add_argument('url', nargs='?', default=None,
+                        help=f"URL a analizar. Si se omite, se usa el archivo {URL_LIST_FILE}.")
+    parser.add_argument('--serve', action='store_true',
+                        help="Proceso de larga duración: lee URLs de la entrada estándar (una por línea), audita cada "
+                             "una al llegar y responde con una línea JSON por URL en la salida estándar.")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help="Peticiones simultáneas en total (1 = modo secuencial).")
+    parser.add_argument('--max-per-host', type=int, default=DEFAULT_MAX_PER_HOST,
+                        help="Peticiones simultáneas máximas contra un mismo host.")
+    parser.add_argument('--parse-workers', type=int, default=DEFAULT_PARSE_WORKERS,
+                        help="Procesos dedicados al parseo HTML (0 = parsear junto con la descarga).")
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_PIPELINE_QUEUE_SIZE,
+                        help="Páginas descargadas en espera de parseo antes de frenar la descarga.")
+    parser.add_argument('--parser', choices=sorted(PARSER_BACKENDS), default='bs4',
+                        help="Backend de extracción: 'bs4' (BeautifulSoup) o 'stream' (por eventos, sin DOM).")
+    parser.add_argument('--cache', action='store_true',
+                        help="Activa la caché HTTP con peticiones condicionales (ETag/Last-Modified).")
+    parser.add_argument('--cache-dir', default=CACHE_FOLDER, help="Directorio de la caché HTTP.")
+    parser.add_argument('--cache-max-mb', type=int, default=DEFAULT_CACHE_MAX_MB,
+                        help="Tamaño máximo de la caché antes de expulsar las entradas menos usadas.")
+    parser.add_argument('--retries', type=int, default=DEFAULT_MAX_RETRIES,
+                        help="Reintentos ante errores de conexión, timeouts y respuestas 429/5xx (0 = un solo intento).")
+    parser.add_argument('--no-adaptive-timeouts', action='store_true',
+                        help=f"Usa siempre el tiempo de espera fijo de {DEFAULT_TIMEOUT:.0f} s en lugar de ajustarlo por host.")
+    parser.add_argument('--circuit-threshold', type=int, default=DEFAULT_CIRCUIT_THRESHOLD,
+                        help="Fallos consecutivos de un host que detienen sus peticiones durante un tiempo (0 = nunca).")
+    parser.add_argument('--circuit-reset', type=float, default=CIRCUIT_RESET_SECONDS,
+                        help="Segundos que un host queda en pausa antes de volver a intentarlo.")
+    parser.add_argument('--max-body-mb', type=float, default=DEFAULT_MAX_BODY_MB,
+                        help="Tamaño máximo del cuerpo de cada página; las mayores se interrumpen y se marcan como error.")
+    parser.add_argument('--any-content-type', action='store_true',
+                        help="Descarga también respuestas que no son texto/HTML (imágenes, PDF, vídeo...).")
+    parser.add_argument('--head-only', action='store_true',
+                        help="Deja de leer cada página tras </head> y el primer </h1> (auditoría de metadatos; H2/H3 parciales).")
+    parser.add_argument('--crawl', action='store_true',
+                        help="Rastrea recursivamente los enlaces internos a partir de las URLs indicadas.")
+    parser.add_argument('--max-depth', type=int, default=DEFAULT_MAX_DEPTH,
+                        help="Profundidad máxima del rastreo (saltos desde las URLs semilla).")
+    parser.add_argument('--max-pages', type=int, default=DEFAULT_MAX_PAGES,
+                        help="Número máximo de páginas a auditar durante el rastreo.")
+    parser.add_argument('--crawl-delay', type=float, default=0.0,
+                        help="Segundos mínimos entre peticiones a un mismo host (se usa el mayor entre este y el de robots.txt).")
+    parser.add_argument('--ignore-robots', action='store_true',
+                        help="No consulta robots.txt durante el rastreo.")
+    parser.add_argument('--compression', choices=['gzip', 'zstd', 'none'], default=DEFAULT_COMPRESSION,
+                        help="Compresión de los HTML grandes guardados en index/ ('zstd' requiere el paquete zstandard).")
+    parser.add_argument('--results-db', default=RESULTS_DB_FILE,
+                        help="Base de datos SQLite con los resultados estructurados (una fila por URL y ejecución).")
+    parser.add_argument('--no-results-db', action='store_true',
+                        help="No guarda los resultados estructurados (solo informes TXT y HTML).")
+    parser.add_argument('--results-batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Resultados acumulados antes de cada escritura en bloque en la base de datos.")
+    parser.add_argument('--resume', action='store_true',
+                        help="Reanuda la ejecución anterior: omite las URLs ya completadas y reintenta las que fallaron.")
+    parser.add_argument('--journal', default=RUN_JOURNAL_FILE,
+                        help="Diario de ejecución (SQLite) con el estado de cada URL, usado por --resume.")
+    parser.add_argument('--no-journal', action='store_true',
+                        help="No lleva diario de ejecución (la ejecución no se podrá reanudar).")
+    parser.add_argument('--checkpoint-every', type=int, default=DEFAULT_CHECKPOINT_EVERY,
+                        help="URLs terminadas entre dos puntos de control del diario.")
+    parser.add_argument('--dedup', action='store_true',
+                        help="Guarda una huella de cada página para detectar title/meta/H1 y contenido duplicados o casi "
+                             "duplicados, y no vuelve a procesar las páginas que no cambiaron desde la última auditoría.")
+    parser.add_argument('--fingerprints-db', default=FINGERPRINTS_DB_FILE,
+                        help="Base de datos SQLite con la última huella de cada URL (--dedup).")
+    parser.add_argument('--near-dup-threshold', type=float, default=DEFAULT_NEAR_DUP_THRESHOLD,
+                        help="Similitud mínima del texto (0-1, Jaccard estimada) para considerar dos páginas casi duplicadas.")
+    parser.add_argument('--storage-manifest', default=STORAGE_MANIFEST_FILE,
+                        help="Manifiesto que relaciona cada URL con sus archivos guardados.")
+    parser.add_argument('--timings', action='store_true',
+                        help="Mide cada etapa (descarga, parseo, guardado...) y muestra p50/p95/p99 al final.")
+    parser.add_argument('--trace', default=None, metavar='ARCHIVO',
+                        help="Guarda cada medición en un archivo JSONL (implica --timings).")
+    parser.add_argument('--profile', default=None, metavar='ARCHIVO',
+                        help="Perfila la ejecución con cProfile y guarda las estadísticas (.prof).")
+    args = parser.parse_args()
+    if args.serve and (args.url or args.crawl):
+        parser.error("--serve lee las URLs de la entrada estándar: no admite una URL como argumento ni --crawl.")
+    return args
+
+
 if __name__ == "__main__":
+    args = parse_arguments()
+    # En modo --serve la salida estándar queda reservada a las respuestas JSON: los
+    # informes legibles y los resúmenes van a stderr
+    job_output = sys.stdout
+    if args.serve:
+        sys.stdout = sys.stderr
+    if args.timings or args.trace:
+        enable_timing(args.trace)
+    profiler = start_profiler(args.profile is not None)
+
     # URL de fallback/ejemplo si no se usa lista ni argumento
     default_url_example = 'https://www.google.com/' 
     
-    # Obtener la lista de URLs a procesar
-    urls_to_process = get_urls_to_analyze(default_url_example)
+    # Obtener la lista de URLs a procesar (en modo --serve llegan por la entrada estándar)
+    urls_to_process = [] if args.serve else get_urls_to_analyze(default_url_example, args.url)
 
-    # Iterar sobre cada URL en la lista
-    for url_to_analyze in urls_to_process:
-        # Aseguramos que la URL comience con http:// o https:// para peticiones válidas
-        if not url_to_analyze.startswith(('http://', 'https://')):
-            url_to_analyze = 'https://' + url_to_analyze
+    # Aseguramos que las URLs comiencen con http:// o https:// para peticiones válidas
+    urls_to_process = [normalize_url(url) for url in urls_to_process]
 
-        # Ejecutar la extracción (ahora devuelve datos SEO Y HTML)
-        seo_data, full_html = extract_seo_data(url_to_analyze)
-        
-        # Imprimir y guardar los resultados (TXT y HTML)
-        print_and_save_seo_report(seo_data, full_html)
-        
-        # Separador para la consola si hay múltiples URLs
-        if len(urls_to_process) > 1:
-            print("\n" + "~" * 60 + "\n")
\ No newline at end of file
+    http_cache = HTTPCache(args.cache_dir, args.cache_max_mb * 1024 * 1024) if args.cache else None
+    report_storage = ReportStorage(args.storage_manifest, args.compression)
+    download_policy = DownloadPolicy(int(args.max_body_mb * 1024 * 1024), check_content_type=not args.any_content_type,
+                                     head_only=args.head_only)
+    if args.head_only and args.crawl:
+        print("⚠️ Con --head-only el rastreo solo descubre los enlaces anteriores al corte de cada página.")
+    fetch_scheduler = FetchScheduler(args.retries, adaptive_timeouts=not args.no_adaptive_timeouts,
+                                     circuit_threshold=args.circuit_threshold, circuit_reset=args.circuit_reset)
+    results_store = None
+    if not args.no_results_db:
+        results_store = ResultsStore(args.results_db, args.results_batch_size, description=' '.join(sys.argv[1:]))
+    run_journal = None
+    if not args.no_journal:
+        # Los resultados se escriben antes de marcar sus URLs como completadas en el diario
+        run_journal = RunJournal(args.journal, args.checkpoint_every,
+                                 before_checkpoint=results_store.flush if results_store is not None else None)
+        run_journal.start(resume=args.resume and not args.crawl and not args.serve)
+        if args.resume and args.crawl:
+            print("⚠️ --resume no se aplica al rastreo (--crawl): las páginas se descubren de nuevo en cada ejecución.")
+        elif args.resume and args.serve:
+            print("⚠️ --resume no se aplica a --serve: se audita cada URL recibida.")
+        elif args.resume:
+            urls_to_process = run_journal.pending_urls(urls_to_process)
+            print(f"⏯️ Reanudando: {run_journal.stats['skipped']} URLs ya completadas, "
+                  f"{len(urls_to_process)} pendientes.")
+    elif args.resume:
+        print("⚠️ --resume no tiene efecto con --no-journal.")
+    fingerprints = None
+    if args.dedup and args.head_only:
+        print("⚠️ --dedup no se aplica con --head-only: las páginas se leen incompletas.")
+    elif args.dedup:
+        fingerprints = FingerprintStore(args.fingerprints_db)
+        if args.parser == 'stream':
+            print("ℹ️ Con --parser stream las páginas sin cambios se parsean igualmente (el parseo va junto a la descarga).")
+
+    # Ejecutar la extracción (devuelve datos SEO Y HTML): servicio, rastreo, pipeline, concurrente o secuencial
+    if args.serve:
+        # Una sola sesión para todos los trabajos: las conexiones keep-alive se reutilizan
+        print("🛎️ Modo servicio: esperando URLs en la entrada estándar (una por línea, Ctrl+D para terminar).")
+        extraction_results = (
+            extract_seo_data(url, session=get_thread_session(), parser_backend=args.parser, cache=http_cache,
+                             scheduler=fetch_scheduler, download_policy=download_policy, fingerprints=fingerprints)
+            for url in iter_stdin_jobs(sys.stdin))
+    elif args.crawl:
+        crawl_session = get_thread_session()
+        robots_policy = RobotsPolicy(REQUEST_HEADERS['User-Agent'], crawl_session,
+                                     args.crawl_delay, respect_robots=not args.ignore_robots,
+                                     scheduler=fetch_scheduler)
+        extraction_results = crawl_site(
+            urls_to_process,
+            partial(extract_seo_data, session=crawl_session, parser_backend=args.parser, cache=http_cache,
+                    scheduler=fetch_scheduler, download_policy=download_policy, fingerprints=fingerprints),
+            robots_policy, args.max_depth, args.max_pages)
+    elif args.parse_workers > 0:
+        extraction_results = run_seo_pipeline(urls_to_process, args.workers, args.parse_workers,
+                                              args.max_per_host, args.queue_size, args.parser, http_cache,
+                                              fetch_scheduler, download_policy, fingerprints)
+    elif args.workers > 1:
+        extraction_results = extract_seo_data_concurrently(urls_to_process, args.workers, args.max_per_host,
+                                                           args.parser, http_cache, fetch_scheduler, download_policy,
+                                                           fingerprints)
+    else:
+        extraction_results = (extract_seo_data(url, parser_backend=args.parser, cache=http_cache,
+                                               scheduler=fetch_scheduler, download_policy=download_policy,
+                                               fingerprints=fingerprints)
+                              for url in urls_to_process)
+
+    # Iterar sobre cada resultado
+    try:
+        for seo_data, full_html in extraction_results:
+            # Imprimir y guardar los resultados (TXT y HTML); si la página no cambió desde la
+            # última auditoría y su informe sigue guardado, no se vuelve a escribir
+            unchanged = (fingerprints is not None and fingerprints.was_reused(seo_data['url_analizada'])
+                         and all(path is not None and os.path.exists(path)
+                                 for path in (report_storage.get_path(seo_data['url_analizada'], '.txt'),
+                                              report_storage.get_path(seo_data['url_analizada'], '.html'))))
+            print_and_save_seo_report(seo_data, full_html, report_storage, save=not unchanged)
+            if fingerprints is not None:
+                # La huella ya viene calculada del hilo o proceso que parseó la página
+                with timed_stage('dedup.add', url=seo_data['url_analizada']):
+                    if seo_data['error']:
+                        fingerprints.remove(seo_data['url_analizada'])
+                    else:
+                        fingerprints.add(seo_data, full_html)
+            if results_store is not None:
+                with timed_stage('results_db.add', url=seo_data['url_analizada']):
+                    results_store.add(seo_data)
+            if run_journal is not None:
+                with timed_stage('journal.record', url=seo_data['url_analizada']):
+                    run_journal.record(seo_data['url_analizada'], seo_data['error'])
+
+            if args.serve:
+                # Cada trabajo queda escrito antes de responder: el proceso puede vivir horas
+                if run_journal is not None:
+                    run_journal.checkpoint()
+                elif results_store is not None:
+                    results_store.flush()
+                job_output.write(json.dumps(seo_data, ensure_ascii=False) + "\n")
+                job_output.flush()
+
+            # Separador para la consola si hay múltiples URLs
+            if args.crawl or args.serve or len(urls_to_process) > 1:
+                print("\n" + "~" * 60 + "\n")
+    finally:
+        # Los resultados acumulados se escriben aunque la ejecución se interrumpa
+        # El último punto de control del diario escribe antes los resultados pendientes
+        if run_journal is not None:
+            run_journal.close()
+        if results_store is not None:
+            results_store.close()
+        if fingerprints is not None:
+            fingerprints.flush()
+
+    # Grupos de duplicados entre todas las páginas con huella (también las de ejecuciones anteriores)
+    if fingerprints is not None:
+        with timed_stage('dedup.clusters'):
+            duplicates = fingerprints.find_duplicates(args.near_dup_threshold)
+        fingerprints.close()
+        duplicates_report = format_duplicates_report(duplicates)
+        with open(DUPLICATES_REPORT_FILE, 'w', encoding='utf-8') as f:
+            f.write(duplicates_report + "\n")
+        print(duplicates_report)
+        print(f"\n✅ Informe de duplicados guardado en: {os.path.abspath(DUPLICATES_REPORT_FILE)}")
+
+    # Resumen de la ejecución
+    if results_store is not None:
+        print(f"🗃️ Resultados estructurados: {results_store.rows_written} filas en "
+              f"{os.path.abspath(args.results_db)} (ejecución {results_store.run_id})")
+    if run_journal is not None:
+        print(run_journal.summary())
+    if http_cache is not None:
+        print(http_cache.summary())
+    print(fetch_scheduler.summary())
+    print(download_policy.summary())
+    if fingerprints is not None:
+        print(fingerprints.summary())
+
+    stop_profiler(profiler, args.profile)
+    stage_timer = get_active_timer()
+    if stage_timer is not None:
+        stage_timer.close()
+        print(stage_timer.summary())
@@ -0,0 +1,175 @@
+from html.parser import HTMLParser
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+# --- CONFIGURACIÓN DEL PARSER EN STREAMING ---
+HEADING_TAGS = ('h1', 'h2', 'h3')
+# Elementos vacíos: se cierran en cuanto se abren (mismo criterio que BeautifulSoup)
+VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link',
+    'menuitem', 'meta', 'param', 'source', 'track', 'wbr', 'basefont', 'bgsound',
+    'command', 'frame', 'image', 'isindex', 'nextid', 'spacer'
+}
+# Su texto NO cuenta en get_text() de BeautifulSoup (Script, Stylesheet, TemplateString...)
+IGNORED_TEXT_CONTAINERS = {'script', 'style', 'template', 'rt', 'rp'}
+STREAM_CHUNK_SIZE = 64 * 1024
+# ---------------------------------------------
+
+
+class SEOStreamParser(HTMLParser):
+    """
+    Extractor SEO basado en eventos (html.parser.HTMLParser) que NO construye el DOM.
+
+    Rellena el diccionario `results` (mismo esquema que seo_auditor.new_seo_results)
+    a medida que recibe fragmentos con feed(). Reproduce la semántica de la extracción
+    con BeautifulSoup ('html.parser'):
+      - title: texto del PRIMER <title> del documento, con get_text(strip=True).
+      - meta: se procesan en orden; las repetidas sobrescriben a las anteriores.
+      - canonical: href del primer <link> cuyo rel contiene 'canonical'.
+      - h1/h2/h3: texto de cada encabezado, incluyendo encabezados anidados.
+      - Las etiquetas de cierre sin apertura se ignoran y las no cerradas se cierran
+        al cerrar su padre, igual que el árbol de BeautifulSoup.
+
+    Diferencia conocida: las entidades se decodifican con html.unescape (HTML5), por lo
+    que una entidad desconocida como '&foo;' se conserva tal cual, mientras que
+    BeautifulSoup la convierte en '&foo'.
+    """
+
+    def __init__(self, results: Dict[str, Any]):
+        super().__init__(convert_charrefs=True)
+        self.results = results
+        # Pila de elementos abiertos: (nombre, lista donde acumular su texto o None)
+        self._stack: List[Tuple[str, Optional[List[str]]]] = []
+        self._open_collectors: List[List[str]] = []
+        self._ignored_depth = 0
+        self._pending_text: List[str] = []
+        self._title_seen = False
+        self._canonical_seen = False
+
+    # --- Texto ---------------------------------------------------------------
+
+    def handle_data(self, data: str):
+        # El texto puede llegar troceado (entre fragmentos); se une antes de hacer strip
+        self._pending_text.append(data)
+
+    def _flush_text(self):
+        if not self._pending_text:
+            return
+        text = ''.join(self._pending_text).strip()
+        self._pending_text = []
+        if not self._ignored_depth:
+            self._collect(text)
+
+    def _collect(self, text: str):
+        if text:
+            for collector in self._open_collectors:
+                collector.append(text)
+
+    def handle_comment(self, data: str):
+        self._flush_text()
+
+    def handle_decl(self, decl: str):
+        self._flush_text()
+
+    def handle_pi(self, data: str):
+        self._flush_text()
+
+    def unknown_decl(self, data: str):
+        self._flush_text()
+        # Los bloques CDATA forman parte del texto en BeautifulSoup, incluso dentro de <script>
+        if data.upper().startswith('CDATA['):
+            self._collect(data[len('CDATA['):].strip())
+
+    # --- Etiquetas -----------------------------------------------------------
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        self._flush_text()
+        attributes = {name: (value if value is not None else '') for name, value in attrs}
+
+        if tag == 'meta':
+            self._handle_meta(attributes)
+        elif tag == 'link' and not self._canonical_seen:
+            rel = attributes.get('rel')
+            if rel is not None and (rel == 'canonical' or 'canonical' in rel.split()):
+                self._canonical_seen = True
+                self.results['canonical'] = attributes.get('href')
+
+        if tag in VOID_TAGS:
+            return
+
+        collector: Optional[List[str]] = None
+        if tag in HEADING_TAGS:
+            collector = []
+            self.results[tag].append(collector)
+        elif tag == 'title' and not self._title_seen:
+            self._title_seen = True
+            collector = []
+            self.results['title'] = collector
+
+        self._stack.append((tag, collector))
+        if collector is not None:
+            self._open_collectors.append(collector)
+        if tag in IGNORED_TEXT_CONTAINERS:
+            self._ignored_depth += 1
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str):
+        self._flush_text()
+        # Se cierra el elemento abierto más reciente con ese nombre (y todo lo que contenga)
+        for index in range(len(self._stack) - 1, -1, -1):
+            if self._stack[index][0] == tag:
+                break
+        else:
+            return
+
+        while len(self._stack) > index:
+            name, collector = self._stack.pop()
+            if collector is not None:
+                self._open_collectors.pop()
+            if name in IGNORED_TEXT_CONTAINERS:
+                self._ignored_depth -= 1
+
+    def _handle_meta(self, attributes: Dict[str, str]):
+        name = attributes.get('name', '').lower()
+        property_attr = attributes.get('property', '').lower()
+        content = attributes.get('content', '').strip()
+
+        if name == 'description':
+            self.results['meta_description'] = content
+        elif name == 'keywords':
+            self.results['meta_keywords'] = content
+        elif name:
+            self.results['otras_meta'][name] = content
+        elif property_attr:
+            self.results['otras_meta'][property_attr] = content
+
+    # --- Cierre --------------------------------------------------------------
+
+    def close(self):
+        super().close()
+        self._flush_text()
+        # Convertir los textos acumulados al formato final (cadenas)
+        if isinstance(self.results['title'], list):
+            self.results['title'] = ''.join(self.results['title'])
+        for tag in HEADING_TAGS:
+            self.results[tag] = [''.join(parts) for parts in self.results[tag]]
+
+
+def parse_seo_chunks(results: Dict[str, Any], chunks: Iterable[str]) -> Dict[str, Any]:
+    """
+    Rellena `results` consumiendo el HTML fragmento a fragmento, sin construir el DOM.
+    """
+    parser = SEOStreamParser(results)
+    for chunk in chunks:
+        parser.feed(chunk)
+    parser.close()
+    return results
+
+
+def iter_string_chunks(text: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterable[str]:
+    """Trocea un HTML ya disponible en memoria para alimentar el parser."""
+    for start in range(0, len(text), chunk_size):
+        yield text[start:start + chunk_size]
@@ -0,0 +1,117 @@
+import zipfile
+from typing import Dict, List, Optional
+from xml.etree import ElementTree
+
+# --- CONFIGURACIÓN DEL LECTOR XLSX ---
+SPREADSHEET_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+RELATIONSHIP_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+PACKAGE_RELS_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+# Textos que pandas.read_excel convierte en NaN por defecto (na_values)
+PANDAS_NA_STRINGS = frozenset((
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+))
+BOOLEAN_STRINGS = frozenset(('True', 'False', 'TRUE', 'FALSE', 'true', 'false'))
+CELL_TAG = SPREADSHEET_NS + 'c'
+ROW_TAG = SPREADSHEET_NS + 'row'
+# -------------------------------------
+
+
+class UnsupportedSheetError(Exception):
+    """La hoja tiene datos que el lector ligero no interpreta igual que pandas."""
+
+
+def _element_text(element: ElementTree.Element) -> str:
+    """Texto de un <si>/<is>: <t> directo o la concatenación de los <r><t> (sin <rPh>)."""
+    text = element.find(SPREADSHEET_NS + 't')
+    if text is not None:
+        return text.text or ''
+    return ''.join(run.text or '' for run in element.iterfind(f'{SPREADSHEET_NS}r/{SPREADSHEET_NS}t'))
+
+
+def _first_sheet_path(archive: zipfile.ZipFile) -> str:
+    """Ruta dentro del ZIP de la primera hoja del libro (la que lee pandas por defecto)."""
+    workbook = ElementTree.fromstring(archive.read('xl/workbook.xml'))
+    sheet = workbook.find(f'{SPREADSHEET_NS}sheets/{SPREADSHEET_NS}sheet')
+    if sheet is None:
+        raise UnsupportedSheetError("el libro no tiene hojas")
+    relation_id = sheet.get(RELATIONSHIP_NS + 'id')
+    relations = ElementTree.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+    for relation in relations.iter(PACKAGE_RELS_NS + 'Relationship'):
+        if relation.get('Id') == relation_id:
+            target = relation.get('Target')
+            return target.lstrip('/') if target.startswith('/') else 'xl/' + target
+    raise UnsupportedSheetError("no se encontró la primera hoja")
+
+
+def _shared_strings(archive: zipfile.ZipFile) -> List[str]:
+    try:
+        with archive.open('xl/sharedStrings.xml') as f:
+            return [_element_text(element) for _, element in ElementTree.iterparse(f)
+                    if element.tag == SPREADSHEET_NS + 'si']
+    except KeyError:
+        return []
+
+
+def read_first_column(filepath: str) -> List[Optional[str]]:
+    """
+    Lee la primera columna (A) de la primera hoja de un XLSX sin pandas ni openpyxl
+    (zipfile + iterparse): una posición por fila de la hoja, desde la fila 1 y hasta
+    la última con datos; None en las celdas vacías o que pandas leería como NaN.
+
+    Solo admite celdas de texto, que es lo que contiene una lista de keywords. Lanza
+    UnsupportedSheetError si la columna tiene números, fechas o booleanos, o si todos
+    sus textos parecen números o booleanos (pandas los convertiría de tipo): en ese
+    caso hay que leer la hoja con pandas. Un archivo que no es XLSX lanza
+    zipfile.BadZipFile.
+    """
+    values: Dict[int, Optional[str]] = {}
+    with zipfile.ZipFile(filepath) as archive:
+        shared_strings = _shared_strings(archive)
+        with archive.open(_first_sheet_path(archive)) as sheet:
+            for _, element in ElementTree.iterparse(sheet):
+                if element.tag == CELL_TAG:
+                    reference = element.get('r')
+                    if reference is None:
+                        raise UnsupportedSheetError("celdas sin referencia")
+                    # Solo interesa la columna A ('A12', no 'AB12')
+                    if reference[0] == 'A' and reference[1].isdigit():
+                        values[int(reference[1:])] = _cell_text(element, shared_strings)
+                elif element.tag == ROW_TAG:
+                    element.clear()
+
+    present = [value for value in values.values() if value is not None]
+    if present and all(_looks_converted(value) for value in present):
+        raise UnsupportedSheetError("la columna solo contiene números o booleanos como texto")
+    last_row = max(values, default=0)
+    return [values.get(row) for row in range(1, last_row + 1)]
+
+
+def _cell_text(cell: ElementTree.Element, shared_strings: List[str]) -> Optional[str]:
+    """Texto de una celda de la columna (None si está vacía o pandas la leería como NaN)."""
+    cell_type = cell.get('t', 'n')
+    if cell_type == 's':
+        value = cell.find(SPREADSHEET_NS + 'v')
+        text = shared_strings[int(value.text)] if value is not None and value.text else ''
+    elif cell_type == 'inlineStr':
+        inline = cell.find(SPREADSHEET_NS + 'is')
+        text = _element_text(inline) if inline is not None else ''
+    elif cell_type == 'str':
+        value = cell.find(SPREADSHEET_NS + 'v')
+        text = value.text or '' if value is not None else ''
+    elif cell_type == 'e' or cell.find(SPREADSHEET_NS + 'v') is None:
+        text = ''   # Errores (#N/A...) y celdas con estilo pero sin valor: NaN en pandas
+    else:
+        raise UnsupportedSheetError(f"celda {cell.get('r')} de tipo '{cell_type}'")
+    return None if text in PANDAS_NA_STRINGS else text
+
+
+def _looks_converted(text: str) -> bool:
+    """True si pandas podría convertir el texto a número o booleano al inferir el tipo."""
+    if text in BOOLEAN_STRINGS:
+        return True
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True